@@ -0,0 +1,59 @@
+"""結果チャンクの並列取得 (download_result_batches) のワーカー数によるスケーリング。
+
+Snowflake の大きな結果はクラウドストレージ上の複数チャンクに分かれる。各チャンクの取得を
+「ネットワーク待ち (sleep) + デコード (JSON パース)」で模した代役で、ワーカー数ごとの
+所要時間と 1 ワーカー比の速度向上を表示する。
+
+実行: uv run python benchmarks/bench_chunk_download.py [chunks] [latency_ms] [rows_per_chunk]
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from typing import Any, Iterator, List, Sequence
+
+from snowflake_mcp_server.connection import download_result_batches
+
+
+class SimulatedChunk:
+    """反復時にダウンロード待ちとデコードを行う ResultBatch の代役。"""
+
+    def __init__(self, payload: str, latency: float) -> None:
+        self.payload = payload
+        self.latency = latency
+
+    def __iter__(self) -> Iterator[Sequence[Any]]:
+        time.sleep(self.latency)
+        return iter(json.loads(self.payload))
+
+
+def make_chunks(n_chunks: int, latency: float, rows: int) -> List[SimulatedChunk]:
+    payload = json.dumps([[i, f"name-{i}", i * 0.5, None] for i in range(rows)])
+    return [SimulatedChunk(payload, latency) for _ in range(n_chunks)]
+
+
+def run(chunks: List[SimulatedChunk], workers: int) -> float:
+    start = time.perf_counter()
+    total = sum(len(batch) for batch in download_result_batches(chunks, workers))
+    elapsed = time.perf_counter() - start
+    assert total == len(chunks) * len(json.loads(chunks[0].payload))
+    return elapsed
+
+
+def main() -> None:
+    n_chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    rows = int(sys.argv[3]) if len(sys.argv) > 3 else 2_000
+    chunks = make_chunks(n_chunks, latency_ms / 1000, rows)
+    print(f"chunks={n_chunks} latency={latency_ms:g}ms rows_per_chunk={rows}")
+    baseline = None
+    for workers in (1, 2, 4, 8, 16):
+        elapsed = run(chunks, workers)
+        baseline = baseline or elapsed
+        print(f"workers={workers:2d} {elapsed * 1000:9.1f} ms  x{baseline / elapsed:5.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""クエリポリシーの照合コストがルール数に依存しないことの確認。
+
+禁止ルール (関数名・スキーマ・SYSTEM$ 風の前方一致) を 10〜10000 件生成し、
+コンパイル済みの QueryPolicy と、ルールを 1 件ずつ確かめる素朴な実装とで
+1 クエリあたりの検証時間を比べる。
+
+実行: uv run python benchmarks/bench_query_policy.py [queries]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from typing import Callable, List, Sequence
+
+from snowflake_mcp_server.query_policy import QueryPolicy, compile_rule
+from snowflake_mcp_server.query_validator import READ_ONLY_STATEMENTS, tokenize_sql
+
+QUERIES = [
+    "SELECT o.id, c.name, SUM(o.amount) FROM sales.orders o"
+    " JOIN crm.customers c ON c.id = o.customer_id"
+    " WHERE o.created_at >= '2024-01-01' AND c.region IN ('EU', 'US')"
+    " GROUP BY 1, 2 ORDER BY 3 DESC LIMIT 100",
+    "WITH recent AS (SELECT * FROM events WHERE ts > DATEADD(day, -7, CURRENT_DATE))"
+    " SELECT type, COUNT(*) FROM recent GROUP BY type",
+    "SHOW TABLES IN SCHEMA analytics.public",
+    "DESCRIBE TABLE analytics.public.sessions",
+]
+
+
+def make_rules(n: int) -> List[str]:
+    rules: List[str] = []
+    for i in range(n):
+        kind = i % 3
+        if kind == 0:
+            rules.append(f"ext_fn_{i}")
+        elif kind == 1:
+            rules.append(f"restricted_db_{i}.private")
+        else:
+            rules.append(f"SYSTEM${i}_*")
+    return rules
+
+
+def naive_validator(
+    allowed: Sequence[str], denied: Sequence[str]
+) -> Callable[[str], bool]:
+    """ルールを毎回 1 件ずつ照合する比較用の実装 (コンパイル済みトークン列を使う)。"""
+    compiled = [compile_rule(rule) for rule in denied]
+
+    def validate(query: str) -> bool:
+        if not any(query.strip().upper().startswith(p) for p in allowed):
+            return False
+        keys = [token.text for token in tokenize_sql(query)]
+        for rule_keys, prefix in compiled:
+            if prefix:
+                if any(key.startswith(rule_keys[0]) for key in keys):
+                    return False
+                continue
+            width = len(rule_keys)
+            if any(
+                tuple(keys[i : i + width]) == rule_keys
+                for i in range(len(keys) - width + 1)
+            ):
+                return False
+        return True
+
+    return validate
+
+
+def per_query_us(validate: Callable[[str], bool], n_queries: int) -> float:
+    start = time.perf_counter()
+    for i in range(n_queries):
+        assert validate(QUERIES[i % len(QUERIES)])
+    return (time.perf_counter() - start) * 1e6 / n_queries
+
+
+def main() -> None:
+    n_queries = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    print(f"queries={n_queries}")
+    print(f"{'rules':>6} {'compile ms':>11} {'compiled us/q':>14} {'naive us/q':>11}")
+    for n_rules in (10, 100, 1_000, 10_000):
+        rules = make_rules(n_rules)
+        start = time.perf_counter()
+        policy = QueryPolicy([*READ_ONLY_STATEMENTS, "WITH"], rules)
+        compile_ms = (time.perf_counter() - start) * 1000
+        compiled = per_query_us(policy, n_queries)
+        naive = per_query_us(
+            naive_validator([*READ_ONLY_STATEMENTS, "WITH"], rules),
+            max(1, n_queries // max(1, n_rules // 100)),
+        )
+        print(f"{n_rules:6d} {compile_ms:11.1f} {compiled:14.1f} {naive:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""VARIANT を多く含む結果セットのシリアライズ比較ベンチマーク。
+
+3 通りの経路で同じ結果を JSON テキスト化し、所要時間とペイロードサイズを比較する。
+
+- escaped : 従来経路。VARIANT を文字列のまま汎用 JSON 化 (二重エスケープ)
+- reparse : json.loads でデコードしてから再エンコード
+- raw     : RawJSON としてそのまま埋め込む (fetch_query / fetch_result の経路)
+
+実行: uv run python benchmarks/bench_variant.py [rows] [variant_columns]
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import sys
+import time
+from typing import Any, Callable, List, Sequence
+
+from snowflake_mcp_server.connection import mark_raw_json
+from snowflake_mcp_server.serialization import to_json
+
+
+def make_rows(n_rows: int, n_variant: int) -> tuple[List[str], List[Sequence[Any]]]:
+    rng = random.Random(42)
+    columns = ["ID"] + [f"V{i}" for i in range(n_variant)]
+    rows = []
+    for i in range(n_rows):
+        variants = [
+            json.dumps(
+                {
+                    "user": {"id": rng.randint(1, 10**6), "tags": ["a", "b", "c"]},
+                    "score": rng.random(),
+                    "note": "line1\nline2 \"quoted\"",
+                },
+                indent=2,  # Snowflake は VARIANT を整形済み JSON で返す
+            )
+            for _ in range(n_variant)
+        ]
+        rows.append((i, *variants))
+    return columns, rows
+
+
+def escaped(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    return json.dumps([dict(zip(columns, row)) for row in rows])
+
+
+def reparse(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    decoded = [
+        {c: (json.loads(v) if isinstance(v, str) else v) for c, v in zip(columns, row)}
+        for row in rows
+    ]
+    return json.dumps(decoded, separators=(",", ":"))
+
+
+def raw(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    indexes = list(range(1, len(columns)))
+    return to_json(columns, mark_raw_json(rows, indexes))
+
+
+def bench(
+    name: str,
+    fn: Callable[[Sequence[str], Sequence[Sequence[Any]]], str],
+    columns: Sequence[str],
+    rows: Sequence[Sequence[Any]],
+    repeat: int = 5,
+) -> None:
+    best = float("inf")
+    text = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = fn(columns, rows)
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:8s} {best * 1000:9.1f} ms  {len(text.encode()) / 1024:10.1f} KiB")
+
+
+def main() -> None:
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    n_variant = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    columns, rows = make_rows(n_rows, n_variant)
+    print(f"rows={n_rows} variant_columns={n_variant}")
+    for name, fn in (("escaped", escaped), ("reparse", reparse), ("raw", raw)):
+        bench(name, fn, columns, rows)
+
+
+if __name__ == "__main__":
+    main()
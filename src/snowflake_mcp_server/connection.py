@@ -3,15 +3,48 @@
 従来の OOP クラス `SnowflakeConnection` は互換性のため残しつつ、
 実際のロジックは純粋/準純粋なトップレベル関数へ委譲する。
 テスト互換性を維持しながら関数型スタイルへ移行しやすくするための段階的リファクタ。
+
+同期 API (open_connection / fetch_query / fetch_result / close_connection) に加え、
+イベントループを塞がない非同期 API (open_connection_async / fetch_batches_async /
+fetch_query_async / fetch_result_async / close_connection_async) を提供する。
+非同期 API はブロッキング呼び出しをワーカースレッドへ逃がし、クエリの完了は
+execute_async で投入したクエリの状態をポーリングして待つ。
 """
 
 from __future__ import annotations
 
+import json
 import os
-from typing import Any, Dict, List, Mapping, Optional
-
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing, suppress
+from functools import partial
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import anyio
+import anyio.to_thread
 import snowflake.connector
 from cryptography.hazmat.primitives import serialization
+from snowflake.connector.constants import FIELD_NAME_TO_ID
+
+from snowflake_mcp_server.query_validator import parse_qualified_name
+from snowflake_mcp_server.tracing import NOOP_TRACER, Tracer
 
 # --------------------------------------------------------------------------------------
 # 純関数 / ヘルパ
@@ -20,6 +53,21 @@ from cryptography.hazmat.primitives import serialization
 EnvMapping = Mapping[str, str | None]
 
 
+def get_int_env(env: EnvMapping, name: str) -> int | None:
+    """整数値の環境変数を読む純関数。未設定/空文字は None。
+
+    Raises:
+        ValueError: 整数として解釈できない場合
+    """
+    value = env.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError as e:
+        raise ValueError(f"{name} must be an integer: {value!r}") from e
+
+
 def get_connection_params(env: EnvMapping | None = None) -> Dict[str, Any]:
     """環境変数 (デフォルト: os.environ) から Snowflake 接続パラメータ dict を構築する。
 
@@ -73,20 +121,78 @@ def get_connection_params(env: EnvMapping | None = None) -> Dict[str, Any]:
     return params
 
 
+# --------------------------------------------------------------------------------------
+# パラメータ化実行
+# --------------------------------------------------------------------------------------
+
+# サーバ側バインド (`?`) を使う。文のテキストが値に依存しないため、コンパイル結果や
+# SQL テキストをキーにしたキャッシュが値の違いをまたいで再利用される。
+BIND_PARAMSTYLE = "qmark"
+
+
+class Statement(NamedTuple):
+    """バインド変数付きの文。識別子は `IDENTIFIER(?)` で、値は `?` で渡す。"""
+
+    sql: str
+    params: Tuple[Any, ...] = ()
+
+
+Query = Union[str, Statement]
+
+
+def statement_text(query: Query) -> str:
+    """文のテキスト (バインド値を含まない)。"""
+    return query.sql if isinstance(query, Statement) else query
+
+
+def statement_key(query: Query) -> str:
+    """キャッシュキー用の文字列。バインド値があればテキストの後ろに付ける。"""
+    if isinstance(query, Statement) and query.params:
+        return f"{query.sql}\0{json.dumps(query.params, default=str)}"
+    return statement_text(query)
+
+
+def bind_identifier(name: str) -> str:
+    """`IDENTIFIER(?)` に渡すオブジェクト名を検証して正規化する純関数。
+
+    非引用の部分は大文字に、引用部分はそのまま残す (例: `db.public."Orders"` ->
+    `DB.PUBLIC."Orders"`)。識別子として解釈できない名前は拒否する。
+
+    Raises:
+        ValueError: 名前が識別子として不正な場合
+    """
+    return ".".join(parse_qualified_name(name))
+
+
+def execute_statement(cursor: Any, query: Query) -> Any:
+    """文をカーソルで実行する。バインド値があればサーバ側バインドで渡す。"""
+    if isinstance(query, Statement):
+        if query.params:
+            return cursor.execute(query.sql, query.params)
+        return cursor.execute(query.sql)
+    return cursor.execute(query)
+
+
 def open_connection(
     connection_name: str | None = None,
     env: EnvMapping | None = None,
 ) -> snowflake.connector.SnowflakeConnection:
     """接続を生成して返す (副作用: Snowflake へ接続)。
 
+    Statement のバインド変数をサーバ側で扱うため paramstyle は qmark にする。
+
     Args:
         connection_name: connections.toml のエントリ名 (省略可)
         env: 環境変数マッピング (テスト注入用)
     """
     try:
         if connection_name:
-            return snowflake.connector.connect(connection_name=connection_name)
-        return snowflake.connector.connect(**get_connection_params(env=env))
+            return snowflake.connector.connect(
+                connection_name=connection_name, paramstyle=BIND_PARAMSTYLE
+            )
+        return snowflake.connector.connect(
+            **get_connection_params(env=env), paramstyle=BIND_PARAMSTYLE
+        )
     except Exception as e:  # 例外を文脈付きで再ラップ
         ctx = (
             f"connections.toml connection name '{connection_name}'"
@@ -96,29 +202,502 @@ def open_connection(
         raise RuntimeError(f"Failed to connect using {ctx}. Original error: {e}") from e
 
 
+class RawJSON(str):
+    """既に JSON テキストである値 (VARIANT 等)。シリアライズ時に再エスケープせず埋め込む。
+
+    str のサブクラスなので、従来通り文字列として比較・利用できる。
+    """
+
+
+# 半構造化型 (Snowflake は JSON 文字列で返す)
+SEMI_STRUCTURED_TYPE_CODES = frozenset(
+    FIELD_NAME_TO_ID[name] for name in ("VARIANT", "OBJECT", "ARRAY", "MAP")
+)
+
+
+def semi_structured_indexes(description: Sequence[Sequence[Any]]) -> List[int]:
+    """cursor.description から半構造化列の位置を返す純関数。"""
+    return [
+        i
+        for i, desc in enumerate(description)
+        if len(desc) > 1 and desc[1] in SEMI_STRUCTURED_TYPE_CODES
+    ]
+
+
+def mark_raw_json(
+    rows: Sequence[Sequence[Any]], indexes: Sequence[int]
+) -> List[Sequence[Any]]:
+    """指定列の JSON 文字列を RawJSON で包む (デコード/再エンコードはしない)。"""
+    if not indexes:
+        return list(rows)
+    marked: List[Sequence[Any]] = []
+    for row in rows:
+        values = list(row)
+        for i in indexes:
+            value = values[i]
+            if isinstance(value, str):
+                values[i] = RawJSON(value)
+        marked.append(tuple(values))
+    return marked
+
+
+# --------------------------------------------------------------------------------------
+# 結果チャンクの並列ダウンロード
+# --------------------------------------------------------------------------------------
+
+
+def download_result_batches(
+    batches: Iterable[Iterable[Sequence[Any]]], workers: int
+) -> Iterator[List[Sequence[Any]]]:
+    """結果チャンク (ResultBatch 等の行の iterable) を並列に取得し、元の順序で返す。
+
+    チャンクの取得 (ダウンロードとデコード) はワーカースレッドで行い、先読みは
+    workers * 2 チャンクまでに抑える。途中で消費を止めると (ジェネレータの close)、
+    未着手のチャンクは取得しない。
+    """
+    if workers <= 1:
+        for batch in batches:
+            yield list(batch)
+        return
+    window = workers * 2
+    pending: deque[Future[List[Sequence[Any]]]] = deque()
+    executor = ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="snowflake-mcp-fetch"
+    )
+    try:
+        for batch in batches:
+            pending.append(executor.submit(list, batch))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def get_fetch_workers(env: EnvMapping | None = None) -> int | None:
+    """環境変数 SNOWFLAKE_FETCH_WORKERS から結果チャンクの並列取得数を得る。
+
+    未設定または 0 なら None (チャンク並列取得を使わず fetchmany で取得する)。
+    """
+    env = env or os.environ
+    return get_int_env(env, "SNOWFLAKE_FETCH_WORKERS") or None
+
+
+def _row_batches(
+    cursor: Any, batch_size: int, download_workers: int | None
+) -> Iterator[Sequence[Sequence[Any]]]:
+    """カーソルから行をバッチ単位で返す。
+
+    download_workers を指定すると get_result_batches の結果チャンクを並列に取得する
+    (チャンク情報が得られない場合は fetchmany にフォールバック)。
+    """
+    if download_workers:
+        chunks = cursor.get_result_batches()
+        if chunks is not None:
+            yield from download_result_batches(chunks, download_workers)
+            return
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        yield batch
+
+
 def fetch_query(
     conn: snowflake.connector.SnowflakeConnection,
-    query: str,
+    query: Query,
+    *,
+    tracer: Tracer = NOOP_TRACER,
+    download_workers: int | None = None,
 ) -> List[Dict[str, Any]]:
     """クエリを実行して結果を List[Dict] で返す副作用関数。
-    カーソルの開閉は内部で管理し例外安全を確保。
+    カーソルの開閉は内部で管理し例外安全を確保。query には Statement (バインド変数付き) も渡せる。
+    VARIANT/OBJECT/ARRAY 列の値は RawJSON として返す。
+    tracer を渡すと実行 (cursor.execute) と取得 (fetch) をスパンとして記録する。
+    download_workers を指定すると結果チャンクをそのワーカー数で並列に取得する (行順は保持)。
+    """
+    cursor = conn.cursor()
+    try:
+        with tracer.span("cursor.execute") as span:
+            execute_statement(cursor, query)
+            _set_query_id(span, cursor)
+        with tracer.span("fetch") as span:
+            columns = [desc[0] for desc in cursor.description]
+            if download_workers:
+                span.set_attribute("fetch.download_workers", download_workers)
+                fetched: Sequence[Sequence[Any]] = [
+                    row
+                    for batch in _row_batches(
+                        cursor, DEFAULT_FETCH_BATCH_SIZE, download_workers
+                    )
+                    for row in batch
+                ]
+            else:
+                fetched = cursor.fetchall()
+            rows = mark_raw_json(fetched, semi_structured_indexes(cursor.description))
+            span.set_attribute("db.row_count", len(rows))
+            return [dict(zip(columns, row)) for row in rows]
+    finally:
+        cursor.close()
+
+
+# 行のサイズ見積り関数 (columns, row) -> bytes。シリアライズ層から注入する
+RowSizeEstimator = Callable[[Sequence[str], Sequence[Any]], int]
+
+DEFAULT_FETCH_BATCH_SIZE = 1000
+
+
+@dataclass
+class QueryResult:
+    """タプル行と列名、実行メタ情報を保持するクエリ結果。"""
+
+    columns: List[str]
+    rows: List[Sequence[Any]] = field(default_factory=list)
+    query_id: Optional[str] = None
+    estimated_bytes: int = 0
+    truncated: bool = False
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """fetch_query と同じ List[Dict] 形式へ変換する。"""
+        return [dict(zip(self.columns, row)) for row in self.rows]
+
+
+def fetch_result(
+    conn: snowflake.connector.SnowflakeConnection,
+    query: Query,
+    *,
+    row_size: RowSizeEstimator | None = None,
+    max_bytes: int | None = None,
+    batch_size: int = DEFAULT_FETCH_BATCH_SIZE,
+    tracer: Tracer = NOOP_TRACER,
+    download_workers: int | None = None,
+) -> QueryResult:
+    """クエリを実行し、バッチ単位で取得しながらサイズを見積もる副作用関数。
+
+    row_size が与えられれば fetch 中に各行の見積りサイズを積算し、
+    max_bytes を超えた時点で取得を打ち切る (truncated=True)。
+    打ち切りの判断はシリアライズ前に行われるため、超過分の行は変換されない。
+    VARIANT/OBJECT/ARRAY 列の値は RawJSON として返す。
+    tracer を渡すと実行と取得をスパンとして記録し、クエリ ID・行数・見積りバイト数を属性に付ける。
+    download_workers を指定すると結果チャンクを並列に取得する (行順は保持し、
+    打ち切り時は残りのチャンクを取得しない)。
     """
     cursor = conn.cursor()
     try:
-        cursor.execute(query)
-        columns = [desc[0] for desc in cursor.description]
-        rows = cursor.fetchall()
-        return [dict(zip(columns, row)) for row in rows]
+        with tracer.span("cursor.execute") as span:
+            execute_statement(cursor, query)
+            query_id = _set_query_id(span, cursor)
+        raw_json_indexes = semi_structured_indexes(cursor.description)
+        result = QueryResult(
+            columns=[desc[0] for desc in cursor.description], query_id=query_id
+        )
+        with tracer.span("fetch") as span:
+            if download_workers:
+                span.set_attribute("fetch.download_workers", download_workers)
+            with closing(_row_batches(cursor, batch_size, download_workers)) as batches:
+                _collect_batches(batches, result, raw_json_indexes, row_size, max_bytes)
+            span.set_attribute("db.row_count", len(result.rows))
+            span.set_attribute("result.estimated_bytes", result.estimated_bytes)
+            span.set_attribute("result.truncated", result.truncated)
+        return result
     finally:
         cursor.close()
 
 
+def _set_query_id(span: Any, cursor: Any) -> str | None:
+    """カーソルのクエリ ID (sfqid) を返し、分かればスパン属性にも記録する。"""
+    query_id = getattr(cursor, "sfqid", None)
+    if not isinstance(query_id, str):
+        return None
+    span.set_attribute("snowflake.query_id", query_id)
+    return query_id
+
+
+def _collect_batches(
+    batches: Iterable[Sequence[Sequence[Any]]],
+    result: QueryResult,
+    raw_json_indexes: Sequence[int],
+    row_size: RowSizeEstimator | None,
+    max_bytes: int | None,
+) -> None:
+    """バッチ単位に result へ行を積む。max_bytes 超過で打ち切る。"""
+    for batch in batches:
+        if raw_json_indexes:
+            batch = mark_raw_json(batch, raw_json_indexes)
+        if row_size is None:
+            result.rows.extend(batch)
+            continue
+        for row in batch:
+            size = row_size(result.columns, row)
+            if max_bytes is not None and result.estimated_bytes + size > max_bytes:
+                result.truncated = True
+                return
+            result.estimated_bytes += size
+            result.rows.append(row)
+
+
 def close_connection(conn: Optional[snowflake.connector.SnowflakeConnection]) -> None:
     """接続が存在すればクローズ (冪等)。"""
     if conn:
         conn.close()
 
 
+# --------------------------------------------------------------------------------------
+# 非同期 API
+# --------------------------------------------------------------------------------------
+
+DEFAULT_POLL_INTERVAL = 0.05  # 秒。完了待ちのポーリング間隔の初期値
+MAX_POLL_INTERVAL = 1.0
+DEFAULT_MAX_BUFFERED_BATCHES = 2
+_PUT_TIMEOUT = 0.1  # 取得スレッドが停止要求を確認する間隔 (秒)
+_END = object()
+
+
+async def open_connection_async(
+    connection_name: str | None = None,
+    env: EnvMapping | None = None,
+) -> snowflake.connector.SnowflakeConnection:
+    """open_connection をワーカースレッドで実行する (接続中もイベントループを塞がない)。"""
+    return await anyio.to_thread.run_sync(partial(open_connection, connection_name, env))
+
+
+async def close_connection_async(
+    conn: Optional[snowflake.connector.SnowflakeConnection],
+) -> None:
+    """close_connection をワーカースレッドで実行する。"""
+    await anyio.to_thread.run_sync(close_connection, conn)
+
+
+def _submit(cursor: Any, query: Query) -> Any:
+    if isinstance(query, Statement) and query.params:
+        return cursor.execute_async(query.sql, query.params)
+    return cursor.execute_async(statement_text(query))
+
+
+def _abort_quietly(cursor: Any, query_id: str) -> None:
+    with suppress(Exception):  # 中断は最善努力 (既に完了していれば失敗してよい)
+        cursor.abort_query(query_id)
+
+
+async def _wait_for_query(
+    conn: snowflake.connector.SnowflakeConnection,
+    cursor: Any,
+    query_id: str,
+    poll_interval: float,
+) -> None:
+    interval = poll_interval
+    try:
+        while True:
+            status = await anyio.to_thread.run_sync(
+                conn.get_query_status_throw_if_error, query_id
+            )
+            if not conn.is_still_running(status):
+                return
+            await anyio.sleep(interval)
+            interval = min(interval * 2, MAX_POLL_INTERVAL)
+    except anyio.get_cancelled_exc_class():
+        with anyio.CancelScope(shield=True):
+            await anyio.to_thread.run_sync(_abort_quietly, cursor, query_id)
+        raise
+
+
+async def execute_async(
+    conn: snowflake.connector.SnowflakeConnection,
+    query: Query,
+    *,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    tracer: Tracer = NOOP_TRACER,
+) -> Any:
+    """クエリを非同期実行 (execute_async) で投入し、完了を待って結果付きのカーソルを返す。
+
+    完了待ちはクエリの状態をポーリングし、待機中はイベントループを塞がない
+    (間隔は MAX_POLL_INTERVAL まで倍々に延ばす)。待機中にキャンセルされると
+    クエリを中断する。返したカーソルのクローズは呼び出し側の責任。
+
+    Raises:
+        RuntimeError: クエリ ID が得られない場合
+    """
+    cursor = conn.cursor()
+    try:
+        with tracer.span("cursor.execute") as span:
+            await anyio.to_thread.run_sync(_submit, cursor, query)
+            query_id = _set_query_id(span, cursor)
+            if query_id is None:
+                raise RuntimeError("Asynchronous execution returned no query id")
+            await _wait_for_query(conn, cursor, query_id, poll_interval)
+            await anyio.to_thread.run_sync(cursor.get_results_from_sfqid, query_id)
+    except BaseException:
+        cursor.close()
+        raise
+    return cursor
+
+
+class AsyncRowBatches:
+    """行バッチの非同期イテレータ。
+
+    取得 (fetchmany / 結果チャンクのダウンロード) は専用スレッドで行い、未消費のバッチが
+    max_buffered に達すると取得を止める (バックプレッシャ)。消費側が遅ければ取得も待つ。
+    途中で消費をやめる場合は aclose() (または async with) で取得を止め、カーソルを閉じる。
+    """
+
+    def __init__(
+        self,
+        cursor: Any,
+        batches: Iterator[Sequence[Sequence[Any]]],
+        max_buffered: int = DEFAULT_MAX_BUFFERED_BATCHES,
+    ) -> None:
+        self.description: Sequence[Sequence[Any]] = cursor.description
+        self.columns = [desc[0] for desc in self.description]
+        query_id = getattr(cursor, "sfqid", None)
+        self.query_id = query_id if isinstance(query_id, str) else None
+        self._cursor = cursor
+        self._batches = batches
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max(1, max_buffered))
+        self._stop = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._produce, name="snowflake-mcp-fetch-producer", daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        try:
+            with closing(self._batches) as batches:  # type: ignore[type-var]
+                for batch in batches:
+                    if not self._put(list(batch)):
+                        return
+            self._put(_END)
+        except Exception as e:  # 消費側で送出する
+            self._put(e)
+
+    def __aiter__(self) -> "AsyncRowBatches":
+        return self
+
+    async def __anext__(self) -> List[Sequence[Any]]:
+        if self._closed:
+            raise StopAsyncIteration
+        item = await anyio.to_thread.run_sync(self._queue.get, abandon_on_cancel=True)
+        if item is _END:
+            await self.aclose()
+            raise StopAsyncIteration
+        if isinstance(item, Exception):
+            await self.aclose()
+            raise item
+        return item
+
+    async def aclose(self) -> None:
+        """取得スレッドを止めてカーソルを閉じる (冪等)。"""
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        with suppress(queue.Empty):
+            while True:
+                self._queue.get_nowait()
+        with anyio.CancelScope(shield=True):
+            await anyio.to_thread.run_sync(self._thread.join)
+            await anyio.to_thread.run_sync(self._cursor.close)
+
+    async def __aenter__(self) -> "AsyncRowBatches":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+
+async def fetch_batches_async(
+    conn: snowflake.connector.SnowflakeConnection,
+    query: Query,
+    *,
+    batch_size: int = DEFAULT_FETCH_BATCH_SIZE,
+    download_workers: int | None = None,
+    max_buffered: int = DEFAULT_MAX_BUFFERED_BATCHES,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    tracer: Tracer = NOOP_TRACER,
+) -> AsyncRowBatches:
+    """クエリを非同期実行し、結果を行バッチの非同期イテレータで返す。
+
+    download_workers を指定すると結果チャンクを並列に取得する。
+    """
+    cursor = await execute_async(
+        conn, query, poll_interval=poll_interval, tracer=tracer
+    )
+    try:
+        batches = _row_batches(cursor, batch_size, download_workers)
+        return AsyncRowBatches(cursor, batches, max_buffered)
+    except BaseException:
+        cursor.close()
+        raise
+
+
+async def fetch_query_async(
+    conn: snowflake.connector.SnowflakeConnection,
+    query: Query,
+    *,
+    tracer: Tracer = NOOP_TRACER,
+    download_workers: int | None = None,
+) -> List[Dict[str, Any]]:
+    """fetch_query の非同期版 (同じ List[Dict] を返す)。"""
+    batches = await fetch_batches_async(
+        conn, query, download_workers=download_workers, tracer=tracer
+    )
+    async with batches:
+        raw_json_indexes = semi_structured_indexes(batches.description)
+        records: List[Dict[str, Any]] = []
+        with tracer.span("fetch") as span:
+            async for batch in batches:
+                records.extend(
+                    dict(zip(batches.columns, row))
+                    for row in mark_raw_json(batch, raw_json_indexes)
+                )
+            span.set_attribute("db.row_count", len(records))
+        return records
+
+
+async def fetch_result_async(
+    conn: snowflake.connector.SnowflakeConnection,
+    query: Query,
+    *,
+    row_size: RowSizeEstimator | None = None,
+    max_bytes: int | None = None,
+    batch_size: int = DEFAULT_FETCH_BATCH_SIZE,
+    tracer: Tracer = NOOP_TRACER,
+    download_workers: int | None = None,
+) -> QueryResult:
+    """fetch_result の非同期版。max_bytes を超えた時点で残りのバッチを取得せずに止める。"""
+    batches = await fetch_batches_async(
+        conn,
+        query,
+        batch_size=batch_size,
+        download_workers=download_workers,
+        tracer=tracer,
+    )
+    async with batches:
+        raw_json_indexes = semi_structured_indexes(batches.description)
+        result = QueryResult(columns=batches.columns, query_id=batches.query_id)
+        with tracer.span("fetch") as span:
+            if download_workers:
+                span.set_attribute("fetch.download_workers", download_workers)
+            async for batch in batches:
+                _collect_batches([batch], result, raw_json_indexes, row_size, max_bytes)
+                if result.truncated:
+                    break
+            span.set_attribute("db.row_count", len(result.rows))
+            span.set_attribute("result.estimated_bytes", result.estimated_bytes)
+            span.set_attribute("result.truncated", result.truncated)
+        return result
+
+
 # --------------------------------------------------------------------------------------
 # 最小ラッパクラス (後方互換用) - 内部は上記関数へ委譲
 # --------------------------------------------------------------------------------------
@@ -143,29 +722,31 @@ class SnowflakeConnection:
     async def connect(self) -> None:  # 非同期 API 互換
         if self.connection:
             return
+        self.connection = await anyio.to_thread.run_sync(self._connect)
+
+    def _connect(self) -> snowflake.connector.SnowflakeConnection:
         # 後方互換: テストで _get_connection_params を patch できるよう分岐を保持
         if self.connection_name:
-            self.connection = open_connection(self.connection_name)
-        else:
-            params = self._get_connection_params()
-            try:
-                self.connection = snowflake.connector.connect(**params)
-            except Exception as e:  # 例外メッセージを元実装に近い形で
-                raise RuntimeError(
-                    "Failed to connect using environment variable-based connection parameters. "
-                    f"Original error: {e}"
-                ) from e
+            return open_connection(self.connection_name)
+        params = self._get_connection_params()
+        try:
+            return snowflake.connector.connect(**params)
+        except Exception as e:  # 例外メッセージを元実装に近い形で
+            raise RuntimeError(
+                "Failed to connect using environment variable-based connection parameters. "
+                f"Original error: {e}"
+            ) from e
 
     async def execute_query(self, query: str) -> List[Dict[str, Any]]:
         if not self.connection:
             await self.connect()
         # mypy 的に None でないことを保証
         assert self.connection is not None
-        return fetch_query(self.connection, query)
+        return await anyio.to_thread.run_sync(fetch_query, self.connection, query)
 
     async def close(self) -> None:
-        close_connection(self.connection)
-        self.connection = None
+        connection, self.connection = self.connection, None
+        await close_connection_async(connection)
 
 
 # --------------------------------------------------------------------------------------
@@ -173,9 +754,32 @@ class SnowflakeConnection:
 # --------------------------------------------------------------------------------------
 
 __all__ = [
+    "get_int_env",
     "get_connection_params",
+    "BIND_PARAMSTYLE",
+    "Statement",
+    "Query",
+    "statement_text",
+    "statement_key",
+    "bind_identifier",
+    "execute_statement",
     "open_connection",
+    "RawJSON",
+    "SEMI_STRUCTURED_TYPE_CODES",
+    "semi_structured_indexes",
+    "mark_raw_json",
+    "download_result_batches",
+    "get_fetch_workers",
     "fetch_query",
+    "QueryResult",
+    "fetch_result",
     "close_connection",
+    "open_connection_async",
+    "close_connection_async",
+    "execute_async",
+    "AsyncRowBatches",
+    "fetch_batches_async",
+    "fetch_query_async",
+    "fetch_result_async",
     "SnowflakeConnection",
 ]
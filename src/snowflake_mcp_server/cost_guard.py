@@ -0,0 +1,123 @@
+"""EXPLAIN を用いた実行前コストガード (関数型スタイル)。
+
+query ツールの実行前に見積りスキャン量を予算と比較し、超過時は
+拒否 (reject) もしくは確認要求 (confirm) を例外として返す。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import List
+
+import snowflake.connector
+
+from snowflake_mcp_server.connection import EnvMapping, Query, get_int_env
+from snowflake_mcp_server.explain import (
+    Explainer,
+    PlanEstimate,
+    explain_query,
+    is_explainable,
+)
+
+logger = logging.getLogger(__name__)
+
+COST_GUARD_MODES = ("reject", "confirm")
+
+
+class CostBudgetExceeded(ValueError):
+    """見積りスキャン量が予算を超えた場合の例外。"""
+
+
+@dataclass(frozen=True)
+class CostBudget:
+    """クエリ 1 回あたりのスキャン予算。
+
+    mode が "confirm" の場合、利用者が明示的に確認 (confirmed=True) すれば実行を許可する。
+    """
+
+    max_bytes: int | None = None
+    max_partitions: int | None = None
+    mode: str = "reject"
+
+    def violations(self, estimate: PlanEstimate) -> List[str]:
+        """予算超過の内容を文字列で返す純関数。超過なしなら空リスト。"""
+        found: List[str] = []
+        if self.max_bytes is not None and estimate.bytes_assigned > self.max_bytes:
+            found.append(
+                f"bytesAssigned {estimate.bytes_assigned} > budget {self.max_bytes}"
+            )
+        if (
+            self.max_partitions is not None
+            and estimate.partitions_assigned > self.max_partitions
+        ):
+            found.append(
+                f"partitionsAssigned {estimate.partitions_assigned}"
+                f" (of {estimate.partitions_total}) > budget {self.max_partitions}"
+            )
+        return found
+
+
+def get_cost_budget(env: EnvMapping | None = None) -> CostBudget | None:
+    """環境変数からコスト予算を構築する。上限が 1 つも無ければ None (ガード無効)。"""
+    env = env or os.environ
+
+    max_bytes = get_int_env(env, "SNOWFLAKE_MAX_BYTES_SCANNED")
+    max_partitions = get_int_env(env, "SNOWFLAKE_MAX_PARTITIONS_SCANNED")
+    if max_bytes is None and max_partitions is None:
+        return None
+
+    mode = (env.get("SNOWFLAKE_COST_GUARD_MODE") or "reject").lower()
+    if mode not in COST_GUARD_MODES:
+        raise ValueError(
+            f"SNOWFLAKE_COST_GUARD_MODE must be one of {COST_GUARD_MODES}: {mode!r}"
+        )
+    return CostBudget(max_bytes=max_bytes, max_partitions=max_partitions, mode=mode)
+
+
+def check_cost(
+    conn: snowflake.connector.SnowflakeConnection,
+    query: Query,
+    budget: CostBudget,
+    *,
+    confirmed: bool = False,
+    explain: Explainer = explain_query,
+) -> PlanEstimate | None:
+    """EXPLAIN の見積りを予算と比較する。
+
+    EXPLAIN できないクエリや見積りに失敗した場合は判定せず None を返す
+    (コンパイルエラー等は本実行側でより詳細に報告されるため)。
+
+    Raises:
+        CostBudgetExceeded: 予算超過 (confirm モードで未確認の場合を含む)
+    """
+    if not is_explainable(query):
+        return None
+    try:
+        estimate = explain(conn, query)
+    except Exception as e:
+        logger.warning("Cost guard skipped, EXPLAIN failed: %s", e)
+        return None
+
+    violations = budget.violations(estimate)
+    if not violations:
+        return estimate
+    detail = "; ".join(violations)
+    if budget.mode == "confirm":
+        if confirmed:
+            return estimate
+        raise CostBudgetExceeded(
+            f"Estimated scan exceeds budget ({detail}). "
+            "Re-run with confirm_cost=true to execute anyway."
+        )
+    raise CostBudgetExceeded(f"Estimated scan exceeds budget ({detail}).")
+
+
+__all__ = [
+    "COST_GUARD_MODES",
+    "CostBudgetExceeded",
+    "CostBudget",
+    "get_cost_budget",
+    "check_cost",
+]
@@ -0,0 +1,218 @@
+"""プロセス間で共有できるディスクキャッシュ (SQLite)。
+
+stdio モードではエージェントのセッションごとにサーバプロセスが起動するため、
+メモリ上のキャッシュは毎回失われる。SQLite (WAL モード) のファイルを
+設定ディレクトリに置き、複数プロセスから同時に読み書きできるようにする。
+エントリは TTL で失効し、合計サイズが上限を超えると最終アクセスの古い順に追い出す。
+キャッシュの障害はツールの失敗にせず、ミス扱いとしてログに残す。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from snowflake_mcp_server.connection import EnvMapping, get_int_env
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024**2  # 256 MiB
+DEFAULT_CACHE_TTL_SECONDS = 300
+CACHE_FILE_NAME = "snowflake-mcp-cache.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace   TEXT    NOT NULL,
+    key         TEXT    NOT NULL,
+    value       TEXT    NOT NULL,
+    size        INTEGER NOT NULL,
+    expires_at  REAL    NOT NULL,
+    accessed_at REAL    NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+"""
+
+
+class DiskCache:
+    """SQLite ファイルを用いた TTL + サイズ上限付きのテキストキャッシュ。
+
+    namespace で接続先 (アカウント/ユーザ/ロール等) ごとにエントリを分離する。
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        namespace: str = "default",
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        default_ttl: float = DEFAULT_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(directory) / CACHE_FILE_NAME
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=5.0, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> str | None:
+        """有効なエントリがあれば値を返す。失効・未登録・障害時は None。"""
+        now = self._clock()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT value, expires_at FROM entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+                if row is None:
+                    return None
+                value, expires_at = row
+                if expires_at <= now:
+                    conn.execute(
+                        "DELETE FROM entries WHERE namespace = ? AND key = ?",
+                        (self.namespace, key),
+                    )
+                    return None
+                conn.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, key),
+                )
+                return value
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Disk cache read failed: %s", e)
+            return None
+
+    def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        """値を保存し、必要ならサイズ上限まで追い出す。"""
+        now = self._clock()
+        ttl = self.default_ttl if ttl is None else ttl
+        size = len(value.encode("utf-8"))
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO entries"
+                        " (namespace, key, value, size, expires_at, accessed_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        (self.namespace, key, value, size, now + ttl, now),
+                    )
+                    self._evict(conn, now)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Disk cache write failed: %s", e)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        victims = []
+        for rowid, size in conn.execute(
+            "SELECT rowid, size FROM entries ORDER BY accessed_at"
+        ):
+            victims.append((rowid,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM entries WHERE rowid = ?", victims)
+
+    def clear(self) -> None:
+        """この namespace のエントリを全て削除する。"""
+        try:
+            with self._lock:
+                self._connect().execute(
+                    "DELETE FROM entries WHERE namespace = ?", (self.namespace,)
+                )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Disk cache clear failed: %s", e)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def cache_namespace(connection_name: str | None, env: EnvMapping | None = None) -> str:
+    """接続先ごとにキャッシュを分けるための namespace を作る純関数。
+
+    connections.toml 利用時はその接続名、環境変数利用時はアカウント/ユーザ/ロール/
+    データベース/スキーマ/ウェアハウスの組からハッシュを作る。
+    """
+    if connection_name:
+        return f"connection:{connection_name}"
+    env = env or os.environ
+    identity = "|".join(
+        env.get(name) or ""
+        for name in (
+            "SNOWFLAKE_ACCOUNT",
+            "SNOWFLAKE_USER",
+            "SNOWFLAKE_ROLE",
+            "SNOWFLAKE_DATABASE",
+            "SNOWFLAKE_SCHEMA",
+            "SNOWFLAKE_WAREHOUSE",
+        )
+    )
+    return "env:" + hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+
+
+def get_disk_cache(
+    connection_name: str | None = None, env: EnvMapping | None = None
+) -> DiskCache | None:
+    """環境変数からディスクキャッシュを構築する。SNOWFLAKE_CACHE_DIR 未設定なら None (無効)。"""
+    env = env or os.environ
+    directory = env.get("SNOWFLAKE_CACHE_DIR")
+    if not directory:
+        return None
+    max_bytes = get_int_env(env, "SNOWFLAKE_CACHE_MAX_BYTES")
+    ttl = get_int_env(env, "SNOWFLAKE_CACHE_TTL_SECONDS")
+    return DiskCache(
+        os.path.expanduser(directory),
+        namespace=cache_namespace(connection_name, env),
+        max_bytes=DEFAULT_CACHE_MAX_BYTES if max_bytes is None else max_bytes,
+        default_ttl=DEFAULT_CACHE_TTL_SECONDS if ttl is None else ttl,
+    )
+
+
+def get_query_cache_ttl(env: EnvMapping | None = None) -> int:
+    """query ツール結果のキャッシュ TTL (秒)。既定 0 (キャッシュしない)。"""
+    env = env or os.environ
+    return get_int_env(env, "SNOWFLAKE_QUERY_CACHE_TTL_SECONDS") or 0
+
+
+__all__ = [
+    "DEFAULT_CACHE_MAX_BYTES",
+    "DEFAULT_CACHE_TTL_SECONDS",
+    "DiskCache",
+    "cache_namespace",
+    "get_disk_cache",
+    "get_query_cache_ttl",
+]
@@ -0,0 +1,169 @@
+"""EXPLAIN によるクエリコスト見積り (関数型スタイル)。
+
+`EXPLAIN USING JSON` の GlobalStats からスキャン量を取り出し、
+ウェアハウスルーティング等の判断材料となる値オブジェクトへ変換する。
+同じ SQL の繰り返しで EXPLAIN を再発行しないよう、正規化 SQL をキーにした
+プランキャッシュも提供する。
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping
+
+import snowflake.connector
+
+from snowflake_mcp_server.connection import (
+    Query,
+    Statement,
+    execute_statement,
+    statement_key,
+    statement_text,
+)
+
+# EXPLAIN でプランを取得できる文 (SHOW / DESCRIBE などは対象外)
+EXPLAINABLE_STATEMENTS = ("SELECT", "WITH")
+
+
+@dataclass(frozen=True)
+class PlanEstimate:
+    """EXPLAIN から得たスキャン量の見積り。"""
+
+    partitions_total: int
+    partitions_assigned: int
+    bytes_assigned: int
+
+
+Explainer = Callable[[snowflake.connector.SnowflakeConnection, Query], PlanEstimate]
+
+
+def is_explainable(query: Query | None) -> bool:
+    """EXPLAIN の対象にできるクエリか判定する純関数。"""
+    if not query:
+        return False
+    head = statement_text(query).lstrip().split(None, 1)
+    return bool(head) and head[0].upper() in EXPLAINABLE_STATEMENTS
+
+
+def parse_explain_json(plan: str | Mapping[str, Any]) -> PlanEstimate:
+    """`EXPLAIN USING JSON` の出力 (文字列または dict) を PlanEstimate へ変換する純関数。
+
+    Raises:
+        ValueError: GlobalStats が含まれない場合
+    """
+    data = json.loads(plan) if isinstance(plan, str) else plan
+    stats = data.get("GlobalStats")
+    if not isinstance(stats, Mapping):
+        raise ValueError("EXPLAIN output does not contain GlobalStats")
+    return PlanEstimate(
+        partitions_total=int(stats.get("partitionsTotal", 0)),
+        partitions_assigned=int(stats.get("partitionsAssigned", 0)),
+        bytes_assigned=int(stats.get("bytesAssigned", 0)),
+    )
+
+
+def explain_query(
+    conn: snowflake.connector.SnowflakeConnection, query: Query
+) -> PlanEstimate:
+    """`EXPLAIN USING JSON` を実行して見積りを返す副作用関数 (バインド値は本実行と同じものを渡す)。"""
+    cursor = conn.cursor()
+    try:
+        params = query.params if isinstance(query, Statement) else ()
+        execute_statement(
+            cursor, Statement(f"EXPLAIN USING JSON {statement_text(query)}", params)
+        )
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    if not row:
+        raise ValueError("EXPLAIN returned no plan")
+    return parse_explain_json(row[0])
+
+
+def normalize_sql_for_plan(query: str) -> str:
+    """プランキャッシュのキー用に SQL を正規化する純関数。
+
+    連続空白を 1 つにまとめ、末尾のセミコロンを除去する。
+    文字列リテラルの大文字小文字は意味を持つため大文字化はしない。
+    """
+    return " ".join(query.split()).rstrip(";").rstrip()
+
+
+def _plan_key(query: Query) -> str:
+    # 見積りはバインド値 (プルーニング) にも依存するため値もキーに含める
+    params = query.params if isinstance(query, Statement) else ()
+    return statement_key(
+        Statement(normalize_sql_for_plan(statement_text(query)), params)
+    )
+
+
+class PlanCache:
+    """正規化 SQL をキーにした EXPLAIN 見積りの LRU + TTL キャッシュ (スレッドセーフ)。"""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, PlanEstimate]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, query: Query) -> PlanEstimate | None:
+        key = _plan_key(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, estimate = entry
+            if self._clock() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return estimate
+
+    def put(self, query: Query, estimate: PlanEstimate) -> None:
+        key = _plan_key(query)
+        with self._lock:
+            self._entries[key] = (self._clock(), estimate)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def cached_explainer(cache: PlanCache, explain: Explainer = explain_query) -> Explainer:
+    """キャッシュを挟んだ Explainer を合成して返す。"""
+
+    def _explain(
+        conn: snowflake.connector.SnowflakeConnection, query: Query
+    ) -> PlanEstimate:
+        estimate = cache.get(query)
+        if estimate is None:
+            estimate = explain(conn, query)
+            cache.put(query, estimate)
+        return estimate
+
+    return _explain
+
+
+__all__ = [
+    "EXPLAINABLE_STATEMENTS",
+    "PlanEstimate",
+    "Explainer",
+    "is_explainable",
+    "parse_explain_json",
+    "explain_query",
+    "normalize_sql_for_plan",
+    "PlanCache",
+    "cached_explainer",
+]
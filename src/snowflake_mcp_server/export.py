@@ -0,0 +1,350 @@
+"""クエリ結果のファイルエクスポート (MCP レスポンスを経由しない大量抽出)。
+
+結果をバッチ単位でサンドボックスディレクトリ内の Parquet / gzip 圧縮 CSV へ書き出し、
+レスポンスにはパス・行数・スキーマと先頭数行のプレビューだけを返す。メモリ使用量は
+バッチ 1 つ分 (並列時はワーカー数分) に収まる。
+Parquet は Arrow バッチ (cursor.fetch_arrow_batches) をそのまま書くため pyarrow が必要。
+CSV は fetchmany のバッチから標準ライブラリで書くため追加の依存は無い。
+workers > 1 ではサーバ側の結果チャンク (cursor.get_result_batches) を並列に取得し、
+ディレクトリ配下の part ファイルへ書き出す。
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import snowflake.connector
+from snowflake.connector.constants import FIELD_ID_TO_NAME
+
+from snowflake_mcp_server.connection import (
+    DEFAULT_FETCH_BATCH_SIZE,
+    EnvMapping,
+    get_int_env,
+    mark_raw_json,
+    semi_structured_indexes,
+)
+from snowflake_mcp_server.serialization import text_value, to_json
+from snowflake_mcp_server.tracing import NOOP_TRACER, Tracer
+
+EXPORT_FORMATS = ("csv.gz", "parquet")
+DEFAULT_EXPORT_PREVIEW_ROWS = 5
+DEFAULT_EXPORT_WORKERS = 1
+PARTIAL_SUFFIX = ".partial"
+
+_FILE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+@dataclass
+class ExportResult:
+    """エクスポート結果のメタ情報 (データ本体は含まない)。preview は JSON 互換の値。"""
+
+    path: str
+    format: str
+    row_count: int
+    bytes: int
+    columns: List[Dict[str, Any]]
+    preview: List[Dict[str, Any]] = field(default_factory=list)
+    parts: int = 1
+    query_id: str | None = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "format": self.format,
+            "row_count": self.row_count,
+            "bytes": self.bytes,
+            "parts": self.parts,
+            "schema": self.columns,
+            "preview": self.preview,
+            "query_id": self.query_id,
+        }
+
+
+# --------------------------------------------------------------------------------------
+# 純関数
+# --------------------------------------------------------------------------------------
+
+
+def describe_columns(description: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """cursor.description から列名・型名・NULL 可否のスキーマを作る。"""
+    return [
+        {
+            "name": desc[0],
+            "type": FIELD_ID_TO_NAME.get(desc[1], str(desc[1])) if len(desc) > 1 else "",
+            "nullable": bool(desc[6]) if len(desc) > 6 else True,
+        }
+        for desc in description
+    ]
+
+
+def resolve_export_path(
+    directory: str | os.PathLike[str], file_name: str | None, export_format: str
+) -> Path:
+    """サンドボックス内の出力先パスを決める。
+
+    file_name はディレクトリ区切りを含まない単純な名前に限り、拡張子が無ければ補う。
+    省略時はタイムスタンプから生成する。
+
+    Raises:
+        ValueError: 未知のフォーマット、または不正なファイル名
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unsupported export format {export_format!r}. Use one of {EXPORT_FORMATS}"
+        )
+    extension = "." + export_format
+    if file_name is None:
+        file_name = "export-" + datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    if not _FILE_NAME_PATTERN.match(file_name) or ".." in file_name:
+        raise ValueError(
+            f"Invalid export file name {file_name!r}: use letters, digits, '.', '_' "
+            "and '-' only"
+        )
+    if not file_name.endswith(extension):
+        file_name += extension
+    root = Path(directory).resolve()
+    path = (root / file_name).resolve()
+    if path.parent != root:
+        raise ValueError(f"Export path escapes the export directory: {file_name!r}")
+    return path
+
+
+# --------------------------------------------------------------------------------------
+# 書き出し
+# --------------------------------------------------------------------------------------
+
+
+def _require_pyarrow() -> Any:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:  # 任意依存
+        raise ValueError(
+            "Parquet export requires the 'pyarrow' package "
+            "(install snowflake-connector-python[pandas])"
+        ) from e
+    return pq
+
+
+def write_csv_gz(
+    path: Path,
+    columns: Sequence[str],
+    batches: Iterable[Sequence[Sequence[Any]]],
+    preview_rows: int = DEFAULT_EXPORT_PREVIEW_ROWS,
+) -> Tuple[int, List[Sequence[Any]]]:
+    """行バッチを gzip 圧縮 CSV (ヘッダ付き) へ書き、(行数, 先頭行) を返す。"""
+    rows = 0
+    preview: List[Sequence[Any]] = []
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(columns)
+        for batch in batches:
+            if len(preview) < preview_rows:
+                preview.extend(batch[: preview_rows - len(preview)])
+            writer.writerows([text_value(v) for v in row] for row in batch)
+            rows += len(batch)
+    return rows, preview
+
+
+def write_parquet(
+    path: Path,
+    columns: Sequence[str],
+    tables: Iterable[Any],
+    preview_rows: int = DEFAULT_EXPORT_PREVIEW_ROWS,
+) -> Tuple[int, List[Sequence[Any]]]:
+    """Arrow テーブルのバッチを 1 つの Parquet ファイルへ書き、(行数, 先頭行) を返す。"""
+    pq = _require_pyarrow()
+    import pyarrow as pa
+
+    rows = 0
+    preview: List[Sequence[Any]] = []
+    writer = None
+    try:
+        for table in tables:
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+            elif table.schema != writer.schema:
+                # バッチごとに精度が異なる場合 (TIMESTAMP 等) は最初のスキーマへ揃える
+                table = table.cast(writer.schema)
+            if len(preview) < preview_rows:
+                head = table.slice(0, preview_rows - len(preview)).to_pylist()
+                preview.extend(tuple(record.values()) for record in head)
+            writer.write_table(table)
+            rows += table.num_rows
+        if writer is None:  # 結果が空
+            empty = pa.table({name: pa.array([], pa.null()) for name in columns})
+            writer = pq.ParquetWriter(path, empty.schema, compression="zstd")
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows, preview
+
+
+def _fetch_batches(cursor: Any, batch_size: int) -> Iterable[Sequence[Sequence[Any]]]:
+    raw_json_indexes = semi_structured_indexes(cursor.description)
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        yield mark_raw_json(batch, raw_json_indexes) if raw_json_indexes else batch
+
+
+def _write_part(
+    path: Path,
+    export_format: str,
+    columns: Sequence[str],
+    chunk: Any,
+    preview_rows: int,
+) -> Tuple[int, List[Sequence[Any]]]:
+    """サーバ側の結果チャンク 1 つを取得して part ファイルへ書く (ワーカースレッドで実行)。"""
+    if export_format == "parquet":
+        return write_parquet(path, columns, [chunk.to_arrow()], preview_rows)
+    return write_csv_gz(path, columns, [list(chunk)], preview_rows)
+
+
+def _file_size(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.iterdir())
+    return path.stat().st_size
+
+
+def export_to_file(
+    conn: snowflake.connector.SnowflakeConnection,
+    query: str,
+    path: Path,
+    export_format: str,
+    *,
+    preview_rows: int = DEFAULT_EXPORT_PREVIEW_ROWS,
+    workers: int = DEFAULT_EXPORT_WORKERS,
+    batch_size: int = DEFAULT_FETCH_BATCH_SIZE,
+    tracer: Tracer = NOOP_TRACER,
+) -> ExportResult:
+    """クエリを実行し、結果を path へストリーミングで書き出す副作用関数。
+
+    書き込み中は `<path>.partial` に出力し、完了後にリネームする (失敗時は削除)。
+    workers > 1 では path をディレクトリとし、結果チャンクごとの part ファイルを並列に書く。
+
+    Raises:
+        FileExistsError: path が既に存在する場合
+    """
+    if path.exists():
+        raise FileExistsError(f"Export target already exists: {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + PARTIAL_SUFFIX)
+    cursor = conn.cursor()
+    try:
+        with tracer.span("cursor.execute") as span:
+            cursor.execute(query)
+            query_id = getattr(cursor, "sfqid", None)
+            query_id = query_id if isinstance(query_id, str) else None
+            if query_id:
+                span.set_attribute("snowflake.query_id", query_id)
+        columns = [desc[0] for desc in cursor.description]
+        with tracer.span("write", format=export_format, workers=workers) as span:
+            try:
+                if workers > 1:
+                    rows, preview, parts = _export_parallel(
+                        cursor, partial, export_format, columns, preview_rows, workers
+                    )
+                elif export_format == "parquet":
+                    _require_pyarrow()
+                    rows, preview = write_parquet(
+                        partial, columns, cursor.fetch_arrow_batches(), preview_rows
+                    )
+                    parts = 1
+                else:
+                    batches = _fetch_batches(cursor, batch_size)
+                    rows, preview = write_csv_gz(partial, columns, batches, preview_rows)
+                    parts = 1
+                os.replace(partial, path)
+            except BaseException:
+                if partial.is_dir():
+                    shutil.rmtree(partial, ignore_errors=True)
+                else:
+                    partial.unlink(missing_ok=True)
+                raise
+            size = _file_size(path)
+            span.set_attribute("db.row_count", rows)
+            span.set_attribute("export.bytes", size)
+        return ExportResult(
+            path=str(path),
+            format=export_format,
+            row_count=rows,
+            bytes=size,
+            columns=describe_columns(cursor.description),
+            preview=json.loads(to_json(columns, preview)),
+            parts=parts,
+            query_id=query_id,
+        )
+    finally:
+        cursor.close()
+
+
+def _export_parallel(
+    cursor: Any,
+    directory: Path,
+    export_format: str,
+    columns: Sequence[str],
+    preview_rows: int,
+    workers: int,
+) -> Tuple[int, List[Sequence[Any]], int]:
+    if export_format == "parquet":
+        _require_pyarrow()
+    chunks = cursor.get_result_batches() or []
+    directory.mkdir()
+    names = [f"part-{i:05d}.{export_format}" for i in range(len(chunks))]
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="snowflake-mcp-export"
+    ) as executor:
+        # map は結果を投入順に返すため、プレビューは先頭チャンクから取られる
+        results = list(
+            executor.map(
+                lambda args: _write_part(
+                    directory / args[0], export_format, columns, args[1], preview_rows
+                ),
+                zip(names, chunks),
+            )
+        )
+    preview: List[Sequence[Any]] = []
+    for _, part_preview in results:
+        preview.extend(part_preview[: preview_rows - len(preview)])
+    return sum(rows for rows, _ in results), preview, len(chunks)
+
+
+def get_export_dir(env: EnvMapping | None = None) -> Path | None:
+    """環境変数 SNOWFLAKE_EXPORT_DIR からエクスポート先を得る。未設定なら None (無効)。"""
+    env = env or os.environ
+    directory = env.get("SNOWFLAKE_EXPORT_DIR")
+    if not directory:
+        return None
+    return Path(os.path.expanduser(directory))
+
+
+def get_export_workers(env: EnvMapping | None = None) -> int:
+    """環境変数 SNOWFLAKE_EXPORT_WORKERS から並列書き出しのワーカー数を得る (既定 1)。"""
+    env = env or os.environ
+    workers = get_int_env(env, "SNOWFLAKE_EXPORT_WORKERS")
+    return DEFAULT_EXPORT_WORKERS if workers is None else max(1, workers)
+
+
+__all__ = [
+    "EXPORT_FORMATS",
+    "DEFAULT_EXPORT_PREVIEW_ROWS",
+    "ExportResult",
+    "describe_columns",
+    "resolve_export_path",
+    "write_csv_gz",
+    "write_parquet",
+    "export_to_file",
+    "get_export_dir",
+    "get_export_workers",
+]
@@ -0,0 +1,347 @@
+"""接続プールとセッションのウォームアップ / キープアライブ。
+
+ツール呼び出しごとに接続を開閉すると、毎回認証とセッション確立のコストがかかる。
+ConnectionPool は接続を再利用し、起動時に指定数を事前に開き、
+バックグラウンドスレッドで待機中の接続へ定期的にハートビート (`SELECT 1`) を送って
+セッショントークンの失効を防ぐ。設定された業務時間帯にはウェアハウスを使う軽いクエリも
+発行し、ウェアハウスのサスペンドによる初回遅延を避ける。
+SNOWFLAKE_POOL_SIZE=0 でプール自体を無効化でき、その場合は従来通り呼び出しごとに接続する。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, List
+
+import snowflake.connector
+
+from snowflake_mcp_server.connection import EnvMapping, close_connection, get_int_env
+
+logger = logging.getLogger(__name__)
+
+ConnectionFactory = Callable[[], snowflake.connector.SnowflakeConnection]
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_POOL_PREOPEN = 1
+DEFAULT_KEEPALIVE_INTERVAL_SECONDS = 900
+HEARTBEAT_QUERY = "SELECT 1"
+# 結果キャッシュやメタデータだけで完結せず、ウェアハウスで実行される軽いクエリ
+DEFAULT_WAREHOUSE_KEEPALIVE_QUERY = (
+    "SELECT COUNT(*) FROM TABLE(GENERATOR(ROWCOUNT => 1)) WHERE RANDOM() IS NOT NULL"
+)
+WEEKDAY_NAMES = ("MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN")
+
+
+@dataclass(frozen=True)
+class WarehouseKeepAlive:
+    """ウェアハウスを起動状態に保つ時間帯 (ローカル時刻, [start_hour, end_hour))。"""
+
+    start_hour: int
+    end_hour: int
+    weekdays: FrozenSet[int] = frozenset(range(5))  # 0=月曜
+    query: str = DEFAULT_WAREHOUSE_KEEPALIVE_QUERY
+
+    def is_active(self, now: datetime) -> bool:
+        """now が対象の曜日・時間帯に含まれるか判定する純関数。"""
+        return (
+            now.weekday() in self.weekdays
+            and self.start_hour <= now.hour < self.end_hour
+        )
+
+
+def _parse_hours(value: str) -> tuple[int, int]:
+    try:
+        start, end = (int(part) for part in value.split("-", 1))
+    except ValueError as e:
+        raise ValueError(
+            f"SNOWFLAKE_KEEPALIVE_WAREHOUSE_HOURS must look like '09-18': {value!r}"
+        ) from e
+    if not 0 <= start < end <= 24:
+        raise ValueError(
+            f"SNOWFLAKE_KEEPALIVE_WAREHOUSE_HOURS must satisfy 0 <= start < end <= 24: {value!r}"
+        )
+    return start, end
+
+
+def _parse_weekdays(value: str) -> FrozenSet[int]:
+    days: set[int] = set()
+    try:
+        for part in value.upper().split(","):
+            if "-" in part:
+                first, last = part.split("-", 1)
+                days.update(
+                    range(
+                        WEEKDAY_NAMES.index(first.strip()),
+                        WEEKDAY_NAMES.index(last.strip()) + 1,
+                    )
+                )
+            else:
+                days.add(WEEKDAY_NAMES.index(part.strip()))
+    except ValueError as e:
+        raise ValueError(
+            f"SNOWFLAKE_KEEPALIVE_WAREHOUSE_DAYS must look like 'MON-FRI' or 'MON,WED': {value!r}"
+        ) from e
+    return frozenset(days)
+
+
+def get_warehouse_keepalive(env: EnvMapping | None = None) -> WarehouseKeepAlive | None:
+    """環境変数からウェアハウスのキープアライブ設定を構築する。時間帯未設定なら None。"""
+    env = env or os.environ
+    hours = env.get("SNOWFLAKE_KEEPALIVE_WAREHOUSE_HOURS")
+    if not hours:
+        return None
+    start, end = _parse_hours(hours)
+    days = env.get("SNOWFLAKE_KEEPALIVE_WAREHOUSE_DAYS")
+    return WarehouseKeepAlive(
+        start_hour=start,
+        end_hour=end,
+        weekdays=_parse_weekdays(days) if days else frozenset(range(5)),
+        query=env.get("SNOWFLAKE_KEEPALIVE_WAREHOUSE_QUERY")
+        or DEFAULT_WAREHOUSE_KEEPALIVE_QUERY,
+    )
+
+
+@dataclass
+class PoolStats:
+    """プールの観測用カウンタ。"""
+
+    opened: int = 0
+    closed: int = 0
+    reused: int = 0
+    heartbeats: int = 0
+    heartbeat_failures: int = 0
+    warehouse_pings: int = 0
+    warehouse_ping_failures: int = 0
+    last_heartbeat_at: float | None = None
+
+
+def _execute(conn: snowflake.connector.SnowflakeConnection, sql: str) -> None:
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql)
+        cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+class ConnectionPool:
+    """再利用・事前オープン・キープアライブ付きの接続プール (スレッドセーフ)。
+
+    max_size を超えて同時に必要になった接続は一時接続として開き、返却時に閉じる。
+    """
+
+    def __init__(
+        self,
+        factory: ConnectionFactory,
+        max_size: int = DEFAULT_POOL_SIZE,
+        preopen: int = DEFAULT_POOL_PREOPEN,
+        keepalive_interval: float = DEFAULT_KEEPALIVE_INTERVAL_SECONDS,
+        warehouse_keepalive: WarehouseKeepAlive | None = None,
+        now: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        self.factory = factory
+        self.max_size = max_size
+        self.preopen = min(preopen, max_size)
+        self.keepalive_interval = keepalive_interval
+        self.warehouse_keepalive = warehouse_keepalive
+        self.stats = PoolStats()
+        self._now = now
+        self._idle: List[snowflake.connector.SnowflakeConnection] = []
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ----------------------------------------------------------------------------------
+    # 貸し出し / 返却
+    # ----------------------------------------------------------------------------------
+
+    def _open(self) -> snowflake.connector.SnowflakeConnection:
+        conn = self.factory()
+        with self._lock:
+            self.stats.opened += 1
+        return conn
+
+    def _discard(self, conn: snowflake.connector.SnowflakeConnection) -> None:
+        try:
+            close_connection(conn)
+        except Exception as e:
+            logger.debug("Ignoring error while closing pooled connection: %s", e)
+        with self._lock:
+            self.stats.closed += 1
+
+    def acquire(self) -> snowflake.connector.SnowflakeConnection:
+        """待機中の接続を貸し出す。無ければ新規に開く。"""
+        with self._lock:
+            self._in_use += 1
+            if self._idle:
+                self.stats.reused += 1
+                return self._idle.pop()
+        try:
+            return self._open()
+        except BaseException:
+            with self._lock:
+                self._in_use -= 1
+            raise
+
+    def release(self, conn: snowflake.connector.SnowflakeConnection) -> None:
+        """接続を返却する。閉じられた接続や上限超過分は破棄する。"""
+        with self._lock:
+            self._in_use -= 1
+            reusable = (
+                not self._stop.is_set()
+                and not _is_closed(conn)
+                and len(self._idle) + self._in_use < self.max_size
+            )
+            if reusable:
+                self._idle.append(conn)
+                return
+        self._discard(conn)
+
+    # ----------------------------------------------------------------------------------
+    # ウォームアップ / キープアライブ
+    # ----------------------------------------------------------------------------------
+
+    def warm_up(self) -> int:
+        """プール内の接続が preopen 件になるまで事前に開く。開いた件数を返す。"""
+        opened = 0
+        while True:
+            with self._lock:
+                if len(self._idle) + self._in_use >= self.preopen:
+                    return opened
+            try:
+                conn = self._open()
+            except Exception as e:
+                logger.warning("Connection pool warm-up failed: %s", e)
+                return opened
+            with self._lock:
+                self._idle.append(conn)
+            opened += 1
+
+    def heartbeat(self) -> None:
+        """待機中の全接続へハートビートを送り、失敗した接続を入れ替える。
+
+        業務時間帯であればウェアハウスを起動状態に保つクエリも 1 回発行する。
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._in_use += len(idle)
+        alive: List[snowflake.connector.SnowflakeConnection] = []
+        for conn in idle:
+            try:
+                _execute(conn, HEARTBEAT_QUERY)
+                alive.append(conn)
+                with self._lock:
+                    self.stats.heartbeats += 1
+            except Exception as e:
+                logger.warning("Heartbeat failed, discarding pooled connection: %s", e)
+                with self._lock:
+                    self.stats.heartbeat_failures += 1
+                self._discard(conn)
+
+        keepalive = self.warehouse_keepalive
+        if alive and keepalive is not None and keepalive.is_active(self._now()):
+            try:
+                _execute(alive[0], keepalive.query)
+                with self._lock:
+                    self.stats.warehouse_pings += 1
+            except Exception as e:
+                logger.warning("Warehouse keep-alive query failed: %s", e)
+                with self._lock:
+                    self.stats.warehouse_ping_failures += 1
+
+        with self._lock:
+            self._in_use -= len(idle)
+            self._idle.extend(alive)
+            self.stats.last_heartbeat_at = time.time()
+        self.warm_up()
+
+    def _run_keepalive(self) -> None:
+        while not self._stop.wait(self.keepalive_interval):
+            try:
+                self.heartbeat()
+            except Exception:  # スレッドを止めない
+                logger.exception("Connection pool keep-alive iteration failed")
+
+    def start(self) -> None:
+        """事前オープンを行い、キープアライブスレッドを開始する (冪等)。"""
+        self._stop.clear()
+        opened = self.warm_up()
+        logger.info("Connection pool warmed up with %d session(s)", opened)
+        if self.keepalive_interval > 0 and self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run_keepalive, name="snowflake-pool-keepalive", daemon=True
+            )
+            self._thread.start()
+
+    def close(self) -> None:
+        """キープアライブを止め、待機中の接続を全て閉じる。"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._discard(conn)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """観測用の現在状態。"""
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "keepalive_interval_seconds": self.keepalive_interval,
+                "keepalive_running": self._thread is not None,
+                "warehouse_keepalive_active": bool(
+                    self.warehouse_keepalive
+                    and self.warehouse_keepalive.is_active(self._now())
+                ),
+                **vars(self.stats),
+            }
+
+
+def _is_closed(conn: snowflake.connector.SnowflakeConnection) -> bool:
+    is_closed = getattr(conn, "is_closed", None)
+    return bool(is_closed()) if callable(is_closed) else False
+
+
+def get_connection_pool(
+    factory: ConnectionFactory, env: EnvMapping | None = None
+) -> ConnectionPool | None:
+    """環境変数から接続プールを構築する。SNOWFLAKE_POOL_SIZE=0 なら None (プール無効)。"""
+    env = env or os.environ
+    size = get_int_env(env, "SNOWFLAKE_POOL_SIZE")
+    size = DEFAULT_POOL_SIZE if size is None else size
+    if size <= 0:
+        return None
+    preopen = get_int_env(env, "SNOWFLAKE_POOL_PREOPEN")
+    interval = get_int_env(env, "SNOWFLAKE_KEEPALIVE_INTERVAL_SECONDS")
+    return ConnectionPool(
+        factory,
+        max_size=size,
+        preopen=DEFAULT_POOL_PREOPEN if preopen is None else preopen,
+        keepalive_interval=(
+            DEFAULT_KEEPALIVE_INTERVAL_SECONDS if interval is None else interval
+        ),
+        warehouse_keepalive=get_warehouse_keepalive(env),
+    )
+
+
+__all__ = [
+    "DEFAULT_POOL_SIZE",
+    "DEFAULT_POOL_PREOPEN",
+    "DEFAULT_KEEPALIVE_INTERVAL_SECONDS",
+    "HEARTBEAT_QUERY",
+    "WarehouseKeepAlive",
+    "get_warehouse_keepalive",
+    "PoolStats",
+    "ConnectionPool",
+    "get_connection_pool",
+]
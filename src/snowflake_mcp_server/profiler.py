@@ -0,0 +1,138 @@
+"""プロセス内サンプリングプロファイラ。
+
+デーモンスレッドが一定間隔で全スレッドのスタック (sys._current_frames) を採取し、
+スタックごと・関数ごと (葉フレーム) のサンプル数を集計する。サーバ自身の CPU ホットスポットを
+調べるためのもので、管理用ツールから実行時に開始/停止する。停止中はコストが掛からない。
+壁時計ベースのサンプリングのため、待機中のスレッドも (待機している箇所として) 数える。
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+from typing import Any, Dict, Tuple
+
+DEFAULT_SAMPLE_INTERVAL_SECONDS = 0.01
+DEFAULT_MAX_STACKS = 10_000
+MAX_STACK_DEPTH = 64
+OTHER_STACK = ("<other>",)
+
+Stack = Tuple[str, ...]
+
+
+def format_frame(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}:{frame.f_lineno}"
+
+
+def frame_stack(frame: FrameType | None, max_depth: int = MAX_STACK_DEPTH) -> Stack:
+    """フレームを根から葉の順のタプルにする (深さ max_depth まで, 葉側を残す)。"""
+    frames = []
+    while frame is not None and len(frames) < max_depth:
+        frames.append(format_frame(frame))
+        frame = frame.f_back
+    return tuple(reversed(frames))
+
+
+class SamplingProfiler:
+    """周期的なスタックサンプリングによるプロファイラ (スレッドセーフ)。
+
+    異なるスタックの種類は max_stacks 件までとし、超えた分は OTHER_STACK に数える。
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_SAMPLE_INTERVAL_SECONDS,
+        max_stacks: int = DEFAULT_MAX_STACKS,
+    ) -> None:
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.samples = 0
+        self._stacks: Counter[Stack] = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """サンプリングを開始する。既に動作中なら False。"""
+        with self._lock:
+            if self.running:
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="snowflake-mcp-profiler", daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def stop(self) -> bool:
+        """サンプリングを停止する (集計は残す)。動作していなければ False。"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return False
+        self._stop.set()
+        thread.join()
+        return True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(exclude=own)
+
+    def sample(self, exclude: int | None = None) -> None:
+        """全スレッドのスタックを 1 回採取する。"""
+        stacks = [
+            frame_stack(frame)
+            for ident, frame in sys._current_frames().items()
+            if ident != exclude
+        ]
+        with self._lock:
+            self.samples += 1
+            for stack in stacks:
+                if stack in self._stacks or len(self._stacks) < self.max_stacks:
+                    self._stacks[stack] += 1
+                else:
+                    self._stacks[OTHER_STACK] += 1
+
+    def snapshot(self, top: int = 20) -> Dict[str, Any]:
+        """サンプル数の多いスタックと関数 (葉フレーム) の上位を返す。"""
+        with self._lock:
+            stacks = self._stacks.most_common(top)
+            functions: Counter[str] = Counter()
+            for stack, count in self._stacks.items():
+                if stack:
+                    functions[stack[-1]] += count
+            samples = self.samples
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "samples": samples,
+            "top_functions": [
+                {"frame": frame, "count": count}
+                for frame, count in functions.most_common(top)
+            ],
+            "top_stacks": [
+                {"stack": list(stack), "count": count} for stack, count in stacks
+            ],
+        }
+
+
+__all__ = [
+    "DEFAULT_SAMPLE_INTERVAL_SECONDS",
+    "format_frame",
+    "frame_stack",
+    "SamplingProfiler",
+]
@@ -0,0 +1,105 @@
+"""DESCRIBE 結果の列射影と名前フィルタ。
+
+DESCRIBE TABLE などは多数のプロパティ列を返し、その多くは空になる。DESCRIBE を実行した後、
+同じ接続で `TABLE(RESULT_SCAN('<query_id>'))` に対して必要な列と行だけを SELECT し、
+Snowflake 側で絞り込んだ分だけを取得する。全行 NULL の列は応答から落とす。
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Sequence
+
+import snowflake.connector
+
+from snowflake_mcp_server.connection import (
+    Query,
+    Statement,
+    execute_statement,
+    fetch_query,
+)
+from snowflake_mcp_server.query_validator import quote_identifier
+from snowflake_mcp_server.result_registry import validate_query_id
+from snowflake_mcp_server.tracing import NOOP_TRACER, Tracer
+
+# DESCRIBE 系の出力で対象の名前が入る列
+NAME_FIELD = "name"
+
+Fetch = Callable[
+    [snowflake.connector.SnowflakeConnection, Query], List[Dict[str, Any]]
+]
+
+
+def build_projection_query(
+    query_id: str | None,
+    fields: Sequence[str] | None = None,
+    name_filter: str | None = None,
+) -> Statement:
+    """RESULT_SCAN に対する射影・絞り込みの文を作る純関数。
+
+    DESCRIBE の出力列名は小文字のため fields は小文字に揃えて引用する。
+    name_filter は ILIKE パターン (`%` / `_` が使える)。クエリ ID とパターンは
+    バインド変数で渡す。query_id が None なら LAST_QUERY_ID() を参照する。
+
+    Raises:
+        ValueError: query_id の書式が不正な場合
+    """
+    params: List[Any] = []
+    if query_id is not None:
+        source = "?"
+        params.append(validate_query_id(query_id))
+    else:
+        source = "LAST_QUERY_ID()"
+    columns = (
+        ", ".join(quote_identifier(field.lower()) for field in fields) if fields else "*"
+    )
+    sql = f"SELECT {columns} FROM TABLE(RESULT_SCAN({source}))"
+    if name_filter:
+        sql += f" WHERE {quote_identifier(NAME_FIELD)} ILIKE ?"
+        params.append(name_filter)
+    return Statement(sql, tuple(params))
+
+
+def drop_null_fields(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """全行で None の列を取り除く純関数 (列順は保つ)。"""
+    if not rows:
+        return rows
+    keep = [key for key in rows[0] if any(row.get(key) is not None for row in rows)]
+    if len(keep) == len(rows[0]):
+        return rows
+    return [{key: row.get(key) for key in keep} for row in rows]
+
+
+def fetch_projected(
+    conn: snowflake.connector.SnowflakeConnection,
+    query: Query,
+    *,
+    fields: Sequence[str] | None = None,
+    name_filter: str | None = None,
+    fetch: Fetch = fetch_query,
+    tracer: Tracer = NOOP_TRACER,
+) -> List[Dict[str, Any]]:
+    """DESCRIBE 系クエリを実行し、その結果を RESULT_SCAN で射影・絞り込みして返す副作用関数。
+
+    fields も name_filter も無ければ結果をそのまま取得する。いずれの場合も全行 NULL の列は落とす。
+    """
+    if not fields and not name_filter:
+        return drop_null_fields(fetch(conn, query))
+    cursor = conn.cursor()
+    try:
+        with tracer.span("cursor.execute") as span:
+            execute_statement(cursor, query)
+            query_id = getattr(cursor, "sfqid", None)
+            if query_id:
+                span.set_attribute("snowflake.query_id", query_id)
+    finally:
+        cursor.close()
+    rows = fetch(conn, build_projection_query(query_id, fields, name_filter))
+    return drop_null_fields(rows)
+
+
+__all__ = [
+    "NAME_FIELD",
+    "build_projection_query",
+    "drop_null_fields",
+    "fetch_projected",
+]
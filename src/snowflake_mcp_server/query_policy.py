@@ -0,0 +1,281 @@
+"""サイト固有のクエリポリシー (許可する文の種類・禁止する関数/オブジェクト)。
+
+ルールは起動時に一度だけトークン列へコンパイルする。
+- 許可ルール (`SELECT`, `SHOW TABLES` など): 各文の先頭トークンをトライで照合する。
+- 禁止ルール (`EXT_FN`, `SECRET_DB.PRIVATE` など): クエリ中のどこに現れても一致するよう
+  トークン単位の Aho-Corasick オートマトンで一度の走査で照合する。
+- 単語の前方一致ルール (`SYSTEM$*`): 文字単位のトライで照合する。
+いずれも照合コストはクエリ長に比例し、ルール数には依存しない。
+"""
+
+from __future__ import annotations
+
+import os
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from snowflake_mcp_server.connection import EnvMapping
+from snowflake_mcp_server.query_validator import (
+    PUNCT,
+    QUOTED,
+    READ_ONLY_STATEMENTS,
+    WORD,
+    Token,
+    tokenize_sql,
+)
+
+_LITERAL_KEY = "\0literal"  # 文字列・数値・バインド変数はどのルールとも一致させない
+
+
+def _token_key(token: Token) -> str:
+    """照合用のキー。引用識別子は引用符を外し、非引用識別子 (大文字化済み) と揃える。"""
+    if token.kind == WORD or token.kind == PUNCT:
+        return token.text
+    if token.kind == QUOTED:
+        return token.text[1:-1].replace('""', '"')
+    return _LITERAL_KEY
+
+
+def compile_rule(rule: str) -> Tuple[Tuple[str, ...], bool]:
+    """ルール文字列を (照合キー列, 前方一致か) にする純関数。
+
+    末尾の `*` は単語 1 つだけのルールでのみ前方一致として扱う (例: `SYSTEM$*`)。
+
+    Raises:
+        ValueError: 空のルール、または複数トークンのルールに `*` がある場合
+    """
+    tokens = tokenize_sql(rule)
+    prefix = bool(tokens) and tokens[-1] == Token(PUNCT, "*")
+    if prefix:
+        tokens = tokens[:-1]
+        if len(tokens) != 1 or tokens[0].kind != WORD:
+            raise ValueError(f"Wildcard is only supported on a single word: {rule!r}")
+    if not tokens:
+        raise ValueError(f"Empty query policy rule: {rule!r}")
+    return tuple(_token_key(token) for token in tokens), prefix
+
+
+class TokenAutomaton:
+    """トークン列パターンの Aho-Corasick オートマトン。"""
+
+    def __init__(self, patterns: Iterable[Tuple[Sequence[str], str]] = ()) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[str | None] = [None]
+        for keys, rule in patterns:
+            self._insert(keys, rule)
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def _insert(self, keys: Sequence[str], rule: str) -> None:
+        state = 0
+        for key in keys:
+            nxt = self._goto[state].get(key)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][key] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+            state = nxt
+        if self._output[state] is None:
+            self._output[state] = rule
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for key, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and key not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(key, 0)
+                if self._output[nxt] is None:
+                    self._output[nxt] = self._output[self._fail[nxt]]
+
+    def search(self, keys: Iterable[str]) -> str | None:
+        """keys のどこかに現れる最初のパターンのルールを返す。"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for key in keys:
+            while state and key not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(key, 0)
+            if output[state] is not None:
+                return output[state]
+        return None
+
+    def match_prefix(self, keys: Iterable[str]) -> str | None:
+        """keys の先頭がいずれかのパターンで始まればそのルールを返す (アンカー付き照合)。"""
+        state = 0
+        for key in keys:
+            nxt = self._goto[state].get(key)
+            if nxt is None:
+                return None
+            state = nxt
+            if self._output[state] is not None:
+                return self._output[state]
+        return None
+
+
+class PrefixTrie:
+    """単語の前方一致ルール用の文字トライ。"""
+
+    _END = "\0rule"
+
+    def __init__(self, patterns: Iterable[Tuple[str, str]] = ()) -> None:
+        self._root: Dict[str, dict] = {}
+        for prefix, rule in patterns:
+            node = self._root
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node.setdefault(self._END, rule)
+
+    def match(self, word: str) -> str | None:
+        node = self._root
+        for char in word:
+            rule = node.get(self._END)
+            if rule is not None:
+                return rule
+            node = node.get(char)
+            if node is None:
+                return None
+        return node.get(self._END)
+
+
+def _split_statements(keys: Sequence[str]) -> Iterator[Sequence[str]]:
+    start = 0
+    for i, key in enumerate(keys):
+        if key == ";":
+            if i > start:
+                yield keys[start:i]
+            start = i + 1
+    if start < len(keys):
+        yield keys[start:]
+
+
+class QueryPolicy:
+    """コンパイル済みのクエリポリシー。インスタンスは bool を返す validator として使える。
+
+    全ての文 (`;` 区切り) が許可ルールのいずれかで始まり、かつ禁止ルールに
+    一致する箇所が無いクエリだけを許可する。
+    """
+
+    def __init__(
+        self,
+        allowed_statements: Iterable[str] = READ_ONLY_STATEMENTS,
+        denied: Iterable[str] = (),
+    ) -> None:
+        allowed_rules = list(allowed_statements)
+        denied_rules = list(denied)
+        allow: List[Tuple[Tuple[str, ...], str]] = []
+        for rule in allowed_rules:
+            keys, prefix = compile_rule(rule)
+            if prefix:
+                raise ValueError(f"Wildcard is not supported in allow rules: {rule!r}")
+            allow.append((keys, rule))
+        sequences: List[Tuple[Tuple[str, ...], str]] = []
+        prefixes: List[Tuple[str, str]] = []
+        for rule in denied_rules:
+            keys, prefix = compile_rule(rule)
+            if prefix:
+                prefixes.append((keys[0], rule))
+            else:
+                sequences.append((keys, rule))
+        self.rule_count = len(allowed_rules) + len(denied_rules)
+        self._allow = TokenAutomaton(allow)
+        self._deny = TokenAutomaton(sequences)
+        self._deny_prefix = PrefixTrie(prefixes)
+        self._has_prefix_rules = bool(prefixes)
+
+    def violation(self, query: str | None) -> str | None:
+        """違反の理由を返す。許可されるクエリなら None。"""
+        tokens = tokenize_sql(query)
+        keys = [_token_key(token) for token in tokens]
+        statements = list(_split_statements(keys))
+        if not statements:
+            return "empty query"
+        for statement in statements:
+            if self._allow.match_prefix(statement) is None:
+                return f"statement type not allowed: {statement[0]}"
+        rule = self._deny.search(keys)
+        if rule is None and self._has_prefix_rules:
+            rule = next(
+                (
+                    match
+                    for token in tokens
+                    if token.kind == WORD
+                    and (match := self._deny_prefix.match(token.text)) is not None
+                ),
+                None,
+            )
+        return f"denied by rule {rule!r}" if rule is not None else None
+
+    def __call__(self, query: str | None) -> bool:
+        return self.violation(query) is None
+
+
+# --------------------------------------------------------------------------------------
+# 設定
+# --------------------------------------------------------------------------------------
+
+
+def _split_rules(value: str | None) -> List[str]:
+    return [rule.strip() for rule in (value or "").split(",") if rule.strip()]
+
+
+def parse_policy_file(lines: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """`allow <rule>` / `deny <rule>` 形式の行を (許可ルール, 禁止ルール) にする純関数。
+
+    空行と `#` で始まる行は無視する。
+
+    Raises:
+        ValueError: 解釈できない行がある場合
+    """
+    allowed: List[str] = []
+    denied: List[str] = []
+    for number, line in enumerate(lines, 1):
+        text = line.strip()
+        if not text or text.startswith("#"):
+            continue
+        action, _, rule = text.partition(" ")
+        target = {"allow": allowed, "deny": denied}.get(action.lower())
+        if target is None or not rule.strip():
+            raise ValueError(f"Invalid query policy line {number}: {text!r}")
+        target.append(rule.strip())
+    return allowed, denied
+
+
+def get_query_policy(env: EnvMapping | None = None) -> QueryPolicy | None:
+    """環境変数からクエリポリシーを構築する。
+
+    SNOWFLAKE_ALLOWED_STATEMENTS / SNOWFLAKE_DENIED_PATTERNS (カンマ区切り) と
+    SNOWFLAKE_QUERY_POLICY_FILE (1 行 1 ルール) のルールを合わせる。
+    許可ルールが 1 つも無ければ READ_ONLY_STATEMENTS を使う。
+    いずれも未設定なら None (既定の is_read_only_query を使う)。
+    """
+    env = env or os.environ
+    allowed = _split_rules(env.get("SNOWFLAKE_ALLOWED_STATEMENTS"))
+    denied = _split_rules(env.get("SNOWFLAKE_DENIED_PATTERNS"))
+    path = env.get("SNOWFLAKE_QUERY_POLICY_FILE")
+    if path:
+        with open(os.path.expanduser(path), encoding="utf-8") as f:
+            file_allowed, file_denied = parse_policy_file(f)
+        allowed += file_allowed
+        denied += file_denied
+    if not path and not allowed and not denied:
+        return None
+    return QueryPolicy(allowed or READ_ONLY_STATEMENTS, denied)
+
+
+__all__ = [
+    "compile_rule",
+    "TokenAutomaton",
+    "PrefixTrie",
+    "QueryPolicy",
+    "parse_policy_file",
+    "get_query_policy",
+]
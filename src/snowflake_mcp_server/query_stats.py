@@ -0,0 +1,241 @@
+"""SQL フィンガープリントとフィンガープリントごとの実行統計。
+
+リテラル (文字列・数値・バインド変数) を `?` に、IN リストを `(?+)` にまとめた正規形で
+クエリの「形」を識別し、形ごとに件数・合計/p95 レイテンシ・行数・バイト数・エラー率を集計する。
+監視する形の数は Space-Saving (heavy hitters) で上限を設け、メモリを一定に保つ。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+from snowflake_mcp_server.connection import EnvMapping, get_int_env
+from snowflake_mcp_server.query_validator import (
+    NUMBER,
+    PARAM,
+    STRING,
+    Token,
+    tokenize_sql,
+)
+
+DEFAULT_MAX_FINGERPRINTS = 256
+DEFAULT_LATENCY_SAMPLES = 128
+TOP_QUERIES_ORDER = ("count", "total_latency", "p95_latency", "errors", "bytes")
+
+_LITERAL_KINDS = frozenset((STRING, NUMBER, PARAM))
+
+
+# --------------------------------------------------------------------------------------
+# フィンガープリント (純関数)
+# --------------------------------------------------------------------------------------
+
+
+def _collapse_in_lists(parts: List[str]) -> List[str]:
+    """`IN ( ? , ? , ... )` を `IN ( ?+ )` にまとめる。"""
+    collapsed: List[str] = []
+    i = 0
+    while i < len(parts):
+        if parts[i] == "IN" and i + 2 < len(parts) and parts[i + 1] == "(":
+            j = i + 2
+            while j + 1 < len(parts) and parts[j] == "?" and parts[j + 1] == ",":
+                j += 2
+            if j + 1 < len(parts) and parts[j] == "?" and parts[j + 1] == ")":
+                collapsed.extend(("IN", "(", "?+", ")"))
+                i = j + 2
+                continue
+        collapsed.append(parts[i])
+        i += 1
+    return collapsed
+
+
+def fingerprint_tokens(tokens: Sequence[Token]) -> str:
+    """トークン列からリテラル非依存の正規形テキストを作る純関数。"""
+    parts = ["?" if token.kind in _LITERAL_KINDS else token.text for token in tokens]
+    while parts and parts[-1] == ";":
+        parts.pop()
+    return " ".join(_collapse_in_lists(parts))
+
+
+def normalize_fingerprint(sql: str) -> str:
+    """SQL をリテラル非依存の正規形テキストにする。
+
+    例: `select * from t where id in (1, 2, 3) and name = 'x'`
+        -> `SELECT * FROM T WHERE ID IN ( ?+ ) AND NAME = ?`
+    """
+    return fingerprint_tokens(tokenize_sql(sql))
+
+
+def _hash_fingerprint(normalized: str) -> str:
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def sql_fingerprint(sql: str) -> str:
+    """正規形テキストの短いハッシュ (リテラルだけが異なる SQL は同じ値になる)。"""
+    return _hash_fingerprint(normalize_fingerprint(sql))
+
+
+# --------------------------------------------------------------------------------------
+# 統計
+# --------------------------------------------------------------------------------------
+
+
+@dataclass
+class FingerprintStats:
+    """1 つのフィンガープリントの集計値。
+
+    count は Space-Saving の推定値で、count_error はその過大評価の上限。
+    レイテンシの p95 は上限付きのリザーバサンプルから求める。
+    """
+
+    fingerprint: str
+    sql: str
+    count: int = 0
+    count_error: int = 0
+    errors: int = 0
+    total_latency: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    latency_samples: List[float] = field(default_factory=list)
+    observed: int = 0  # この監視期間中に実際に記録した件数 (リザーバ用)
+
+    @property
+    def p95_latency(self) -> float:
+        if not self.latency_samples:
+            return 0.0
+        ordered = sorted(self.latency_samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        observed = self.observed or 1
+        return {
+            "fingerprint": self.fingerprint,
+            "sql": self.sql,
+            "count": self.count,
+            "count_error": self.count_error,
+            "error_rate": round(self.errors / observed, 4),
+            "total_latency_ms": round(self.total_latency * 1000, 3),
+            "mean_latency_ms": round(self.total_latency * 1000 / observed, 3),
+            "p95_latency_ms": round(self.p95_latency * 1000, 3),
+            "rows": self.rows,
+            "bytes": self.bytes,
+        }
+
+
+_SORT_KEYS = {
+    "count": lambda s: s.count,
+    "total_latency": lambda s: s.total_latency,
+    "p95_latency": lambda s: s.p95_latency,
+    "errors": lambda s: s.errors,
+    "bytes": lambda s: s.bytes,
+}
+
+
+class QueryStats:
+    """フィンガープリントごとの統計を Space-Saving で上限付きに保持する (スレッドセーフ)。
+
+    監視数が max_fingerprints に達した状態で新しい形が来ると、件数最小のエントリを置き換え、
+    その件数を新エントリの count / count_error に引き継ぐ (件数は過大評価のみで、上位は保たれる)。
+    """
+
+    def __init__(
+        self,
+        max_fingerprints: int = DEFAULT_MAX_FINGERPRINTS,
+        latency_samples: int = DEFAULT_LATENCY_SAMPLES,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.max_fingerprints = max(1, max_fingerprints)
+        self.latency_samples = latency_samples
+        self._rng = rng or random.Random()
+        self._entries: Dict[str, FingerprintStats] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(
+        self,
+        sql: str,
+        latency: float,
+        *,
+        rows: int = 0,
+        bytes: int = 0,
+        error: bool = False,
+    ) -> FingerprintStats:
+        """1 回の実行を記録する。"""
+        normalized = normalize_fingerprint(sql)
+        fingerprint = _hash_fingerprint(normalized)
+        with self._lock:
+            stats = self._entries.get(fingerprint)
+            if stats is None:
+                stats = self._admit(fingerprint, normalized)
+            stats.count += 1
+            stats.observed += 1
+            stats.errors += int(error)
+            stats.total_latency += latency
+            stats.rows += rows
+            stats.bytes += bytes
+            self._sample_latency(stats, latency)
+            return stats
+
+    def _admit(self, fingerprint: str, normalized: str) -> FingerprintStats:
+        stats = FingerprintStats(fingerprint, normalized)
+        if len(self._entries) >= self.max_fingerprints:
+            victim = min(self._entries.values(), key=lambda s: s.count)
+            del self._entries[victim.fingerprint]
+            stats.count = stats.count_error = victim.count
+        self._entries[fingerprint] = stats
+        return stats
+
+    def _sample_latency(self, stats: FingerprintStats, latency: float) -> None:
+        # Algorithm R によるリザーバサンプリング
+        if len(stats.latency_samples) < self.latency_samples:
+            stats.latency_samples.append(latency)
+            return
+        slot = self._rng.randrange(stats.observed)
+        if slot < self.latency_samples:
+            stats.latency_samples[slot] = latency
+
+    def top(self, limit: int = 20, order_by: str = "count") -> List[Dict[str, Any]]:
+        """order_by の降順で上位 limit 件を返す。
+
+        Raises:
+            ValueError: 未知の order_by
+        """
+        key = _SORT_KEYS.get(order_by)
+        if key is None:
+            raise ValueError(
+                f"Unsupported order_by {order_by!r}. Use one of {TOP_QUERIES_ORDER}"
+            )
+        with self._lock:
+            ranked = sorted(self._entries.values(), key=key, reverse=True)[:limit]
+            return [stats.to_dict() for stats in ranked]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def get_query_stats(env: EnvMapping | None = None) -> QueryStats:
+    """環境変数 SNOWFLAKE_QUERY_STATS_MAX_FINGERPRINTS から統計を構築する。"""
+    env = env or os.environ
+    max_fingerprints = get_int_env(env, "SNOWFLAKE_QUERY_STATS_MAX_FINGERPRINTS")
+    return QueryStats(
+        DEFAULT_MAX_FINGERPRINTS if max_fingerprints is None else max_fingerprints
+    )
+
+
+__all__ = [
+    "DEFAULT_MAX_FINGERPRINTS",
+    "TOP_QUERIES_ORDER",
+    "fingerprint_tokens",
+    "normalize_fingerprint",
+    "sql_fingerprint",
+    "FingerprintStats",
+    "QueryStats",
+    "get_query_stats",
+]
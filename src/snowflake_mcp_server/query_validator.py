@@ -1,11 +1,12 @@
 """クエリバリデーション (関数型スタイル)。
 
-読み取り専用クエリの判定を行う純関数を提供する。
+読み取り専用クエリの判定と、SQL の字句解析 (トークン化)・識別子の検証/引用を行う純関数を提供する。
 """
 
 from __future__ import annotations
 
-from typing import Iterable, Sequence
+import re
+from typing import Iterable, List, NamedTuple, Sequence
 
 READ_ONLY_STATEMENTS: Sequence[str] = (
     "SELECT",
@@ -38,8 +39,105 @@ def is_read_only_query(
     return any(normalized.startswith(prefix) for prefix in read_only_prefixes)
 
 
+# --------------------------------------------------------------------------------------
+# トークン化
+# --------------------------------------------------------------------------------------
+
+# トークン種別
+WORD = "word"  # キーワード / 非引用識別子 (SYSTEM$... や $1 を含む)
+QUOTED = "quoted"  # "引用識別子"
+STRING = "string"  # '文字列' / $$文字列$$
+NUMBER = "number"
+PARAM = "param"  # バインド変数 (?, :name, %s, %(name)s)
+PUNCT = "punct"  # 演算子・区切り
+
+_TOKEN_PATTERN = re.compile(
+    r"""
+      (?P<space>\s+)
+    | (?P<comment>--[^\n]*|//[^\n]*|/\*.*?(?:\*/|\Z))
+    | (?P<string>'(?:[^'\\]|\\.|'')*'|\$\$.*?\$\$)
+    | (?P<quoted>"(?:[^"]|"")*")
+    | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    | (?P<param>\?|:[A-Za-z_]\w*|%s|%\(\w+\)s)
+    | (?P<word>[A-Za-z_][\w$]*|\$\d+)
+    | (?P<punct>::|<=|>=|<>|!=|\|\||=>|->|.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+
+
+def tokenize_sql(query: str | None) -> List[Token]:
+    """SQL をトークン列にする純関数。空白とコメントは捨てる。
+
+    WORD トークンは大文字化する (非引用識別子・キーワードは大文字小文字を区別しないため)。
+    """
+    if not query:
+        return []
+    tokens: List[Token] = []
+    for match in _TOKEN_PATTERN.finditer(query):
+        kind = match.lastgroup
+        if kind == "space" or kind == "comment":
+            continue
+        text = match.group()
+        tokens.append(Token(kind, text.upper() if kind == WORD else text))
+    return tokens
+
+
+# --------------------------------------------------------------------------------------
+# 識別子とリテラル
+# --------------------------------------------------------------------------------------
+
+
+def parse_qualified_name(text: str | None, max_parts: int = 3) -> List[str]:
+    """`[database.][schema.]name` 形式の名前を部分ごとの識別子に分ける純関数。
+
+    各部は非引用識別子 (大文字化) または "引用識別子" (引用符付きのまま) で、
+    それ以外のトークン (空白区切りの語句・演算子・リテラル) を含む名前は拒否する。
+
+    Raises:
+        ValueError: 識別子と `.` 以外を含む、または max_parts を超える場合
+    """
+    tokens = tokenize_sql(text)
+    parts = [token.text for token in tokens[::2] if token.kind in (WORD, QUOTED)]
+    separators = tokens[1::2]
+    if (
+        not parts
+        or len(parts) * 2 - 1 != len(tokens)
+        or len(parts) > max_parts
+        or any(token != Token(PUNCT, ".") for token in separators)
+    ):
+        raise ValueError(f"Invalid object name: {text!r}")
+    return parts
+
+
+def quote_identifier(name: str) -> str:
+    """カタログ上の名前を引用識別子にする (`"` は二重化)。"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_literal(value: str) -> str:
+    """文字列リテラルにする (Snowflake では `\\` もエスケープ文字のため二重化)。"""
+    return "'" + value.replace("\\", "\\\\").replace("'", "''") + "'"
+
+
 __all__ = [
     "READ_ONLY_STATEMENTS",
     "normalize_query",
     "is_read_only_query",
+    "WORD",
+    "QUOTED",
+    "STRING",
+    "NUMBER",
+    "PARAM",
+    "PUNCT",
+    "Token",
+    "tokenize_sql",
+    "parse_qualified_name",
+    "quote_identifier",
+    "sql_literal",
 ]
@@ -0,0 +1,101 @@
+"""直近のクエリ ID レジストリと RESULT_SCAN による再利用 (関数型スタイル寄り)。
+
+Snowflake はクエリ結果を 24 時間保持するため、フォローアップの絞り込みや集計は
+`TABLE(RESULT_SCAN('<query_id>'))` に対して実行すればベーステーブルを再スキャンしない。
+セッションごとに直近のクエリ ID を上限付きで記録し、省略時の参照先とする。
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List
+
+# Snowflake のクエリ ID (例: 01b2c3d4-0000-1234-0000-00000000abcd)
+QUERY_ID_PATTERN = re.compile(r"^[0-9A-Fa-f]{8}(-[0-9A-Fa-f]{4}){3}-[0-9A-Fa-f]{12}$")
+PREVIOUS_RESULT_NAME = "previous_result"
+
+
+@dataclass(frozen=True)
+class RecordedQuery:
+    """レジストリに記録したクエリ。"""
+
+    query_id: str
+    sql: str
+
+
+class QueryRegistry:
+    """セッションごとの直近クエリ ID を保持する上限付きレジストリ (スレッドセーフ)。
+
+    セッション数・セッションあたりの件数とも上限を超えると古いものから捨てる。
+    """
+
+    def __init__(self, max_per_session: int = 20, max_sessions: int = 100) -> None:
+        self.max_per_session = max_per_session
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, OrderedDict[str, RecordedQuery]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def record(self, session: str, query_id: str, sql: str) -> None:
+        with self._lock:
+            queries = self._sessions.setdefault(session, OrderedDict())
+            self._sessions.move_to_end(session)
+            queries[query_id] = RecordedQuery(query_id, sql)
+            queries.move_to_end(query_id)
+            while len(queries) > self.max_per_session:
+                queries.popitem(last=False)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def latest(self, session: str) -> RecordedQuery | None:
+        with self._lock:
+            queries = self._sessions.get(session)
+            if not queries:
+                return None
+            return next(reversed(queries.values()))
+
+    def recent(self, session: str) -> List[RecordedQuery]:
+        """新しい順のクエリ一覧。"""
+        with self._lock:
+            return list(reversed(self._sessions.get(session, {}).values()))
+
+
+def validate_query_id(query_id: str) -> str:
+    """クエリ ID の書式を検証する (SQL へ埋め込むため)。
+
+    Raises:
+        ValueError: 書式が不正な場合
+    """
+    if not QUERY_ID_PATTERN.match(query_id):
+        raise ValueError(f"Invalid Snowflake query id: {query_id!r}")
+    return query_id
+
+
+def build_result_scan_query(query_id: str, sql: str) -> str:
+    """`previous_result` を RESULT_SCAN の結果として参照できるよう SQL を包む純関数。
+
+    例: `SELECT region, SUM(amount) FROM previous_result GROUP BY region`
+    """
+    cte = (
+        f"{PREVIOUS_RESULT_NAME} AS "
+        f"(SELECT * FROM TABLE(RESULT_SCAN('{validate_query_id(query_id)}')))"
+    )
+    stripped = sql.strip().rstrip(";")
+    head = stripped.split(None, 1)
+    if head and head[0].upper() == "WITH" and len(head) == 2:
+        return f"WITH {cte}, {head[1]}"
+    return f"WITH {cte} {stripped}"
+
+
+__all__ = [
+    "QUERY_ID_PATTERN",
+    "PREVIOUS_RESULT_NAME",
+    "RecordedQuery",
+    "QueryRegistry",
+    "validate_query_id",
+    "build_result_scan_query",
+]
@@ -0,0 +1,112 @@
+"""見積りコストに基づくウェアハウスルーティング (関数型スタイル)。
+
+EXPLAIN の見積り (PlanEstimate) から small / large どちらのウェアハウスで
+実行するかを決め、接続セッションへ `USE WAREHOUSE` を発行する。
+ルーティング設定が無い場合は従来通り SNOWFLAKE_WAREHOUSE のみを使う。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass
+
+import snowflake.connector
+
+from snowflake_mcp_server.connection import EnvMapping, Query, get_int_env
+from snowflake_mcp_server.explain import (
+    Explainer,
+    PlanEstimate,
+    explain_query,
+    is_explainable,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SMALL_BYTES = 1024**3  # 1 GiB
+
+
+@dataclass(frozen=True)
+class WarehouseRoutingPolicy:
+    """small / large ウェアハウスの振り分けポリシー。
+
+    bytes_assigned が max_small_bytes 以下、かつ (設定されていれば)
+    partitions_assigned が max_small_partitions 以下なら small を選ぶ。
+    """
+
+    small_warehouse: str
+    large_warehouse: str
+    max_small_bytes: int = DEFAULT_MAX_SMALL_BYTES
+    max_small_partitions: int | None = None
+
+    def choose_warehouse(self, estimate: PlanEstimate) -> str:
+        """見積りから実行先ウェアハウス名を返す純関数。"""
+        if estimate.bytes_assigned > self.max_small_bytes:
+            return self.large_warehouse
+        if (
+            self.max_small_partitions is not None
+            and estimate.partitions_assigned > self.max_small_partitions
+        ):
+            return self.large_warehouse
+        return self.small_warehouse
+
+
+def get_routing_policy(env: EnvMapping | None = None) -> WarehouseRoutingPolicy | None:
+    """環境変数からルーティングポリシーを構築する。
+
+    SNOWFLAKE_SMALL_WAREHOUSE と SNOWFLAKE_LARGE_WAREHOUSE の両方が
+    設定されている場合のみ有効。未設定なら None (ルーティング無効)。
+    """
+    env = env or os.environ
+
+    small = env.get("SNOWFLAKE_SMALL_WAREHOUSE")
+    large = env.get("SNOWFLAKE_LARGE_WAREHOUSE")
+    if not small or not large:
+        return None
+
+    max_bytes = get_int_env(env, "SNOWFLAKE_ROUTING_MAX_SMALL_BYTES")
+    return WarehouseRoutingPolicy(
+        small_warehouse=small,
+        large_warehouse=large,
+        max_small_bytes=DEFAULT_MAX_SMALL_BYTES if max_bytes is None else max_bytes,
+        max_small_partitions=get_int_env(env, "SNOWFLAKE_ROUTING_MAX_SMALL_PARTITIONS"),
+    )
+
+
+def route_warehouse(
+    conn: snowflake.connector.SnowflakeConnection,
+    query: Query,
+    policy: WarehouseRoutingPolicy,
+    explain: Explainer = explain_query,
+) -> str | None:
+    """見積りに従いセッションのウェアハウスを切り替える (副作用: USE WAREHOUSE)。
+
+    EXPLAIN できないクエリや見積りに失敗した場合は切り替えず None を返し、
+    接続時のデフォルトウェアハウスで実行させる。
+
+    Returns:
+        切り替え先ウェアハウス名、切り替えなしの場合は None
+    """
+    if not is_explainable(query):
+        return None
+    try:
+        estimate = explain(conn, query)
+    except Exception as e:  # 見積り失敗はルーティングしないだけで致命的ではない
+        logger.warning("Warehouse routing skipped, EXPLAIN failed: %s", e)
+        return None
+
+    warehouse = policy.choose_warehouse(estimate)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"USE WAREHOUSE {warehouse}")
+    finally:
+        cursor.close()
+    return warehouse
+
+
+__all__ = [
+    "DEFAULT_MAX_SMALL_BYTES",
+    "WarehouseRoutingPolicy",
+    "get_routing_policy",
+    "route_warehouse",
+]
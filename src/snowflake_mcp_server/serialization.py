@@ -0,0 +1,229 @@
+"""MCP レスポンス用のコンパクトなシリアライザ (関数型スタイル)。
+
+FastMCP の汎用シリアライズ (インデント付き JSON, Decimal/datetime のフォールバック)
+を通さず、Snowflake でよく返る型を型ごとの変換表で直接テキスト化する。
+JSON に加えて、モデルにとって密度の高い CSV / TSV / Markdown 表形式を選べる。
+"""
+
+from __future__ import annotations
+
+import base64
+import csv
+import io
+import json
+import math
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Mapping, Sequence
+
+from snowflake_mcp_server.connection import QueryResult, RawJSON
+
+OUTPUT_FORMATS = ("json", "csv", "tsv", "markdown")
+
+
+# --------------------------------------------------------------------------------------
+# JSON 断片への変換 (型 -> 変換関数の表で分岐を 1 回の dict 参照にする)
+# --------------------------------------------------------------------------------------
+
+_dumps_str = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def _json_float(value: float) -> str:
+    return repr(value) if math.isfinite(value) else "null"
+
+
+def _json_decimal(value: Decimal) -> str:
+    # 固定小数点は精度を保ったまま数値リテラルとして出力する
+    return str(value) if value.is_finite() else "null"
+
+
+def _json_bytes(value: bytes | bytearray | memoryview) -> str:
+    return '"' + base64.b64encode(bytes(value)).decode("ascii") + '"'
+
+
+_JSON_ENCODERS: Dict[type, Callable[[Any], str]] = {
+    str: _dumps_str,
+    RawJSON: str,
+    int: str,
+    bool: lambda v: "true" if v else "false",
+    float: _json_float,
+    Decimal: _json_decimal,
+    datetime: lambda v: '"' + v.isoformat() + '"',
+    date: lambda v: '"' + v.isoformat() + '"',
+    time: lambda v: '"' + v.isoformat() + '"',
+    bytes: _json_bytes,
+    bytearray: _json_bytes,
+    memoryview: _json_bytes,
+    type(None): lambda v: "null",
+}
+
+
+def _json_fallback(value: Any) -> str:
+    # サブクラス等: 表に無い型は isinstance で親の変換を探し、最後は文字列化
+    for base, encoder in _JSON_ENCODERS.items():
+        if isinstance(value, base):
+            return encoder(value)
+    return _dumps_str(str(value))
+
+
+def json_value(value: Any) -> str:
+    """単一の値を JSON テキスト断片へ変換する純関数。"""
+    encoder = _JSON_ENCODERS.get(type(value))
+    if encoder is None:
+        return _json_fallback(value)
+    return encoder(value)
+
+
+def to_json(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    """行を `[{"col": value, ...}, ...]` 形式のコンパクトな JSON テキストにする。"""
+    keys = [_dumps_str(column) + ":" for column in columns]
+    encoders = _JSON_ENCODERS
+    parts: List[str] = []
+    for row in rows:
+        fields = []
+        for key, value in zip(keys, row):
+            encoder = encoders.get(type(value))
+            fields.append(
+                key + (encoder(value) if encoder else _json_fallback(value))
+            )
+        parts.append("{" + ",".join(fields) + "}")
+    return "[" + ",".join(parts) + "]"
+
+
+def records_to_json(records: Sequence[Mapping[str, Any]]) -> str:
+    """fetch_query 形式 (List[Dict]) をコンパクトな JSON テキストにする。"""
+    if not records:
+        return "[]"
+    columns = list(records[0].keys())
+    return to_json(columns, [tuple(record.values()) for record in records])
+
+
+# --------------------------------------------------------------------------------------
+# 表形式 (CSV / TSV / Markdown)
+# --------------------------------------------------------------------------------------
+
+
+def text_value(value: Any) -> str:
+    """表形式セル用の文字列表現。NULL は空文字。"""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    return str(value)
+
+
+def to_delimited(
+    columns: Sequence[str], rows: Sequence[Sequence[Any]], delimiter: str = ","
+) -> str:
+    """ヘッダ付き CSV (delimiter="\\t" で TSV) テキストにする。"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator="\n")
+    writer.writerow(columns)
+    writer.writerows([text_value(v) for v in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _markdown_cell(value: Any) -> str:
+    return text_value(value).replace("|", "\\|").replace("\n", " ")
+
+
+def to_markdown(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    """Markdown 表テキストにする。"""
+    lines = [
+        "| " + " | ".join(_markdown_cell(c) for c in columns) + " |",
+        "|" + "---|" * len(columns),
+    ]
+    lines.extend(
+        "| " + " | ".join(_markdown_cell(v) for v in row) + " |" for row in rows
+    )
+    return "\n".join(lines) + "\n"
+
+
+def serialize_rows(
+    columns: Sequence[str], rows: Sequence[Sequence[Any]], output_format: str = "json"
+) -> str:
+    """指定フォーマットで行をテキスト化する。
+
+    Raises:
+        ValueError: 未知のフォーマット
+    """
+    if output_format == "json":
+        return to_json(columns, rows)
+    if output_format == "csv":
+        return to_delimited(columns, rows, ",")
+    if output_format == "tsv":
+        return to_delimited(columns, rows, "\t")
+    if output_format == "markdown":
+        return to_markdown(columns, rows)
+    raise ValueError(
+        f"Unsupported output format {output_format!r}. Use one of {OUTPUT_FORMATS}"
+    )
+
+
+def serialize_result(result: QueryResult, output_format: str = "json") -> List[str]:
+    """QueryResult を MCP のテキストコンテンツ (文字列のリスト) にする。
+
+    打ち切られた結果にはその旨を示すテキストを、クエリ ID が分かれば
+    フォローアップ (query_previous_result) 用にその ID を示すテキストを続けて付ける。
+    """
+    contents = [serialize_rows(result.columns, result.rows, output_format)]
+    if result.truncated:
+        contents.append(
+            f"Result truncated after {len(result.rows)} rows "
+            f"(~{result.estimated_bytes} bytes): the response size limit was reached. "
+            "Narrow the query or add LIMIT."
+        )
+    if result.query_id:
+        contents.append(f"query_id: {result.query_id}")
+    return contents
+
+
+# --------------------------------------------------------------------------------------
+# サイズ見積り (fetch 中に呼ばれるため serialize せずに概算する)
+# --------------------------------------------------------------------------------------
+
+_SIZE_ESTIMATORS: Dict[type, Callable[[Any], int]] = {
+    str: lambda v: len(v) + 2,
+    RawJSON: len,
+    int: lambda v: 20,
+    bool: lambda v: 5,
+    float: lambda v: 24,
+    Decimal: lambda v: 40,
+    datetime: lambda v: 34,
+    date: lambda v: 12,
+    time: lambda v: 17,
+    bytes: lambda v: len(v) * 4 // 3 + 4,
+    bytearray: lambda v: len(v) * 4 // 3 + 4,
+    type(None): lambda v: 4,
+}
+
+
+def estimate_row_size(columns: Sequence[str], row: Sequence[Any]) -> int:
+    """1 行をコンパクト JSON にしたときのおおよそのバイト数 (キーと区切りを含む)。"""
+    size = 2
+    for column, value in zip(columns, row):
+        estimator = _SIZE_ESTIMATORS.get(type(value))
+        size += len(column) + 4
+        size += estimator(value) if estimator else len(str(value)) + 2
+    return size
+
+
+__all__ = [
+    "OUTPUT_FORMATS",
+    "RawJSON",
+    "json_value",
+    "to_json",
+    "records_to_json",
+    "text_value",
+    "to_delimited",
+    "to_markdown",
+    "serialize_rows",
+    "serialize_result",
+    "estimate_row_size",
+]
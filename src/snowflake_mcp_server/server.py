@@ -5,45 +5,195 @@
 
 from __future__ import annotations
 
-from typing import Awaitable, Callable, Dict, List, Any
+import inspect
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    Any,
+    Literal,
+    Sequence,
+    TypeVar,
+)
 
-from mcp.server.fastmcp import FastMCP
+import anyio
+import anyio.to_thread
+from mcp.server.fastmcp import Context, FastMCP
 from snowflake_mcp_server.connection import (
+    EnvMapping,
+    Query,
+    QueryResult,
+    Statement,
+    bind_identifier,
+    get_int_env,
+    statement_key,
+    statement_text,
     open_connection,
     fetch_query,
+    fetch_query_async,
+    fetch_result_async,
     close_connection,
+    get_fetch_workers,
+)
+from snowflake_mcp_server.cost_guard import CostBudget, check_cost, get_cost_budget
+from snowflake_mcp_server.disk_cache import (
+    DiskCache,
+    get_disk_cache,
+    get_query_cache_ttl,
+)
+from snowflake_mcp_server.export import (
+    export_to_file,
+    get_export_dir,
+    get_export_workers,
+    resolve_export_path,
 )
+from snowflake_mcp_server.explain import (
+    PlanCache,
+    cached_explainer,
+    is_explainable,
+    normalize_sql_for_plan,
+)
+from snowflake_mcp_server.pool import ConnectionPool, get_connection_pool
+from snowflake_mcp_server.profiler import SamplingProfiler
+from snowflake_mcp_server.projection import fetch_projected
+from snowflake_mcp_server.query_policy import get_query_policy
+from snowflake_mcp_server.query_stats import QueryStats, get_query_stats
 from snowflake_mcp_server.query_validator import is_read_only_query
+from snowflake_mcp_server.result_registry import (
+    QueryRegistry,
+    build_result_scan_query,
+)
+from snowflake_mcp_server.routing import (
+    WarehouseRoutingPolicy,
+    get_routing_policy,
+    route_warehouse,
+)
+from snowflake_mcp_server.serialization import (
+    estimate_row_size,
+    records_to_json,
+    serialize_result,
+)
+from snowflake_mcp_server.session import (
+    apply_session_parameters,
+    build_query_tag,
+    get_statement_timeout,
+)
+from snowflake_mcp_server.slow_query_log import (
+    SlowQueryLog,
+    SlowQueryTracer,
+    get_slow_query_log,
+)
+from snowflake_mcp_server.table_profile import (
+    DEFAULT_PROFILE_SAMPLE_ROWS,
+    ProfileCache,
+    get_profile_sample_rows,
+    profile_table,
+)
+from snowflake_mcp_server.tracing import NOOP_TRACER, Span, Tracer, get_tracer
 import snowflake.connector
 
 # 型エイリアス
 AsyncTool = Callable[..., Awaitable[List[Dict[str, Any]]]]
 ConnectionFactory = Callable[[], snowflake.connector.SnowflakeConnection]
+# 実行直前に同じ接続へ適用するフック (ウェアハウス切替など)
+PrepareHook = Callable[[snowflake.connector.SnowflakeConnection, Query], Any]
+Fetch = Callable[[snowflake.connector.SnowflakeConnection, Query], Any]
+T = TypeVar("T")
+
+# オブジェクト名はバインドするため、文のテキストは対象によらず一定
+DESCRIBE_TABLE = "DESCRIBE TABLE IDENTIFIER(?)"
+DESCRIBE_SCHEMA = "DESCRIBE SCHEMA IDENTIFIER(?)"
+DESCRIBE_DATABASE = "DESCRIBE DATABASE IDENTIFIER(?)"
 
 
 async def _execute_with_connection(
-    connection_factory: ConnectionFactory, query: str
-) -> List[Dict[str, Any]]:
-    """接続を開いてクエリを実行し、確実にクローズする。"""
-    conn = connection_factory()
+    connection_factory: ConnectionFactory,
+    query: Query,
+    prepare: Sequence[PrepareHook] = (),
+    fetch: Fetch = fetch_query_async,
+    release: Callable[[snowflake.connector.SnowflakeConnection], None] = (
+        close_connection
+    ),
+    tracer: Tracer = NOOP_TRACER,
+) -> Any:
+    """接続を開いてクエリを実行し、確実にクローズ (プール利用時は返却) する。
+
+    prepare のフックは実行前に順に呼ばれ、同じセッションに対して作用する。
+    fetch で結果の取得方法 (既定: List[Dict] を返す fetch_query_async) を差し替えられる。
+    コルーチン関数の fetch はそのまま await し、同期関数の fetch はワーカースレッドで実行する。
+    接続取得・prepare フック・返却もワーカースレッドで行い、イベントループを塞がない。
+    返却はキャンセルされても必ず完了させる。
+    接続取得と prepare フックはそれぞれ tracer のスパンとして記録される。
+    """
+
+    def open_and_prepare() -> snowflake.connector.SnowflakeConnection:
+        with tracer.span("open_connection"):
+            conn = connection_factory()
+        try:
+            with tracer.span("prepare"):
+                for hook in prepare:
+                    hook(conn, query)
+        except BaseException:
+            release(conn)
+            raise
+        return conn
+
+    conn = await anyio.to_thread.run_sync(open_and_prepare)
     try:
-        return fetch_query(conn, query)
+        if inspect.iscoroutinefunction(fetch):
+            return await fetch(conn, query)
+        return await anyio.to_thread.run_sync(fetch, conn, query)
     finally:
-        close_connection(conn)
+        with anyio.CancelScope(shield=True):
+            await anyio.to_thread.run_sync(release, conn)
+
+
+def get_max_result_bytes(env: EnvMapping | None = None) -> int | None:
+    """環境変数 SNOWFLAKE_MAX_RESULT_BYTES から query 結果の上限バイト数を得る (未設定は無制限)。"""
+    env = env or os.environ
+    return get_int_env(env, "SNOWFLAKE_MAX_RESULT_BYTES")
+
+
+def _request_identity(ctx: Context | None) -> tuple[str | None, str | None]:
+    """MCP コンテキストから (request_id, client_id) を取り出す。リクエスト外では None。"""
+    if ctx is None:
+        return None, None
+    try:
+        return ctx.request_id, ctx.client_id
+    except ValueError:  # リクエストコンテキスト外 (直接呼び出し等)
+        return None, None
+
+
+def _session_key(ctx: Context | None) -> str:
+    """クエリ ID レジストリ用に MCP セッションを識別するキー。リクエスト外では "default"。"""
+    if ctx is None:
+        return "default"
+    try:
+        return ctx.client_id or f"session-{id(ctx.session)}"
+    except ValueError:  # リクエストコンテキスト外 (直接呼び出し等)
+        return "default"
 
 
 def _wrap_errors(
-    message: str, coro_factory: Callable[[], Awaitable[List[Dict[str, Any]]]]
-) -> AsyncTool:
+    message: str, coro_factory: Callable[[], Awaitable[T]]
+) -> Callable[[], Awaitable[T]]:
     """共通エラーハンドリングラッパ (関数型合成用)。"""
 
-    async def _inner() -> List[Dict[str, Any]]:
+    async def _inner() -> T:
         try:
             return await coro_factory()
         except Exception as e:  # メッセージを統一して再ラップ
             raise RuntimeError(f"{message}: {e}") from e
 
-    return _inner  # type: ignore[return-value]
+    return _inner
 
 
 def register_tools(
@@ -51,70 +201,442 @@ def register_tools(
     *,
     connection_factory: ConnectionFactory,
     is_read_only: Callable[[str], bool],
+    routing_policy: WarehouseRoutingPolicy | None = None,
+    cost_budget: CostBudget | None = None,
+    plan_cache: PlanCache | None = None,
+    statement_timeout: int | None = None,
+    max_result_bytes: int | None = None,
+    disk_cache: DiskCache | None = None,
+    query_cache_ttl: float = 0,
+    query_registry: QueryRegistry | None = None,
+    connection_pool: ConnectionPool | None = None,
+    tracer: Tracer = NOOP_TRACER,
+    slow_query_log: SlowQueryLog | None = None,
+    profiler: SamplingProfiler | None = None,
+    query_stats: QueryStats | None = None,
+    export_dir: str | os.PathLike[str] | None = None,
+    export_workers: int = 1,
+    fetch_workers: int | None = None,
+    profile_cache: ProfileCache | None = None,
+    profile_sample_rows: int = DEFAULT_PROFILE_SAMPLE_ROWS,
 ) -> None:
     """ツールを FastMCP インスタンスへ登録 (副作用のみ)。
 
     引数を全て注入することでテスト時に任意のモックへ差し替え可能。
+    routing_policy を渡すと query ツールは見積りに応じてウェアハウスを切り替え、
+    cost_budget を渡すと見積りが予算を超えるクエリを実行前に拒否する。
+    両者の EXPLAIN 結果は plan_cache (省略時は新規作成) で共有される。
+    全ツールは実行前にセッションへ QUERY_TAG (ツール名/リクエスト ID/クライアント ID) と
+    statement_timeout (秒, 指定時のみ) を設定する。
+    query ツールの結果は fetch 中にサイズを見積もり、max_result_bytes を超える分は
+    シリアライズ前に打ち切る。
+    disk_cache を渡すとメタデータ系ツールの結果を (disk_cache.default_ttl の間)、
+    query_cache_ttl > 0 なら query ツールの結果もディスクへ保存し、
+    別プロセスからも再利用する。
+    query ツールは結果にクエリ ID を添えてセッションごとに query_registry
+    (省略時は新規作成) へ記録し、query_previous_result ツールはその永続化結果へ
+    RESULT_SCAN で問い合わせる。
+    connection_pool を渡すと connection_factory の代わりにプールから接続を借りて返却する。
+    server_stats ツールでプールの状態を確認できる。
+    tracer を渡すとツール呼び出しごとに親スパンを作り、検証・接続取得・実行・fetch・
+    レスポンス構築を子スパンとして記録する (既定は記録しない NOOP_TRACER)。
+    slow_query_log を渡すとしきい値を超えたツール呼び出しをフェーズ時間付きで書き出す。
+    sampling_profiler ツールで profiler (省略時は新規作成) を実行時に開始/停止できる。
+    query ツールの実行はリテラル非依存のフィンガープリントごとに query_stats
+    (省略時は新規作成) へ集計され、top_queries ツールで上位を確認できる。
+    export_dir を渡すと export_query ツールが結果をそのディレクトリ内のファイルへ書き出す
+    (export_workers > 1 なら結果チャンクを並列に書く)。未設定ならツールはエラーを返す。
+    fetch_workers を渡すと各ツールは結果チャンクをそのワーカー数で並列に取得する。
+    describe_* ツールはオブジェクト名を IDENTIFIER(?) にバインドして文のテキストを一定に保ち、
+    fields / name_filter を RESULT_SCAN で Snowflake 側に適用し、
+    全行 NULL の列を落として返す。
+    table_profile ツールは行数が profile_sample_rows を超えるテーブルをサンプリングして集計し、
+    結果を LAST_ALTERED をキーに profile_cache (省略時は新規作成) へ保持する。
     """
+    registry = query_registry if query_registry is not None else QueryRegistry()
+    explain = cached_explainer(plan_cache if plan_cache is not None else PlanCache())
+    sampler = profiler if profiler is not None else SamplingProfiler()
+    stats = query_stats if query_stats is not None else QueryStats()
+    profiles = profile_cache if profile_cache is not None else ProfileCache()
+    if slow_query_log is not None:
+        tracer = SlowQueryTracer(slow_query_log, tracer)
 
-    @mcp.tool()
-    async def query(sql: str) -> List[Dict[str, Any]]:  # noqa: D401 (簡潔で良い)
-        if not is_read_only(sql):
-            raise ValueError("Only read-only queries are allowed")
-        return await _wrap_errors(
-            "Query execution failed",
-            lambda: _execute_with_connection(connection_factory, sql),
+    def query_hooks(confirm_cost: bool) -> List[PrepareHook]:
+        hooks: List[PrepareHook] = []
+        if cost_budget is not None:
+            budget = cost_budget
+            hooks.append(
+                lambda conn, sql: check_cost(
+                    conn, sql, budget, confirmed=confirm_cost, explain=explain
+                )
+            )
+        if routing_policy is not None:
+            policy = routing_policy
+            hooks.append(
+                lambda conn, sql: route_warehouse(conn, sql, policy, explain=explain)
+            )
+        return hooks
+
+    def session_hook(tool: str, ctx: Context | None) -> PrepareHook:
+        request_id, client_id = _request_identity(ctx)
+        parameters: Dict[str, Any] = {
+            "QUERY_TAG": build_query_tag(tool, request_id, client_id)
+        }
+        if statement_timeout is not None:
+            parameters["STATEMENT_TIMEOUT_IN_SECONDS"] = statement_timeout
+        return lambda conn, sql: apply_session_parameters(conn, parameters)
+
+    def tool_span(tool: str, sql: str) -> ContextManager[Span]:
+        return tracer.span(f"tool.{tool}", **{"mcp.tool": tool, "db.statement": sql})
+
+    def validate(sql: str) -> bool:
+        with tracer.span("is_read_only_query"):
+            return is_read_only(sql)
+
+    def build_response(result: QueryResult, output_format: str) -> List[str]:
+        with tracer.span("build_response", output_format=output_format) as span:
+            contents = serialize_result(result, output_format)
+            span.set_attribute("response.length", sum(len(c) for c in contents))
+            return contents
+
+    fetch_records = partial(
+        fetch_query_async, tracer=tracer, download_workers=fetch_workers
+    )
+    # ワーカースレッド内で同期的に合成する取得 (RESULT_SCAN による射影など) 用
+    fetch_records_sync = partial(
+        fetch_query, tracer=tracer, download_workers=fetch_workers
+    )
+
+    def run(
+        message: str,
+        tool: str,
+        sql: Query,
+        ctx: Context | None,
+        hooks: Sequence[PrepareHook] = (),
+        fetch: Fetch = fetch_records,
+    ) -> Awaitable[Any]:
+        prepare = [session_hook(tool, ctx), *hooks]
+        if connection_pool is None:
+            return _wrap_errors(
+                message,
+                lambda: _execute_with_connection(
+                    connection_factory, sql, prepare, fetch, tracer=tracer
+                ),
+            )()
+        pool = connection_pool
+        return _wrap_errors(
+            message,
+            lambda: _execute_with_connection(
+                pool.acquire, sql, prepare, fetch, pool.release, tracer=tracer
+            ),
         )()
 
+    async def run_cached(
+        message: str,
+        tool: str,
+        sql: Query,
+        ctx: Context | None,
+        fetch: Fetch = fetch_records,
+        variant: str = "",
+    ) -> List[Dict[str, Any]]:
+        with tool_span(tool, statement_text(sql)) as span:
+            if disk_cache is None:
+                return await run(message, tool, sql, ctx, fetch=fetch)
+            key = f"{tool}:{statement_key(sql)}{variant}"
+            hit = disk_cache.get(key)
+            span.set_attribute("cache.hit", hit is not None)
+            if hit is not None:
+                return json.loads(hit)
+            rows = await run(message, tool, sql, ctx, fetch=fetch)
+            disk_cache.set(key, records_to_json(rows))
+            return rows
+
+    def run_describe(
+        message: str,
+        tool: str,
+        sql: Query,
+        ctx: Context | None,
+        fields: List[str] | None,
+        name_filter: str | None,
+    ) -> Awaitable[List[Dict[str, Any]]]:
+        fetch = partial(
+            fetch_projected,
+            fields=fields,
+            name_filter=name_filter,
+            fetch=fetch_records_sync,
+            tracer=tracer,
+        )
+        variant = json.dumps([fields, name_filter]) if fields or name_filter else ""
+        return run_cached(message, tool, sql, ctx, fetch, variant)
+
+    fetch_sized = partial(
+        fetch_result_async,
+        row_size=estimate_row_size,
+        max_bytes=max_result_bytes,
+        tracer=tracer,
+        download_workers=fetch_workers,
+    )
+
+    @mcp.tool(structured_output=False)
+    async def query(
+        sql: str,
+        confirm_cost: bool = False,
+        output_format: Literal["json", "csv", "tsv", "markdown"] = "json",
+        params: List[str | int | float | bool | None] | None = None,
+        ctx: Context | None = None,
+    ) -> List[str]:  # noqa: D401 (簡潔で良い)
+        """読み取り専用 SQL を実行する。output_format で json (既定) / csv / tsv / markdown を選べる。
+
+        params を渡すと SQL 中の `?` にバインド変数として順に渡す (例: sql="SELECT * FROM t
+        WHERE id = ?", params=[42])。値を SQL に埋め込まないため、同じ形のクエリは
+        コンパイル結果やキャッシュを共有できる。
+        """
+        with tool_span("query", sql) as span:
+            if not validate(sql):
+                raise ValueError("Only read-only queries are allowed")
+            bind = tuple(params or ())
+            statement: Query = Statement(sql, bind) if bind else sql
+            cache = disk_cache if query_cache_ttl > 0 else None
+            key = f"query:{output_format}:" + statement_key(
+                Statement(normalize_sql_for_plan(sql), bind)
+            )
+            if cache is not None:
+                hit = cache.get(key)
+                span.set_attribute("cache.hit", hit is not None)
+                if hit is not None:
+                    entry = json.loads(hit)
+                    if entry["query_id"]:
+                        registry.record(_session_key(ctx), entry["query_id"], sql)
+                    return entry["contents"]
+            start = time.perf_counter()
+            try:
+                result: QueryResult = await run(
+                    "Query execution failed",
+                    "query",
+                    statement,
+                    ctx,
+                    query_hooks(confirm_cost),
+                    fetch_sized,
+                )
+            except Exception:
+                stats.record(sql, time.perf_counter() - start, error=True)
+                raise
+            if result.query_id:
+                span.set_attribute("snowflake.query_id", result.query_id)
+                registry.record(_session_key(ctx), result.query_id, sql)
+            contents = build_response(result, output_format)
+            stats.record(
+                sql,
+                time.perf_counter() - start,
+                rows=len(result.rows),
+                bytes=result.estimated_bytes,
+            )
+            if cache is not None:
+                entry = {"contents": contents, "query_id": result.query_id}
+                cache.set(key, json.dumps(entry), ttl=query_cache_ttl)
+            return contents
+
+    @mcp.tool(structured_output=False)
+    async def query_previous_result(
+        sql: str,
+        query_id: str | None = None,
+        output_format: Literal["json", "csv", "tsv", "markdown"] = "json",
+        ctx: Context | None = None,
+    ) -> List[str]:
+        """直前 (または query_id 指定) の query 結果に対して SELECT を実行する。
+
+        SQL 内では結果を `previous_result` テーブルとして参照する
+        (例: SELECT region, SUM(amount) FROM previous_result GROUP BY region)。
+        Snowflake が保持する 24 時間以内の結果を RESULT_SCAN で再利用するため、
+        ベーステーブルを再スキャンしない。
+        """
+        with tool_span("query_previous_result", sql) as span:
+            if not validate(sql) or not is_explainable(sql):
+                raise ValueError("Only SELECT queries over previous_result are allowed")
+            session = _session_key(ctx)
+            if query_id is None:
+                latest = registry.latest(session)
+                if latest is None:
+                    raise ValueError("No previous query result in this session")
+                query_id = latest.query_id
+            scan_sql = build_result_scan_query(query_id, sql)
+            result: QueryResult = await run(
+                "Query on previous result failed",
+                "query_previous_result",
+                scan_sql,
+                ctx,
+                fetch=fetch_sized,
+            )
+            if result.query_id:
+                span.set_attribute("snowflake.query_id", result.query_id)
+                registry.record(session, result.query_id, scan_sql)
+            return build_response(result, output_format)
+
     @mcp.tool()
-    async def list_tables() -> List[Dict[str, Any]]:
-        return await _wrap_errors(
-            "Failed to list tables",
-            lambda: _execute_with_connection(connection_factory, "SHOW TABLES"),
-        )()
+    async def export_query(
+        sql: str,
+        file_format: Literal["csv.gz", "parquet"] = "csv.gz",
+        file_name: str | None = None,
+        confirm_cost: bool = False,
+        ctx: Context | None = None,
+    ) -> Dict[str, Any]:
+        """読み取り専用 SQL の結果全体をサーバ側のファイル (gzip CSV / Parquet) へ書き出す。
+
+        結果はレスポンスに含めず、パス・行数・スキーマ・先頭数行のプレビューだけを返す。
+        大量の抽出をモデルのコンテキストに載せずに受け渡すために使う。
+        """
+        with tool_span("export_query", sql):
+            if export_dir is None:
+                raise ValueError("export_query is disabled: set SNOWFLAKE_EXPORT_DIR")
+            if not validate(sql):
+                raise ValueError("Only read-only queries are allowed")
+            path = resolve_export_path(export_dir, file_name, file_format)
+            result = await run(
+                "Export failed",
+                "export_query",
+                sql,
+                ctx,
+                query_hooks(confirm_cost),
+                partial(
+                    export_to_file,
+                    path=path,
+                    export_format=file_format,
+                    workers=export_workers,
+                    tracer=tracer,
+                ),
+            )
+            return result.to_dict()
+
+    @mcp.tool()
+    async def list_tables(ctx: Context | None = None) -> List[Dict[str, Any]]:
+        return await run_cached("Failed to list tables", "list_tables", "SHOW TABLES", ctx)
 
     @mcp.tool()
-    async def describe_table(table_name: str) -> List[Dict[str, Any]]:
-        return await _wrap_errors(
+    async def describe_table(
+        table_name: str,
+        fields: List[str] | None = None,
+        name_filter: str | None = None,
+        ctx: Context | None = None,
+    ) -> List[Dict[str, Any]]:
+        """テーブルの列定義を取得する。
+
+        fields で返すプロパティ (例: ["name", "type", "comment"]) を、name_filter で
+        列名の ILIKE パターン (例: "%_ID") を指定できる。全列 NULL のプロパティは省略する。
+        """
+        return await run_describe(
             "Failed to describe table",
-            lambda: _execute_with_connection(
-                connection_factory, f"DESCRIBE TABLE {table_name}"
-            ),
-        )()
+            "describe_table",
+            Statement(DESCRIBE_TABLE, (bind_identifier(table_name),)),
+            ctx,
+            fields,
+            name_filter,
+        )
 
     @mcp.tool()
-    async def list_schemas() -> List[Dict[str, Any]]:
-        return await _wrap_errors(
-            "Failed to list schemas",
-            lambda: _execute_with_connection(connection_factory, "SHOW SCHEMAS"),
-        )()
+    async def list_schemas(ctx: Context | None = None) -> List[Dict[str, Any]]:
+        return await run_cached("Failed to list schemas", "list_schemas", "SHOW SCHEMAS", ctx)
 
     @mcp.tool()
-    async def describe_schema(schema_name: str) -> List[Dict[str, Any]]:
-        return await _wrap_errors(
+    async def describe_schema(
+        schema_name: str,
+        fields: List[str] | None = None,
+        name_filter: str | None = None,
+        ctx: Context | None = None,
+    ) -> List[Dict[str, Any]]:
+        """スキーマ内のオブジェクト一覧を取得する。fields / name_filter は describe_table と同じ。"""
+        return await run_describe(
             "Failed to describe schema",
-            lambda: _execute_with_connection(
-                connection_factory, f"DESCRIBE SCHEMA {schema_name}"
-            ),
-        )()
+            "describe_schema",
+            Statement(DESCRIBE_SCHEMA, (bind_identifier(schema_name),)),
+            ctx,
+            fields,
+            name_filter,
+        )
 
     @mcp.tool()
-    async def list_databases() -> List[Dict[str, Any]]:
+    async def list_databases(ctx: Context | None = None) -> List[Dict[str, Any]]:
         """アクセス可能なデータベースの一覧を取得する。"""
-        return await _wrap_errors(
-            "Failed to list databases",
-            lambda: _execute_with_connection(connection_factory, "SHOW DATABASES"),
-        )()
+        return await run_cached(
+            "Failed to list databases", "list_databases", "SHOW DATABASES", ctx
+        )
 
     @mcp.tool()
-    async def describe_database(database_name: str) -> List[Dict[str, Any]]:
-        """指定したデータベースの詳細情報を取得する。"""
-        return await _wrap_errors(
+    async def describe_database(
+        database_name: str,
+        fields: List[str] | None = None,
+        name_filter: str | None = None,
+        ctx: Context | None = None,
+    ) -> List[Dict[str, Any]]:
+        """指定したデータベースの詳細情報を取得する。fields / name_filter は describe_table と同じ。"""
+        return await run_describe(
             "Failed to describe database",
-            lambda: _execute_with_connection(
-                connection_factory, f"DESCRIBE DATABASE {database_name}"
+            "describe_database",
+            Statement(DESCRIBE_DATABASE, (bind_identifier(database_name),)),
+            ctx,
+            fields,
+            name_filter,
+        )
+
+    @mcp.tool()
+    async def table_profile(
+        table_name: str,
+        include_columns: bool = True,
+        ctx: Context | None = None,
+    ) -> Dict[str, Any]:
+        """テーブルの行数・サイズ・クラスタリング状態と、列ごとの NULL 率・近似ユニーク数・
+        最小/最大・中央値を返す。
+
+        行数等はメタデータから取り、列の集計は大きなテーブルではサンプリングした上で
+        1 回のクエリで求める。include_columns=False ならメタデータだけを返す
+        (ウェアハウスを使わない)。テーブルが更新されるまで結果はキャッシュされる。
+        """
+        with tool_span("table_profile", table_name):
+            return await run(
+                "Failed to profile table",
+                "table_profile",
+                table_name,
+                ctx,
+                fetch=partial(
+                    profile_table,
+                    cache=profiles,
+                    include_columns=include_columns,
+                    sample_rows=profile_sample_rows,
+                    tracer=tracer,
+                ),
+            )
+
+    @mcp.tool()
+    async def server_stats() -> Dict[str, Any]:
+        """サーバ内部の状態 (接続プール等) を返す。"""
+        return {
+            "connection_pool": (
+                connection_pool.snapshot() if connection_pool is not None else None
             ),
-        )()
+        }
+
+    @mcp.tool()
+    async def top_queries(
+        limit: int = 20,
+        order_by: Literal[
+            "count", "total_latency", "p95_latency", "errors", "bytes"
+        ] = "count",
+    ) -> List[Dict[str, Any]]:
+        """query ツールで実行した SQL を形 (リテラル非依存のフィンガープリント) ごとに集計し、上位を返す。"""
+        return stats.top(limit, order_by)
+
+    @mcp.tool()
+    async def sampling_profiler(
+        action: Literal["start", "stop", "status", "reset"] = "status",
+        top: int = 20,
+    ) -> Dict[str, Any]:
+        """サーバ自身のサンプリングプロファイラを開始/停止し、上位のスタックを返す (管理用)。"""
+        if action == "start":
+            sampler.start()
+        elif action == "stop":
+            sampler.stop()
+        elif action == "reset":
+            sampler.reset()
+        return sampler.snapshot(top)
 
 
 def create_snowflake_mcp_server(connection_name: str | None = None) -> FastMCP:
@@ -123,9 +645,38 @@ def create_snowflake_mcp_server(connection_name: str | None = None) -> FastMCP:
     def connection_factory() -> snowflake.connector.SnowflakeConnection:
         return open_connection(connection_name=connection_name)
 
-    mcp = FastMCP("snowflake-mcp")
+    pool = get_connection_pool(connection_factory)
+
+    @asynccontextmanager
+    async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+        # 起動時にセッションを事前に開き、キープアライブを開始する
+        if pool is not None:
+            await anyio.to_thread.run_sync(pool.start)
+        try:
+            yield
+        finally:
+            if pool is not None:
+                await anyio.to_thread.run_sync(pool.close)
+
+    mcp = FastMCP("snowflake-mcp", lifespan=lifespan)
     register_tools(
-        mcp, connection_factory=connection_factory, is_read_only=is_read_only_query
+        mcp,
+        connection_factory=connection_factory,
+        is_read_only=get_query_policy() or is_read_only_query,
+        routing_policy=get_routing_policy(),
+        cost_budget=get_cost_budget(),
+        statement_timeout=get_statement_timeout(),
+        max_result_bytes=get_max_result_bytes(),
+        disk_cache=get_disk_cache(connection_name),
+        query_cache_ttl=get_query_cache_ttl(),
+        connection_pool=pool,
+        tracer=get_tracer(),
+        slow_query_log=get_slow_query_log(),
+        query_stats=get_query_stats(),
+        export_dir=get_export_dir(),
+        export_workers=get_export_workers(),
+        fetch_workers=get_fetch_workers(),
+        profile_sample_rows=get_profile_sample_rows(),
     )
     return mcp
 
@@ -0,0 +1,100 @@
+"""セッションパラメータ管理 (関数型スタイル)。
+
+ツール呼び出しごとに STATEMENT_TIMEOUT_IN_SECONDS と QUERY_TAG を設定する。
+接続ごとに適用済みの値を記録し、変化したパラメータだけを
+1 回の `ALTER SESSION SET` で送るため、同じ値の再送は発生しない。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import weakref
+from typing import Any, Dict, Mapping
+
+import snowflake.connector
+
+from snowflake_mcp_server.connection import EnvMapping, get_int_env
+
+DEFAULT_STATEMENT_TIMEOUT_SECONDS = 300
+
+# 接続 -> 適用済みパラメータ。接続が破棄されれば自動的に消える
+_applied_parameters: "weakref.WeakKeyDictionary[Any, Dict[str, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_statement_timeout(env: EnvMapping | None = None) -> int | None:
+    """環境変数 SNOWFLAKE_STATEMENT_TIMEOUT_SECONDS からタイムアウト秒を得る。
+
+    未設定なら DEFAULT_STATEMENT_TIMEOUT_SECONDS、0 ならタイムアウト無し (None)。
+    """
+    env = env or os.environ
+    timeout = get_int_env(env, "SNOWFLAKE_STATEMENT_TIMEOUT_SECONDS")
+    if timeout is None:
+        return DEFAULT_STATEMENT_TIMEOUT_SECONDS
+    return timeout or None
+
+
+def build_query_tag(
+    tool: str, request_id: str | None = None, client_id: str | None = None
+) -> str:
+    """QUERY_HISTORY で追跡できる構造化 QUERY_TAG (JSON) を組み立てる純関数。"""
+    tag: Dict[str, str] = {"app": "snowflake-mcp-server", "tool": tool}
+    if request_id is not None:
+        tag["request_id"] = request_id
+    if client_id is not None:
+        tag["client_id"] = client_id
+    return json.dumps(tag, separators=(",", ":"), sort_keys=True)
+
+
+def _sql_literal(value: Any) -> str:
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, int):
+        return str(value)
+    escaped = str(value).replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+def build_alter_session(parameters: Mapping[str, Any]) -> str:
+    """`ALTER SESSION SET ...` 文を組み立てる純関数。"""
+    assignments = ", ".join(
+        f"{name} = {_sql_literal(value)}" for name, value in parameters.items()
+    )
+    return f"ALTER SESSION SET {assignments}"
+
+
+def apply_session_parameters(
+    conn: snowflake.connector.SnowflakeConnection, parameters: Mapping[str, Any]
+) -> Dict[str, Any]:
+    """変化したセッションパラメータだけを接続へ適用する (副作用: ALTER SESSION)。
+
+    Returns:
+        実際に送信したパラメータ (全て適用済みなら空 dict)
+    """
+    applied = _applied_parameters.setdefault(conn, {})
+    changed = {
+        name: value
+        for name, value in parameters.items()
+        if name not in applied or applied[name] != value
+    }
+    if not changed:
+        return {}
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(build_alter_session(changed))
+    finally:
+        cursor.close()
+    applied.update(changed)
+    return changed
+
+
+__all__ = [
+    "DEFAULT_STATEMENT_TIMEOUT_SECONDS",
+    "get_statement_timeout",
+    "build_query_tag",
+    "build_alter_session",
+    "apply_session_parameters",
+]
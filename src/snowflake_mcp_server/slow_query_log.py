@@ -0,0 +1,178 @@
+"""スロークエリログ。
+
+しきい値を超えたツール呼び出しを、正規化 SQL とそのフィンガープリント・フェーズごとの
+所要時間・行数/バイト数・クエリ ID とともにローテーションする JSONL ファイルへ書き出す。
+フェーズ時間は tracing のスパン (検証・接続取得・実行・fetch・レスポンス構築) から集計するため、
+SlowQueryTracer で既存のトレーサを包んで使う。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import logging.handlers
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator
+
+from snowflake_mcp_server.connection import EnvMapping, get_int_env
+from snowflake_mcp_server.explain import normalize_sql_for_plan
+from snowflake_mcp_server.query_stats import sql_fingerprint
+from snowflake_mcp_server.tracing import NOOP_TRACER, Span, Tracer
+
+DEFAULT_SLOW_QUERY_THRESHOLD_MS = 1000
+DEFAULT_SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024**2  # 10 MiB
+DEFAULT_SLOW_QUERY_LOG_BACKUPS = 5
+
+
+@dataclass
+class ToolCallRecord:
+    """1 回のツール呼び出しで集めたスパン属性とフェーズごとの所要時間 (秒)。"""
+
+    name: str
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    phases: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    error: str | None = None
+
+
+class SlowQueryLog:
+    """しきい値超えの呼び出しを JSONL で書き出すローテーション付きログ (スレッドセーフ)。"""
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        threshold_seconds: float = DEFAULT_SLOW_QUERY_THRESHOLD_MS / 1000,
+        max_bytes: int = DEFAULT_SLOW_QUERY_LOG_MAX_BYTES,
+        backup_count: int = DEFAULT_SLOW_QUERY_LOG_BACKUPS,
+    ) -> None:
+        self.threshold_seconds = threshold_seconds
+        self._handler = logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+            delay=True,
+        )
+
+    def observe(self, record: ToolCallRecord, elapsed: float) -> bool:
+        """elapsed がしきい値以上なら書き出す。書き出したら True。"""
+        if elapsed < self.threshold_seconds:
+            return False
+        self.write(build_entry(record, elapsed))
+        return True
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+        self._handler.handle(logging.makeLogRecord({"msg": line}))
+
+    def close(self) -> None:
+        self._handler.close()
+
+
+def build_entry(record: ToolCallRecord, elapsed: float) -> Dict[str, Any]:
+    """ログ 1 行分の dict を組み立てる純関数。"""
+    attributes = record.attributes
+    sql = attributes.get("db.statement")
+    return {
+        "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "tool": attributes.get("mcp.tool", record.name),
+        "duration_ms": round(elapsed * 1000, 3),
+        "fingerprint": sql_fingerprint(sql) if sql else None,
+        "sql": normalize_sql_for_plan(sql) if sql else None,
+        "phases_ms": {
+            name: round(seconds * 1000, 3) for name, seconds in record.phases.items()
+        },
+        "query_id": attributes.get("snowflake.query_id"),
+        "rows": attributes.get("db.row_count"),
+        "bytes": attributes.get("result.estimated_bytes"),
+        "error": record.error,
+    }
+
+
+_current_call: ContextVar[ToolCallRecord | None] = ContextVar(
+    "snowflake_mcp_slow_query_call", default=None
+)
+
+
+class _CollectingSpan:
+    """内側のスパンへ委譲しつつ、属性を呼び出しの記録にも集める。"""
+
+    __slots__ = ("_inner", "_record")
+
+    def __init__(self, inner: Span, record: ToolCallRecord) -> None:
+        self._inner = inner
+        self._record = record
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self._inner.set_attribute(key, value)
+        self._record.attributes[key] = value
+
+
+class SlowQueryTracer:
+    """トレーサを包み、最外のスパン (ツール呼び出し) 単位で所要時間を測って log へ渡す。
+
+    内側のスパンは名前ごとにフェーズ時間として積算する。
+    """
+
+    def __init__(self, log: SlowQueryLog, inner: Tracer = NOOP_TRACER) -> None:
+        self.log = log
+        self.inner = inner
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        record = _current_call.get()
+        root = record is None
+        if record is None:
+            record = ToolCallRecord(name)
+        record.attributes.update(attributes)
+        token = _current_call.set(record) if root else None
+        start = time.perf_counter()
+        try:
+            with self.inner.span(name, **attributes) as inner_span:
+                yield _CollectingSpan(inner_span, record)
+        except BaseException as e:
+            if root:
+                record.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            if token is not None:
+                _current_call.reset(token)
+                self.log.observe(record, elapsed)
+            else:
+                record.phases[name] += elapsed
+
+
+def get_slow_query_log(env: EnvMapping | None = None) -> SlowQueryLog | None:
+    """環境変数からスロークエリログを構築する。SNOWFLAKE_SLOW_QUERY_LOG 未設定なら None (無効)。"""
+    env = env or os.environ
+    path = env.get("SNOWFLAKE_SLOW_QUERY_LOG")
+    if not path:
+        return None
+    threshold_ms = get_int_env(env, "SNOWFLAKE_SLOW_QUERY_THRESHOLD_MS")
+    max_bytes = get_int_env(env, "SNOWFLAKE_SLOW_QUERY_LOG_MAX_BYTES")
+    backups = get_int_env(env, "SNOWFLAKE_SLOW_QUERY_LOG_BACKUPS")
+    return SlowQueryLog(
+        os.path.expanduser(path),
+        threshold_seconds=(
+            DEFAULT_SLOW_QUERY_THRESHOLD_MS if threshold_ms is None else threshold_ms
+        )
+        / 1000,
+        max_bytes=DEFAULT_SLOW_QUERY_LOG_MAX_BYTES if max_bytes is None else max_bytes,
+        backup_count=DEFAULT_SLOW_QUERY_LOG_BACKUPS if backups is None else backups,
+    )
+
+
+__all__ = [
+    "DEFAULT_SLOW_QUERY_THRESHOLD_MS",
+    "ToolCallRecord",
+    "SlowQueryLog",
+    "build_entry",
+    "SlowQueryTracer",
+    "get_slow_query_log",
+]
@@ -0,0 +1,300 @@
+"""フルスキャンを避けるテーブルプロファイル。
+
+行数・バイト数・クラスタリングキーは INFORMATION_SCHEMA.TABLES のメタデータから、
+クラスタリングの状態は SYSTEM$CLUSTERING_INFORMATION から得る (いずれもウェアハウスを使わない)。
+列ごとの NULL 率・近似ユニーク数・最小/最大・中央値は、大きなテーブルでは SAMPLE SYSTEM で
+マイクロパーティション単位に間引いたデータに対し、全列分の集計を 1 回のクエリで求める。
+結果はテーブルの LAST_ALTERED をキーにキャッシュし、テーブルが変わるまで再計算しない。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+import snowflake.connector
+
+from snowflake_mcp_server.connection import (
+    EnvMapping,
+    Statement,
+    fetch_query,
+    get_int_env,
+)
+from snowflake_mcp_server.query_validator import parse_qualified_name, quote_identifier
+from snowflake_mcp_server.tracing import NOOP_TRACER, Tracer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_SAMPLE_ROWS = 1_000_000
+
+_NUMERIC_TYPES = frozenset(("NUMBER", "FLOAT"))
+_ORDERED_TYPES = _NUMERIC_TYPES | frozenset(
+    ("TEXT", "DATE", "TIME", "TIMESTAMP_NTZ", "TIMESTAMP_LTZ", "TIMESTAMP_TZ")
+)
+# 近似ユニーク数を求めない型 (比較・ハッシュに向かない)
+_UNHASHABLE_TYPES = frozenset(
+    ("VARIANT", "OBJECT", "ARRAY", "MAP", "GEOGRAPHY", "GEOMETRY", "VECTOR")
+)
+
+
+# --------------------------------------------------------------------------------------
+# 識別子 (純関数)
+# --------------------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class TableRef:
+    """`[database.][schema.]table` 形式のテーブル参照。各部は SQL に書かれた識別子のまま保持する。"""
+
+    name: str
+    schema: str | None = None
+    database: str | None = None
+
+
+def parse_table_name(text: str) -> TableRef:
+    """テーブル名を識別子 (非引用/引用) と `.` だけからなる参照として解析する。
+
+    Raises:
+        ValueError: 識別子以外を含む、または 4 部以上の場合
+    """
+    try:
+        parts = parse_qualified_name(text)
+    except ValueError:
+        raise ValueError(f"Invalid table name: {text!r}") from None
+    name = parts[-1]
+    schema = parts[-2] if len(parts) > 1 else None
+    database = parts[-3] if len(parts) > 2 else None
+    return TableRef(name, schema, database)
+
+
+def identifier_value(identifier: str) -> str:
+    """カタログ上の名前に直す (非引用は大文字、引用は引用符を外す)。"""
+    if identifier.startswith('"'):
+        return identifier[1:-1].replace('""', '"')
+    return identifier.upper()
+
+
+def build_metadata_query(table: TableRef) -> Statement:
+    """INFORMATION_SCHEMA.TABLES からメタデータを引く文 (ウェアハウス不要)。
+
+    対象テーブルはバインド変数で渡すため、文のテキストはテーブルによらず同じになる。
+    """
+    prefix = f"{table.database}." if table.database else ""
+    schema = identifier_value(table.schema) if table.schema else None
+    return Statement(
+        "SELECT TABLE_CATALOG, TABLE_SCHEMA, TABLE_NAME, TABLE_TYPE, ROW_COUNT, BYTES,"
+        " CLUSTERING_KEY, LAST_ALTERED"
+        " FROM IDENTIFIER(?)"
+        " WHERE TABLE_SCHEMA = COALESCE(?, CURRENT_SCHEMA()) AND TABLE_NAME = ?",
+        (f"{prefix}INFORMATION_SCHEMA.TABLES", schema, identifier_value(table.name)),
+    )
+
+
+def build_columns_query(database: str, schema: str, table: str) -> Statement:
+    return Statement(
+        "SELECT COLUMN_NAME, DATA_TYPE FROM IDENTIFIER(?)"
+        " WHERE TABLE_SCHEMA = ? AND TABLE_NAME = ? ORDER BY ORDINAL_POSITION",
+        (f"{quote_identifier(database)}.INFORMATION_SCHEMA.COLUMNS", schema, table),
+    )
+
+
+def sample_percent(row_count: int | None, sample_rows: int) -> float | None:
+    """目標行数に対するサンプリング率 (%)。行数不明または目標以下なら None (全件)。"""
+    if not row_count or row_count <= sample_rows:
+        return None
+    return max(0.000001, round(sample_rows * 100 / row_count, 6))
+
+
+def build_profile_query(
+    table_sql: str,
+    columns: Sequence[Tuple[str, str]],
+    percent: float | None,
+) -> Tuple[str, List[Tuple[int, str]]]:
+    """全列の集計を 1 回で求める SQL と、結果列の (列番号, 統計名) 対応を作る純関数。"""
+    expressions = ["COUNT(*)"]
+    layout: List[Tuple[int, str]] = [(-1, "rows")]
+    for i, (name, data_type) in enumerate(columns):
+        column = quote_identifier(name)
+        stats = [("non_null", f"COUNT({column})")]
+        if data_type not in _UNHASHABLE_TYPES:
+            stats.append(("approx_distinct", f"APPROX_COUNT_DISTINCT({column})"))
+        if data_type in _ORDERED_TYPES:
+            stats.append(("min", f"MIN({column})"))
+            stats.append(("max", f"MAX({column})"))
+        if data_type in _NUMERIC_TYPES:
+            stats.append(("median", f"APPROX_PERCENTILE({column}, 0.5)"))
+        for stat, expression in stats:
+            expressions.append(expression)
+            layout.append((i, stat))
+    sample = f" SAMPLE SYSTEM ({percent})" if percent is not None else ""
+    return f"SELECT {', '.join(expressions)} FROM {table_sql}{sample}", layout
+
+
+# --------------------------------------------------------------------------------------
+# キャッシュ
+# --------------------------------------------------------------------------------------
+
+
+class ProfileCache:
+    """(テーブル, LAST_ALTERED) をキーにした LRU キャッシュ (スレッドセーフ)。
+
+    テーブルが更新されると LAST_ALTERED が変わるため、古いエントリは参照されずに追い出される。
+    """
+
+    def __init__(self, max_entries: int = 128) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Tuple[str, str], Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, table: str, last_altered: str) -> Dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get((table, last_altered))
+            if entry is not None:
+                self._entries.move_to_end((table, last_altered))
+            return entry
+
+    def put(self, table: str, last_altered: str, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[(table, last_altered)] = profile
+            self._entries.move_to_end((table, last_altered))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# --------------------------------------------------------------------------------------
+# 実行
+# --------------------------------------------------------------------------------------
+
+
+def _clustering_information(
+    conn: snowflake.connector.SnowflakeConnection, table_sql: str, tracer: Tracer
+) -> Dict[str, Any] | None:
+    """SYSTEM$CLUSTERING_INFORMATION の主要値。取得できなければ None。"""
+    sql = Statement("SELECT SYSTEM$CLUSTERING_INFORMATION(?) AS INFO", (table_sql,))
+    try:
+        (row,) = fetch_query(conn, sql, tracer=tracer)
+        info = json.loads(row["INFO"])
+    except Exception as e:  # クラスタリング情報は補助的なので失敗しても続行
+        logger.debug("Clustering information unavailable for %s: %s", table_sql, e)
+        return None
+    return {
+        key: info.get(key)
+        for key in (
+            "total_partition_count",
+            "average_overlaps",
+            "average_depth",
+        )
+    }
+
+
+def profile_table(
+    conn: snowflake.connector.SnowflakeConnection,
+    table_name: str,
+    *,
+    cache: ProfileCache | None = None,
+    include_columns: bool = True,
+    sample_rows: int = DEFAULT_PROFILE_SAMPLE_ROWS,
+    tracer: Tracer = NOOP_TRACER,
+) -> Dict[str, Any]:
+    """テーブルのプロファイルを返す副作用関数。
+
+    メタデータは毎回引き (安価)、列の集計は cache に (テーブル, LAST_ALTERED) の
+    エントリがあれば再利用する。include_columns=False ならメタデータだけを返す。
+
+    Raises:
+        ValueError: テーブル名が不正、またはテーブルが見つからない場合
+    """
+    table = parse_table_name(table_name)
+    rows = fetch_query(conn, build_metadata_query(table), tracer=tracer)
+    if not rows:
+        raise ValueError(f"Table not found: {table_name}")
+    meta = rows[0]
+    database = meta["TABLE_CATALOG"]
+    schema = meta["TABLE_SCHEMA"]
+    name = meta["TABLE_NAME"]
+    qualified = ".".join(quote_identifier(p) for p in (database, schema, name))
+    last_altered = str(meta["LAST_ALTERED"])
+    cache_key = f"{qualified}:{int(include_columns)}"
+    if cache is not None:
+        hit = cache.get(cache_key, last_altered)
+        if hit is not None:
+            return {**hit, "cached": True}
+
+    profile: Dict[str, Any] = {
+        "table": qualified,
+        "table_type": meta["TABLE_TYPE"],
+        "row_count": meta["ROW_COUNT"],
+        "bytes": meta["BYTES"],
+        "last_altered": last_altered,
+        "clustering_key": meta["CLUSTERING_KEY"],
+        "clustering": (
+            _clustering_information(conn, qualified, tracer)
+            if meta["CLUSTERING_KEY"]
+            else None
+        ),
+        "sample_percent": None,
+        "columns": [],
+        "cached": False,
+    }
+    if include_columns:
+        columns = [
+            (row["COLUMN_NAME"], row["DATA_TYPE"])
+            for row in fetch_query(
+                conn, build_columns_query(database, schema, name), tracer=tracer
+            )
+        ]
+        percent = sample_percent(meta["ROW_COUNT"], sample_rows)
+        sql, layout = build_profile_query(qualified, columns, percent)
+        (values,) = fetch_query(conn, sql, tracer=tracer)
+        profile["sample_percent"] = percent
+        profile["columns"] = _column_profiles(columns, layout, list(values.values()))
+    if cache is not None:
+        cache.put(cache_key, last_altered, profile)
+    return profile
+
+
+def _column_profiles(
+    columns: Sequence[Tuple[str, str]],
+    layout: Sequence[Tuple[int, str]],
+    values: Sequence[Any],
+) -> List[Dict[str, Any]]:
+    stats: List[Dict[str, Any]] = [{"name": n, "type": t} for n, t in columns]
+    sampled_rows = values[0] or 0
+    for (i, stat), value in zip(layout[1:], values[1:]):
+        if stat == "non_null":
+            stats[i]["null_fraction"] = (
+                round(1 - value / sampled_rows, 6) if sampled_rows else None
+            )
+        else:
+            stats[i][stat] = value
+    return stats
+
+
+def get_profile_sample_rows(env: EnvMapping | None = None) -> int:
+    """環境変数 SNOWFLAKE_PROFILE_SAMPLE_ROWS (サンプリングの目標行数) を読む。"""
+    env = env or os.environ
+    value = get_int_env(env, "SNOWFLAKE_PROFILE_SAMPLE_ROWS")
+    return DEFAULT_PROFILE_SAMPLE_ROWS if value is None else value
+
+
+__all__ = [
+    "DEFAULT_PROFILE_SAMPLE_ROWS",
+    "TableRef",
+    "parse_table_name",
+    "identifier_value",
+    "build_metadata_query",
+    "build_columns_query",
+    "sample_percent",
+    "build_profile_query",
+    "ProfileCache",
+    "profile_table",
+    "get_profile_sample_rows",
+]
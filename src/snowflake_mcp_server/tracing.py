@@ -0,0 +1,193 @@
+"""トレーシング (OpenTelemetry 風のスパン)。
+
+ツール呼び出しを親スパンとし、検証・接続取得・実行・fetch・レスポンス構築を子スパンとして
+記録する。既定は何もしない NoopTracer で、呼び出しは共有のダミースパンを返すだけなので
+無効時のオーバーヘッドはほぼ無い。テスト用にメモリへ記録する RecordingTracer と、
+opentelemetry-api がインストールされていれば使える OpenTelemetryTracer を提供する。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Any, ContextManager, Dict, Iterator, List, Mapping, Protocol
+
+# connection からも利用されるため、このモジュールは他モジュールへ依存しない
+EnvMapping = Mapping[str, str | None]
+
+TRACING_MODES = ("off", "memory", "otel")
+
+
+class Span(Protocol):
+    def set_attribute(self, key: str, value: Any) -> None: ...
+
+
+class Tracer(Protocol):
+    def span(self, name: str, **attributes: Any) -> ContextManager[Span]: ...
+
+
+# --------------------------------------------------------------------------------------
+# 無効時 (既定)
+# --------------------------------------------------------------------------------------
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class NoopTracer:
+    """何も記録しないトレーサ。常に同じダミースパンを返す。"""
+
+    def span(self, name: str, **attributes: Any) -> ContextManager[Span]:
+        return _NOOP_SPAN
+
+
+NOOP_TRACER = NoopTracer()
+
+
+# --------------------------------------------------------------------------------------
+# メモリ記録 (テスト / デバッグ用)
+# --------------------------------------------------------------------------------------
+
+
+@dataclass
+class RecordedSpan:
+    """終了したスパンの記録。"""
+
+    name: str
+    span_id: int
+    parent_id: int | None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start: float = 0.0
+    end: float = 0.0
+    error: str | None = None
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+class InMemorySpanExporter:
+    """終了したスパンを終了順に保持するエクスポータ。"""
+
+    def __init__(self) -> None:
+        self._spans: List[RecordedSpan] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: RecordedSpan) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    @property
+    def spans(self) -> List[RecordedSpan]:
+        with self._lock:
+            return list(self._spans)
+
+    def children_of(self, span: RecordedSpan) -> List[RecordedSpan]:
+        return [s for s in self.spans if s.parent_id == span.span_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+_current_span_id: ContextVar[int | None] = ContextVar(
+    "snowflake_mcp_current_span", default=None
+)
+
+
+class RecordingTracer:
+    """親子関係 (contextvars で伝播) 付きでスパンを exporter へ記録するトレーサ。"""
+
+    def __init__(self, exporter: InMemorySpanExporter | None = None) -> None:
+        self.exporter = exporter if exporter is not None else InMemorySpanExporter()
+        self._ids = count(1)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        recorded = RecordedSpan(
+            name=name,
+            span_id=next(self._ids),
+            parent_id=_current_span_id.get(),
+            attributes=dict(attributes),
+            start=time.perf_counter(),
+        )
+        token = _current_span_id.set(recorded.span_id)
+        try:
+            yield recorded
+        except BaseException as e:
+            recorded.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span_id.reset(token)
+            recorded.end = time.perf_counter()
+            self.exporter.export(recorded)
+
+
+# --------------------------------------------------------------------------------------
+# OpenTelemetry (任意依存)
+# --------------------------------------------------------------------------------------
+
+
+class OpenTelemetryTracer:
+    """opentelemetry-api のトレーサへ委譲する。エクスポータ設定は OTel SDK 側で行う。"""
+
+    def __init__(self, instrumentation_name: str = "snowflake_mcp_server") -> None:
+        try:
+            from opentelemetry import trace
+        except ImportError as e:  # 任意依存
+            raise ValueError(
+                "SNOWFLAKE_TRACING=otel requires the 'opentelemetry-api' package "
+                "(install with the 'tracing' extra)"
+            ) from e
+        self._tracer = trace.get_tracer(instrumentation_name)
+
+    def span(self, name: str, **attributes: Any) -> ContextManager[Span]:
+        return self._tracer.start_as_current_span(name, attributes=attributes)
+
+
+def get_tracer(env: EnvMapping | None = None) -> Tracer:
+    """環境変数 SNOWFLAKE_TRACING (off / memory / otel) からトレーサを構築する。"""
+    env = env or os.environ
+    mode = (env.get("SNOWFLAKE_TRACING") or "off").lower()
+    if mode == "off":
+        return NOOP_TRACER
+    if mode == "memory":
+        return RecordingTracer()
+    if mode == "otel":
+        return OpenTelemetryTracer()
+    raise ValueError(f"SNOWFLAKE_TRACING must be one of {TRACING_MODES}: {mode!r}")
+
+
+__all__ = [
+    "TRACING_MODES",
+    "Span",
+    "Tracer",
+    "NoopTracer",
+    "NOOP_TRACER",
+    "RecordedSpan",
+    "InMemorySpanExporter",
+    "RecordingTracer",
+    "OpenTelemetryTracer",
+    "get_tracer",
+]
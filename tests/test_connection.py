@@ -1,17 +1,46 @@
 """Test connection management functionality."""
 
+import threading
+import time
 from unittest.mock import Mock, patch, mock_open
 import anyio
 import pytest
 from snowflake_mcp_server.connection import (
     SnowflakeConnection,
+    Statement,
+    bind_identifier,
+    execute_statement,
+    statement_key,
+    statement_text,
     get_connection_params,
+    get_fetch_workers,
     open_connection,
+    download_result_batches,
     fetch_query,
+    fetch_result,
     close_connection,
+    RawJSON,
 )
 
 
+class FakeResultBatch:
+    """snowflake.connector の ResultBatch の代役。反復時に「ダウンロード」する。"""
+
+    def __init__(self, rows, delay: float = 0.0, error: Exception | None = None):
+        self.rows = rows
+        self.rowcount = len(rows)
+        self.delay = delay
+        self.error = error
+        self.downloaded_by: str | None = None
+
+    def __iter__(self):
+        time.sleep(self.delay)
+        self.downloaded_by = threading.current_thread().name
+        if self.error is not None:
+            raise self.error
+        return iter(self.rows)
+
+
 class TestSnowflakeConnection:
     """Test cases for Snowflake connection management."""
 
@@ -307,7 +336,9 @@ class TestFunctionalConnectionAPI:
         result = open_connection("test-connection")
 
         assert result == mock_conn
-        mock_connect.assert_called_once_with(connection_name="test-connection")
+        mock_connect.assert_called_once_with(
+            connection_name="test-connection", paramstyle="qmark"
+        )
 
     @patch("snowflake_mcp_server.connection.snowflake.connector.connect")
     def test_open_connection_with_env(self, mock_connect: Mock) -> None:
@@ -324,6 +355,7 @@ class TestFunctionalConnectionAPI:
         call_args = mock_connect.call_args[1]  # kwargs
         assert call_args["account"] == "test-account"
         assert call_args["user"] == "test-user"
+        assert call_args["paramstyle"] == "qmark"
 
     def test_fetch_query_success(self) -> None:
         """クエリ実行成功ケースのテスト。"""
@@ -364,3 +396,193 @@ class TestFunctionalConnectionAPI:
     def test_close_connection_with_none(self) -> None:
         """None 接続のクローズテスト (冪等性)。"""
         close_connection(None)  # 例外が発生しないことを確認
+
+
+class TestStatements:
+    """バインド変数付き実行のテスト。"""
+
+    def test_execute_statement_binds_params(self) -> None:
+        cursor = Mock()
+        execute_statement(cursor, Statement("SELECT ?", (1,)))
+        cursor.execute.assert_called_once_with("SELECT ?", (1,))
+
+        cursor.reset_mock()
+        execute_statement(cursor, Statement("SELECT 1"))
+        execute_statement(cursor, "SELECT 2")
+        assert [c.args for c in cursor.execute.call_args_list] == [
+            ("SELECT 1",),
+            ("SELECT 2",),
+        ]
+
+    def test_fetch_query_with_statement(self) -> None:
+        conn = Mock()
+        cursor = conn.cursor.return_value
+        cursor.description = [("ID",)]
+        cursor.fetchall.return_value = [(1,)]
+
+        rows = fetch_query(conn, Statement("SELECT ID FROM t WHERE ID = ?", (1,)))
+
+        cursor.execute.assert_called_once_with("SELECT ID FROM t WHERE ID = ?", (1,))
+        assert rows == [{"ID": 1}]
+
+    def test_statement_text_and_key(self) -> None:
+        statement = Statement("SELECT ?", ("a",))
+        assert statement_text(statement) == "SELECT ?"
+        assert statement_text("SELECT 1") == "SELECT 1"
+        assert statement_key("SELECT 1") == "SELECT 1"
+        assert statement_key(statement) != statement_key(Statement("SELECT ?", ("b",)))
+
+    def test_bind_identifier(self) -> None:
+        assert bind_identifier("orders") == "ORDERS"
+        assert bind_identifier('db.public."Orders"') == 'DB.PUBLIC."Orders"'
+
+    @pytest.mark.parametrize(
+        "name", ["", "orders; DROP TABLE x", "a.b.c.d", "'t'", "a b"]
+    )
+    def test_bind_identifier_rejects_non_identifiers(self, name: str) -> None:
+        with pytest.raises(ValueError, match="Invalid object name"):
+            bind_identifier(name)
+
+
+class TestFetchResult:
+    """サイズ見積り付き fetch_result のテスト。"""
+
+    def _cursor(self, batches):
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_cursor.description = [["A"]]
+        mock_cursor.sfqid = "01b2-qid"
+        mock_cursor.fetchmany.side_effect = batches
+        mock_conn.cursor.return_value = mock_cursor
+        return mock_conn, mock_cursor
+
+    def test_fetch_result_reads_batches(self) -> None:
+        """バッチを順に読み、クエリ ID を保持する。"""
+        mock_conn, mock_cursor = self._cursor([[(1,), (2,)], [(3,)], []])
+
+        result = fetch_result(mock_conn, "SELECT A FROM t", batch_size=2)
+
+        mock_cursor.fetchmany.assert_called_with(2)
+        assert result.rows == [(1,), (2,), (3,)]
+        assert result.query_id == "01b2-qid"
+        assert result.to_dicts() == [{"A": 1}, {"A": 2}, {"A": 3}]
+        mock_cursor.close.assert_called_once()
+
+    def test_fetch_result_truncates_before_exceeding_budget(self) -> None:
+        """見積りが上限を超える行の手前で打ち切り、残りは取得しない。"""
+        mock_conn, mock_cursor = self._cursor([[(1,), (2,), (3,)], [(4,)], []])
+
+        result = fetch_result(
+            mock_conn, "SELECT A FROM t", row_size=lambda cols, row: 10, max_bytes=25
+        )
+
+        assert result.rows == [(1,), (2,)]
+        assert result.estimated_bytes == 20
+        assert result.truncated is True
+        assert mock_cursor.fetchmany.call_count == 1
+        mock_cursor.close.assert_called_once()
+
+    def test_fetch_result_marks_semi_structured_columns(self) -> None:
+        """VARIANT/OBJECT/ARRAY 列は RawJSON、その他の文字列はそのまま。"""
+        mock_conn, mock_cursor = self._cursor([[("x", '{"a":1}', "[1]", None)], []])
+        # (name, type_code, ...) : TEXT=2, VARIANT=5, ARRAY=10, OBJECT=9
+        mock_cursor.description = [("S", 2), ("V", 5), ("A", 10), ("O", 9)]
+
+        result = fetch_result(mock_conn, "SELECT * FROM t")
+
+        s_value, v_value, a_value, o_value = result.rows[0]
+        assert not isinstance(s_value, RawJSON)
+        assert isinstance(v_value, RawJSON) and v_value == '{"a":1}'
+        assert isinstance(a_value, RawJSON)
+        assert o_value is None
+
+    def test_fetch_query_marks_semi_structured_columns(self) -> None:
+        """fetch_query も同じ判定を行い、文字列としての等価性は保つ。"""
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_cursor.description = [("V", 5)]
+        mock_cursor.fetchall.return_value = [('{"a":1}',)]
+        mock_conn.cursor.return_value = mock_cursor
+
+        result = fetch_query(mock_conn, "SELECT V FROM t")
+
+        assert result == [{"V": '{"a":1}'}]
+        assert isinstance(result[0]["V"], RawJSON)
+
+
+class TestChunkedDownload:
+    """結果チャンクの並列取得のテスト。"""
+
+    def _chunks(self, count: int, size: int = 3, delay: float = 0.0):
+        return [
+            FakeResultBatch([(i * size + j,) for j in range(size)], delay)
+            for i in range(count)
+        ]
+
+    def _cursor(self, chunks):
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_cursor.description = [("A", 0)]
+        mock_cursor.get_result_batches.return_value = chunks
+        mock_conn.cursor.return_value = mock_cursor
+        return mock_conn, mock_cursor
+
+    def test_preserves_order_when_later_chunks_finish_first(self) -> None:
+        """先頭のチャンクほど遅くても、元の順序で返す。"""
+        chunks = [
+            FakeResultBatch([(i,)], delay=0.02 * (4 - i)) for i in range(4)
+        ]
+
+        batches = list(download_result_batches(chunks, workers=4))
+
+        assert batches == [[(0,)], [(1,)], [(2,)], [(3,)]]
+        assert all(c.downloaded_by.startswith("snowflake-mcp-fetch") for c in chunks)
+
+    def test_single_worker_downloads_inline(self) -> None:
+        chunks = self._chunks(2)
+        assert [len(b) for b in download_result_batches(chunks, workers=1)] == [3, 3]
+        assert chunks[0].downloaded_by == threading.current_thread().name
+
+    def test_errors_propagate(self) -> None:
+        chunks = [FakeResultBatch([(1,)]), FakeResultBatch([], error=OSError("s3"))]
+        with pytest.raises(OSError, match="s3"):
+            list(download_result_batches(chunks, workers=2))
+
+    def test_fetch_query_uses_result_batches(self) -> None:
+        mock_conn, mock_cursor = self._cursor(self._chunks(5))
+
+        result = fetch_query(mock_conn, "SELECT A FROM t", download_workers=3)
+
+        assert [row["A"] for row in result] == list(range(15))
+        mock_cursor.fetchall.assert_not_called()
+
+    def test_fetch_result_stops_downloading_after_truncation(self) -> None:
+        """打ち切り後は先読み分を除き、残りのチャンクを取得しない。"""
+        chunks = self._chunks(50)
+        mock_conn, _ = self._cursor(chunks)
+
+        result = fetch_result(
+            mock_conn,
+            "SELECT A FROM t",
+            row_size=lambda cols, row: 10,
+            max_bytes=45,
+            download_workers=2,
+        )
+
+        assert [row[0] for row in result.rows] == [0, 1, 2, 3]
+        assert result.truncated is True
+        downloaded = sum(c.downloaded_by is not None for c in chunks)
+        assert downloaded <= 2 * 2 + 2
+
+    def test_falls_back_to_fetchmany_without_batches(self) -> None:
+        mock_conn, mock_cursor = self._cursor(None)
+        mock_cursor.fetchmany.side_effect = [[(1,)], []]
+
+        result = fetch_result(mock_conn, "SELECT A FROM t", download_workers=4)
+
+        assert result.rows == [(1,)]
+
+    def test_get_fetch_workers(self) -> None:
+        assert get_fetch_workers({}) is None
+        assert get_fetch_workers({"SNOWFLAKE_FETCH_WORKERS": "0"}) is None
+        assert get_fetch_workers({"SNOWFLAKE_FETCH_WORKERS": "8"}) == 8
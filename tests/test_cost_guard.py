@@ -0,0 +1,103 @@
+"""Test pre-flight cost guard."""
+
+from unittest.mock import Mock
+
+import pytest
+from snowflake_mcp_server.cost_guard import (
+    CostBudget,
+    CostBudgetExceeded,
+    check_cost,
+    get_cost_budget,
+)
+from snowflake_mcp_server.explain import PlanCache, PlanEstimate, cached_explainer
+
+ESTIMATE = PlanEstimate(partitions_total=500, partitions_assigned=400, bytes_assigned=10_000)
+
+
+class TestCostBudget:
+    """コスト予算のテスト。"""
+
+    def test_violations(self) -> None:
+        """超過した上限のみ報告する。"""
+        budget = CostBudget(max_bytes=1000, max_partitions=1000)
+
+        violations = budget.violations(ESTIMATE)
+
+        assert len(violations) == 1
+        assert "bytesAssigned 10000" in violations[0]
+
+    def test_get_cost_budget_from_env(self) -> None:
+        """環境変数から予算を構築する。"""
+        env = {
+            "SNOWFLAKE_MAX_BYTES_SCANNED": "1000",
+            "SNOWFLAKE_COST_GUARD_MODE": "CONFIRM",
+        }
+
+        assert get_cost_budget(env) == CostBudget(max_bytes=1000, mode="confirm")
+
+    def test_get_cost_budget_disabled(self) -> None:
+        """上限未設定ならガード無効。"""
+        assert get_cost_budget({"SNOWFLAKE_COST_GUARD_MODE": "reject"}) is None
+
+    def test_get_cost_budget_invalid_mode(self) -> None:
+        """未知のモードは ValueError。"""
+        env = {"SNOWFLAKE_MAX_BYTES_SCANNED": "1", "SNOWFLAKE_COST_GUARD_MODE": "warn"}
+        with pytest.raises(ValueError, match="SNOWFLAKE_COST_GUARD_MODE"):
+            get_cost_budget(env)
+
+
+class TestCheckCost:
+    """check_cost のテスト。"""
+
+    def test_reject_mode_ignores_confirmation(self) -> None:
+        """reject モードでは確認済みでも拒否する。"""
+        budget = CostBudget(max_bytes=1000)
+
+        with pytest.raises(CostBudgetExceeded, match="exceeds budget"):
+            check_cost(Mock(), "SELECT 1", budget, confirmed=True, explain=lambda c, q: ESTIMATE)
+
+    def test_confirm_mode_allows_confirmed(self) -> None:
+        """confirm モードでは確認済みなら見積りを返して続行。"""
+        budget = CostBudget(max_bytes=1000, mode="confirm")
+        explain = lambda c, q: ESTIMATE  # noqa: E731
+
+        with pytest.raises(CostBudgetExceeded, match="confirm_cost=true"):
+            check_cost(Mock(), "SELECT 1", budget, explain=explain)
+        assert check_cost(Mock(), "SELECT 1", budget, confirmed=True, explain=explain) == ESTIMATE
+
+    def test_skips_non_explainable_and_failed_explain(self) -> None:
+        """SHOW 等や EXPLAIN 失敗時は判定しない。"""
+        budget = CostBudget(max_bytes=0)
+
+        def failing_explain(conn, query):
+            raise RuntimeError("compilation error")
+
+        assert check_cost(Mock(), "SHOW TABLES", budget, explain=failing_explain) is None
+        assert check_cost(Mock(), "SELECT x", budget, explain=failing_explain) is None
+
+
+class TestPlanCache:
+    """プランキャッシュのテスト。"""
+
+    def test_cached_explainer_reuses_plan_for_normalized_sql(self) -> None:
+        """空白や末尾セミコロンの違いは同じプランとして扱う。"""
+        explain = Mock(return_value=ESTIMATE)
+        cached = cached_explainer(PlanCache(), explain)
+
+        cached(Mock(), "SELECT *\n  FROM t")
+        cached(Mock(), "SELECT * FROM t;")
+
+        explain.assert_called_once()
+
+    def test_plan_cache_expires_and_evicts(self) -> None:
+        """TTL 経過で失効し、上限超過で古いものから追い出す。"""
+        now = [0.0]
+        cache = PlanCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+        cache.put("SELECT 1", ESTIMATE)
+        cache.put("SELECT 2", ESTIMATE)
+        cache.put("SELECT 3", ESTIMATE)
+
+        assert cache.get("SELECT 1") is None
+        assert cache.get("SELECT 3") == ESTIMATE
+        now[0] = 11.0
+        assert cache.get("SELECT 3") is None
@@ -0,0 +1,109 @@
+"""Test the on-disk cache shared across server processes."""
+
+import multiprocessing
+from pathlib import Path
+
+from snowflake_mcp_server.disk_cache import (
+    DiskCache,
+    cache_namespace,
+    get_disk_cache,
+    get_query_cache_ttl,
+)
+
+
+def _writer(directory: str, worker: int) -> None:
+    cache = DiskCache(directory)
+    for i in range(20):
+        cache.set(f"w{worker}:{i}", "x" * 10)
+    cache.close()
+
+
+class TestDiskCache:
+    """ディスクキャッシュのテスト。"""
+
+    def test_set_and_get_across_instances(self, tmp_path: Path) -> None:
+        """別インスタンス (別プロセス相当) からも同じ値を読める。"""
+        DiskCache(tmp_path).set("list_tables:SHOW TABLES", '[{"name":"T"}]')
+
+        assert DiskCache(tmp_path).get("list_tables:SHOW TABLES") == '[{"name":"T"}]'
+
+    def test_ttl_expiry(self, tmp_path: Path) -> None:
+        """TTL を過ぎたエントリはミス扱い。"""
+        now = [1000.0]
+        cache = DiskCache(tmp_path, default_ttl=10, clock=lambda: now[0])
+        cache.set("k", "v")
+
+        now[0] = 1009.0
+        assert cache.get("k") == "v"
+        now[0] = 1011.0
+        assert cache.get("k") is None
+
+    def test_size_bounded_eviction_by_last_access(self, tmp_path: Path) -> None:
+        """上限超過時は最終アクセスが古いものから追い出す。"""
+        now = [0.0]
+        cache = DiskCache(tmp_path, max_bytes=25, clock=lambda: now[0])
+        for key in ("a", "b"):
+            now[0] += 1
+            cache.set(key, "x" * 10)
+        now[0] += 1
+        cache.get("a")  # a を最近使ったことにする
+        now[0] += 1
+        cache.set("c", "x" * 10)
+
+        assert cache.get("a") == "x" * 10
+        assert cache.get("b") is None
+        assert cache.get("c") == "x" * 10
+
+    def test_namespaces_are_isolated(self, tmp_path: Path) -> None:
+        """接続先 (namespace) が異なればエントリは見えない。"""
+        DiskCache(tmp_path, namespace="one").set("k", "v")
+
+        assert DiskCache(tmp_path, namespace="two").get("k") is None
+
+    def test_concurrent_processes(self, tmp_path: Path) -> None:
+        """複数プロセスから同時に書き込んでも壊れない。"""
+        ctx = multiprocessing.get_context("spawn")
+        procs = [ctx.Process(target=_writer, args=(str(tmp_path), w)) for w in range(3)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(timeout=30)
+
+        assert all(p.exitcode == 0 for p in procs)
+        cache = DiskCache(tmp_path)
+        assert all(cache.get(f"w{w}:19") == "x" * 10 for w in range(3))
+
+    def test_unusable_directory_degrades_to_miss(self, tmp_path: Path) -> None:
+        """キャッシュファイルを開けない場合も例外にせずミス扱い。"""
+        blocker = tmp_path / "file"
+        blocker.write_text("not a directory")
+        cache = DiskCache(blocker / "sub")
+
+        cache.set("k", "v")
+        assert cache.get("k") is None
+
+
+class TestDiskCacheConfig:
+    """環境変数からの構築テスト。"""
+
+    def test_get_disk_cache_disabled_without_dir(self) -> None:
+        assert get_disk_cache(env={"SNOWFLAKE_USER": "u"}) is None
+
+    def test_get_disk_cache_from_env(self, tmp_path: Path) -> None:
+        env = {
+            "SNOWFLAKE_CACHE_DIR": str(tmp_path),
+            "SNOWFLAKE_CACHE_MAX_BYTES": "1000",
+            "SNOWFLAKE_CACHE_TTL_SECONDS": "60",
+        }
+        cache = get_disk_cache("prod", env)
+
+        assert cache is not None
+        assert cache.max_bytes == 1000 and cache.default_ttl == 60
+        assert cache.namespace == "connection:prod"
+        assert get_query_cache_ttl(env) == 0
+
+    def test_cache_namespace_depends_on_identity(self) -> None:
+        a = cache_namespace(None, {"SNOWFLAKE_USER": "a", "SNOWFLAKE_ROLE": "r"})
+        b = cache_namespace(None, {"SNOWFLAKE_USER": "b", "SNOWFLAKE_ROLE": "r"})
+
+        assert a != b and a.startswith("env:")
@@ -0,0 +1,84 @@
+"""Test EXPLAIN based cost estimation."""
+
+import json
+from unittest.mock import Mock
+
+import pytest
+from snowflake_mcp_server.connection import Statement
+from snowflake_mcp_server.explain import (
+    PlanCache,
+    PlanEstimate,
+    explain_query,
+    is_explainable,
+    parse_explain_json,
+)
+
+PLAN = {
+    "GlobalStats": {
+        "partitionsTotal": 120,
+        "partitionsAssigned": 12,
+        "bytesAssigned": 4096,
+    },
+    "Operations": [],
+}
+
+
+class TestFunctionalExplain:
+    """EXPLAIN 見積り API のテスト。"""
+
+    def test_parse_explain_json_from_string(self) -> None:
+        """JSON 文字列から GlobalStats を取り出す。"""
+        estimate = parse_explain_json(json.dumps(PLAN))
+
+        assert estimate == PlanEstimate(
+            partitions_total=120, partitions_assigned=12, bytes_assigned=4096
+        )
+
+    def test_parse_explain_json_without_global_stats(self) -> None:
+        """GlobalStats が無い場合は ValueError。"""
+        with pytest.raises(ValueError, match="GlobalStats"):
+            parse_explain_json({"Operations": []})
+
+    def test_is_explainable(self) -> None:
+        """SELECT / WITH のみ EXPLAIN 対象。"""
+        assert is_explainable("  select 1") is True
+        assert is_explainable("WITH t AS (SELECT 1) SELECT * FROM t") is True
+        assert is_explainable("SHOW TABLES") is False
+        assert is_explainable("") is False
+        assert is_explainable(None) is False
+
+    def test_explain_query_executes_explain_using_json(self) -> None:
+        """EXPLAIN USING JSON を実行しカーソルをクローズする。"""
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = (json.dumps(PLAN),)
+        mock_conn.cursor.return_value = mock_cursor
+
+        estimate = explain_query(mock_conn, "SELECT * FROM t")
+
+        mock_cursor.execute.assert_called_once_with("EXPLAIN USING JSON SELECT * FROM t")
+        mock_cursor.close.assert_called_once()
+        assert estimate.bytes_assigned == 4096
+
+    def test_explain_query_passes_bind_values(self) -> None:
+        """Statement は本実行と同じバインド値で EXPLAIN する。"""
+        mock_conn = Mock()
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchone.return_value = (json.dumps(PLAN),)
+
+        explain_query(mock_conn, Statement("SELECT * FROM t WHERE id = ?", (7,)))
+
+        mock_cursor.execute.assert_called_once_with(
+            "EXPLAIN USING JSON SELECT * FROM t WHERE id = ?", (7,)
+        )
+        assert is_explainable(Statement("SELECT ?", (1,))) is True
+
+    def test_plan_cache_keys_on_bind_values(self) -> None:
+        """同じテキストでもバインド値が違えば別の見積りとして扱う。"""
+        cache = PlanCache()
+        estimate = PlanEstimate(1, 1, 1)
+        cache.put(Statement("SELECT * FROM t WHERE id = ?", (1,)), estimate)
+
+        assert cache.get(Statement("SELECT *  FROM t WHERE id = ?", (1,))) == estimate
+        assert cache.get(Statement("SELECT * FROM t WHERE id = ?", (2,))) is None
+        assert cache.get("SELECT * FROM t WHERE id = ?") is None
@@ -0,0 +1,192 @@
+"""Test exporting query results to local files."""
+
+import csv
+import gzip
+import json
+import sys
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import Mock
+
+import anyio
+import pytest
+from mcp.server.fastmcp import FastMCP
+from snowflake_mcp_server.export import (
+    describe_columns,
+    export_to_file,
+    get_export_dir,
+    get_export_workers,
+    resolve_export_path,
+    write_parquet,
+)
+from snowflake_mcp_server.server import register_tools
+
+DESCRIPTION = [
+    ("ID", 0, None, None, 38, 0, False),
+    ("NAME", 2, None, None, None, None, True),
+]
+
+
+def _mock_connection(batches: list, chunks: list | None = None) -> Mock:
+    conn = Mock()
+    cursor = conn.cursor.return_value
+    cursor.description = DESCRIPTION
+    cursor.sfqid = "01b2c3d4-0000-1234-0000-00000000abcd"
+    cursor.fetchmany.side_effect = [*batches, []]
+    cursor.get_result_batches.return_value = chunks
+    return conn
+
+
+def _read_csv_gz(path: Path) -> list:
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        return list(csv.reader(f))
+
+
+class TestResolveExportPath:
+    """出力先パス解決のテスト。"""
+
+    def test_appends_extension(self, tmp_path: Path) -> None:
+        path = resolve_export_path(tmp_path, "orders", "csv.gz")
+        assert path == tmp_path.resolve() / "orders.csv.gz"
+        assert resolve_export_path(tmp_path, "o.parquet", "parquet").name == "o.parquet"
+
+    def test_generates_name(self, tmp_path: Path) -> None:
+        path = resolve_export_path(tmp_path, None, "parquet")
+        assert path.name.startswith("export-") and path.suffix == ".parquet"
+
+    @pytest.mark.parametrize("name", ["../evil", "a/b", "/etc/passwd", ".hidden", "a..b"])
+    def test_rejects_names_outside_sandbox(self, tmp_path: Path, name: str) -> None:
+        with pytest.raises(ValueError, match="file name"):
+            resolve_export_path(tmp_path, name, "csv.gz")
+
+    def test_rejects_unknown_format(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="format"):
+            resolve_export_path(tmp_path, "x", "xlsx")
+
+
+class TestExportToFile:
+    """ファイル書き出しのテスト。"""
+
+    def test_streams_batches_to_csv_gz(self, tmp_path: Path) -> None:
+        """全バッチを書き出し、行数・スキーマ・プレビューだけを返す。"""
+        conn = _mock_connection([[(1, "a"), (2, "b")], [(3, None)]])
+        path = tmp_path / "out.csv.gz"
+
+        result = export_to_file(conn, "SELECT 1", path, "csv.gz", preview_rows=2)
+
+        assert _read_csv_gz(path) == [["ID", "NAME"], ["1", "a"], ["2", "b"], ["3", ""]]
+        assert result.row_count == 3
+        assert result.bytes == path.stat().st_size
+        assert result.preview == [{"ID": 1, "NAME": "a"}, {"ID": 2, "NAME": "b"}]
+        assert result.columns == [
+            {"name": "ID", "type": "FIXED", "nullable": False},
+            {"name": "NAME", "type": "TEXT", "nullable": True},
+        ]
+        assert result.query_id == "01b2c3d4-0000-1234-0000-00000000abcd"
+        assert not (tmp_path / "out.csv.gz.partial").exists()
+        conn.cursor.return_value.close.assert_called_once()
+
+    def test_preview_is_json_compatible(self, tmp_path: Path) -> None:
+        conn = _mock_connection([[(Decimal("1.50"), "x")]])
+        result = export_to_file(conn, "SELECT 1", tmp_path / "d.csv.gz", "csv.gz")
+        assert json.dumps(result.to_dict())
+        assert result.preview == [{"ID": 1.5, "NAME": "x"}]
+
+    def test_refuses_to_overwrite(self, tmp_path: Path) -> None:
+        path = tmp_path / "out.csv.gz"
+        path.write_text("keep")
+        with pytest.raises(FileExistsError):
+            export_to_file(_mock_connection([]), "SELECT 1", path, "csv.gz")
+        assert path.read_text() == "keep"
+
+    def test_removes_partial_file_on_failure(self, tmp_path: Path) -> None:
+        conn = _mock_connection([])
+        conn.cursor.return_value.fetchmany.side_effect = [[(1, "a")], RuntimeError("lost")]
+        path = tmp_path / "out.csv.gz"
+
+        with pytest.raises(RuntimeError):
+            export_to_file(conn, "SELECT 1", path, "csv.gz")
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_parallel_writes_one_part_per_chunk(self, tmp_path: Path) -> None:
+        """workers > 1 では結果チャンクごとの part ファイルをチャンク順に書く。"""
+        chunks = [[(1, "a"), (2, "b")], [(3, "c")], [(4, "d")]]
+        conn = _mock_connection([], chunks)
+        path = tmp_path / "out.csv.gz"
+
+        result = export_to_file(
+            conn, "SELECT 1", path, "csv.gz", workers=3, preview_rows=3
+        )
+
+        parts = sorted(path.iterdir())
+        assert [p.name for p in parts] == [
+            "part-00000.csv.gz",
+            "part-00001.csv.gz",
+            "part-00002.csv.gz",
+        ]
+        assert _read_csv_gz(parts[1]) == [["ID", "NAME"], ["3", "c"]]
+        assert (result.row_count, result.parts) == (4, 3)
+        assert [row["ID"] for row in result.preview] == [1, 2, 3]
+
+    def test_parquet_requires_pyarrow(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setitem(sys.modules, "pyarrow", None)
+        monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+        with pytest.raises(ValueError, match="pyarrow"):
+            export_to_file(
+                _mock_connection([]), "SELECT 1", tmp_path / "o.parquet", "parquet"
+            )
+        assert list(tmp_path.iterdir()) == []
+
+    def test_write_parquet_round_trip(self, tmp_path: Path) -> None:
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        tables = [pa.table({"ID": [1, 2]}), pa.table({"ID": [3]})]
+
+        rows, preview = write_parquet(tmp_path / "o.parquet", ["ID"], tables, 2)
+
+        assert rows == 3
+        assert preview == [(1,), (2,)]
+        assert pq.read_table(tmp_path / "o.parquet").column("ID").to_pylist() == [1, 2, 3]
+
+
+class TestExportConfig:
+    def test_describe_columns_handles_short_description(self) -> None:
+        assert describe_columns([("X",)]) == [{"name": "X", "type": "", "nullable": True}]
+
+    def test_env(self, tmp_path: Path) -> None:
+        assert get_export_dir({}) is None
+        assert get_export_dir({"SNOWFLAKE_EXPORT_DIR": str(tmp_path)}) == tmp_path
+        assert get_export_workers({}) == 1
+        assert get_export_workers({"SNOWFLAKE_EXPORT_WORKERS": "4"}) == 4
+
+
+class TestExportQueryTool:
+    def _server(self, conn: Mock, export_dir: Path | None) -> FastMCP:
+        mcp = FastMCP("snowflake-mcp")
+        register_tools(
+            mcp,
+            connection_factory=lambda: conn,
+            is_read_only=lambda sql: True,
+            export_dir=export_dir,
+        )
+        return mcp
+
+    def test_exports_into_sandbox(self, tmp_path: Path) -> None:
+        mcp = self._server(_mock_connection([[(1, "a")]]), tmp_path / "exports")
+
+        result = anyio.run(
+            mcp.call_tool, "export_query", {"sql": "SELECT 1", "file_name": "orders"}
+        )
+
+        payload = json.loads(result[0][0].text)
+        assert payload["path"] == str((tmp_path / "exports" / "orders.csv.gz").resolve())
+        assert payload["row_count"] == 1
+        assert Path(payload["path"]).exists()
+
+    def test_disabled_without_export_dir(self) -> None:
+        mcp = self._server(_mock_connection([]), None)
+        with pytest.raises(Exception, match="SNOWFLAKE_EXPORT_DIR"):
+            anyio.run(mcp.call_tool, "export_query", {"sql": "SELECT 1"})
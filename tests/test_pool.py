@@ -0,0 +1,147 @@
+"""Test connection pooling, warm-up and keep-alive."""
+
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+from snowflake_mcp_server.pool import (
+    HEARTBEAT_QUERY,
+    ConnectionPool,
+    WarehouseKeepAlive,
+    get_connection_pool,
+    get_warehouse_keepalive,
+)
+
+MONDAY_10 = datetime(2024, 1, 1, 10, 0)
+SATURDAY_10 = datetime(2024, 1, 6, 10, 0)
+
+
+def _conn() -> Mock:
+    conn = Mock()
+    conn.is_closed.return_value = False
+    return conn
+
+
+def _executed(conn: Mock) -> list:
+    return [c.args[0] for c in conn.cursor.return_value.execute.call_args_list]
+
+
+class TestConnectionPool:
+    """接続プールのテスト。"""
+
+    def test_warm_up_preopens_sessions(self) -> None:
+        """起動時に preopen 件の接続を開く。"""
+        factory = Mock(side_effect=lambda: _conn())
+        pool = ConnectionPool(factory, max_size=4, preopen=2, keepalive_interval=0)
+
+        pool.start()
+
+        assert factory.call_count == 2
+        assert pool.snapshot()["idle"] == 2
+        pool.close()
+
+    def test_acquire_reuses_released_connection(self) -> None:
+        """返却した接続を次の貸し出しで再利用する。"""
+        factory = Mock(side_effect=lambda: _conn())
+        pool = ConnectionPool(factory, preopen=0, keepalive_interval=0)
+
+        first = pool.acquire()
+        pool.release(first)
+        second = pool.acquire()
+
+        assert first is second
+        assert factory.call_count == 1
+        assert pool.stats.reused == 1
+
+    def test_overflow_and_closed_connections_are_discarded(self) -> None:
+        """上限超過分と閉じた接続は返却時に破棄する。"""
+        pool = ConnectionPool(lambda: _conn(), max_size=1, preopen=0, keepalive_interval=0)
+        a, b = pool.acquire(), pool.acquire()
+
+        pool.release(a)
+        pool.release(b)
+        assert pool.snapshot()["idle"] == 1
+        a.close.assert_called_once()
+
+        c = pool.acquire()
+        c.is_closed.return_value = True
+        pool.release(c)
+        assert pool.snapshot()["idle"] == 0
+
+    def test_heartbeat_replaces_failed_sessions(self) -> None:
+        """ハートビートに失敗した接続は破棄し、preopen 件まで開き直す。"""
+        healthy, broken, fresh = _conn(), _conn(), _conn()
+        broken.cursor.return_value.execute.side_effect = RuntimeError("session expired")
+        factory = Mock(side_effect=[healthy, broken, fresh])
+        pool = ConnectionPool(factory, preopen=2, keepalive_interval=0)
+        pool.warm_up()
+
+        pool.heartbeat()
+
+        assert _executed(healthy) == [HEARTBEAT_QUERY]
+        broken.close.assert_called_once()
+        assert pool.stats.heartbeat_failures == 1
+        assert pool.snapshot()["idle"] == 2
+
+    def test_warehouse_keepalive_only_during_business_hours(self) -> None:
+        """業務時間帯だけウェアハウス用のクエリを発行する。"""
+        conn = _conn()
+        now = [SATURDAY_10]
+        keepalive = WarehouseKeepAlive(9, 18, query="SELECT warm()")
+        pool = ConnectionPool(
+            lambda: conn,
+            preopen=1,
+            keepalive_interval=0,
+            warehouse_keepalive=keepalive,
+            now=lambda: now[0],
+        )
+        pool.warm_up()
+
+        pool.heartbeat()
+        now[0] = MONDAY_10
+        pool.heartbeat()
+
+        assert _executed(conn) == [HEARTBEAT_QUERY, HEARTBEAT_QUERY, "SELECT warm()"]
+        assert pool.stats.warehouse_pings == 1
+
+    def test_warm_up_failure_is_not_fatal(self) -> None:
+        """事前オープンに失敗しても起動は継続する。"""
+        pool = ConnectionPool(Mock(side_effect=RuntimeError("down")), keepalive_interval=0)
+
+        assert pool.warm_up() == 0
+
+
+class TestPoolConfig:
+    """環境変数からのプール設定テスト。"""
+
+    def test_pool_disabled_with_zero_size(self) -> None:
+        assert get_connection_pool(Mock(), {"SNOWFLAKE_POOL_SIZE": "0"}) is None
+
+    def test_pool_from_env(self) -> None:
+        env = {
+            "SNOWFLAKE_POOL_SIZE": "8",
+            "SNOWFLAKE_POOL_PREOPEN": "2",
+            "SNOWFLAKE_KEEPALIVE_INTERVAL_SECONDS": "60",
+            "SNOWFLAKE_KEEPALIVE_WAREHOUSE_HOURS": "08-20",
+            "SNOWFLAKE_KEEPALIVE_WAREHOUSE_DAYS": "MON,WED-FRI",
+        }
+        pool = get_connection_pool(Mock(), env)
+
+        assert pool is not None
+        assert (pool.max_size, pool.preopen, pool.keepalive_interval) == (8, 2, 60)
+        assert pool.warehouse_keepalive == WarehouseKeepAlive(
+            8, 20, weekdays=frozenset({0, 2, 3, 4})
+        )
+
+    def test_invalid_keepalive_hours(self) -> None:
+        with pytest.raises(ValueError, match="SNOWFLAKE_KEEPALIVE_WAREHOUSE_HOURS"):
+            get_warehouse_keepalive({"SNOWFLAKE_KEEPALIVE_WAREHOUSE_HOURS": "18-9"})
+
+    def test_invalid_keepalive_days(self) -> None:
+        with pytest.raises(ValueError, match="SNOWFLAKE_KEEPALIVE_WAREHOUSE_DAYS"):
+            get_warehouse_keepalive(
+                {
+                    "SNOWFLAKE_KEEPALIVE_WAREHOUSE_HOURS": "9-18",
+                    "SNOWFLAKE_KEEPALIVE_WAREHOUSE_DAYS": "WEEKDAYS",
+                }
+            )
@@ -0,0 +1,81 @@
+"""Test the in-process sampling profiler."""
+
+import sys
+import threading
+
+import anyio
+from mcp.server.fastmcp import FastMCP
+from snowflake_mcp_server.profiler import OTHER_STACK, SamplingProfiler, frame_stack
+from snowflake_mcp_server.server import register_tools
+
+
+def _busy_marker(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(100))
+
+
+class TestSamplingProfiler:
+    """サンプリングプロファイラのテスト。"""
+
+    def test_frame_stack_is_root_to_leaf(self) -> None:
+        stack = frame_stack(sys._getframe())
+        assert "test_frame_stack_is_root_to_leaf" in stack[-1]
+
+    def test_sample_counts_other_threads(self) -> None:
+        """他スレッドで実行中の関数が葉フレームとして集計される。"""
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_marker, args=(stop,), daemon=True)
+        worker.start()
+        profiler = SamplingProfiler()
+        try:
+            for _ in range(5):
+                profiler.sample()
+        finally:
+            stop.set()
+            worker.join()
+
+        snapshot = profiler.snapshot(top=50)
+        assert snapshot["samples"] == 5
+        frames = [f["frame"] for f in snapshot["top_functions"]]
+        assert any("_busy_marker" in frame for frame in frames)
+
+    def test_distinct_stacks_are_bounded(self) -> None:
+        """異なるスタックは max_stacks 種類までで、超えた分は OTHER_STACK に数える。"""
+        profiler = SamplingProfiler(max_stacks=1)
+        profiler.sample()
+        profiler.sample()  # 呼び出し行が異なるので別スタック
+
+        stacks = profiler._stacks
+        assert len(stacks.keys() - {OTHER_STACK}) == 1
+        assert stacks[OTHER_STACK] >= 1
+
+    def test_start_stop_reset(self) -> None:
+        profiler = SamplingProfiler(interval=0.001)
+        assert profiler.start() is True
+        assert profiler.start() is False
+        assert profiler.running
+        while profiler.samples == 0:
+            threading.Event().wait(0.001)
+        assert profiler.stop() is True
+        assert not profiler.running
+        assert profiler.stop() is False
+
+        profiler.reset()
+        assert profiler.snapshot()["samples"] == 0
+
+
+class TestProfilerTool:
+    def test_tool_toggles_profiler(self) -> None:
+        profiler = SamplingProfiler(interval=0.001)
+        mcp = FastMCP("snowflake-mcp")
+        register_tools(
+            mcp,
+            connection_factory=lambda: None,
+            is_read_only=lambda sql: True,
+            profiler=profiler,
+        )
+
+        anyio.run(mcp.call_tool, "sampling_profiler", {"action": "start"})
+        assert profiler.running
+        anyio.run(mcp.call_tool, "sampling_profiler", {"action": "stop"})
+        assert not profiler.running
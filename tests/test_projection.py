@@ -0,0 +1,100 @@
+"""Test projection and name filtering of DESCRIBE outputs."""
+
+import json
+from typing import Any, List
+from unittest.mock import Mock
+
+import anyio
+import pytest
+from mcp.server.fastmcp import FastMCP
+from snowflake_mcp_server.connection import Statement
+from snowflake_mcp_server.projection import (
+    build_projection_query,
+    drop_null_fields,
+    fetch_projected,
+)
+from snowflake_mcp_server.server import register_tools
+
+QID = "01b2c3d4-0000-1234-0000-00000000abcd"
+
+
+class TestBuildProjectionQuery:
+    def test_projection_and_filter(self) -> None:
+        statement = build_projection_query(QID, ["NAME", "type"], "%_id")
+        assert statement == Statement(
+            'SELECT "name", "type" FROM TABLE(RESULT_SCAN(?)) WHERE "name" ILIKE ?',
+            (QID, "%_id"),
+        )
+
+    def test_defaults_to_last_query_id(self) -> None:
+        assert build_projection_query(None) == Statement(
+            "SELECT * FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()))"
+        )
+
+    def test_quotes_untrusted_input(self) -> None:
+        statement = build_projection_query(QID, ['x" FROM t; --'], "a' OR 1=1 --")
+        assert '"x"" from t; --"' in statement.sql
+        assert statement.params[-1] == "a' OR 1=1 --"
+
+    def test_rejects_invalid_query_id(self) -> None:
+        with pytest.raises(ValueError):
+            build_projection_query("'); DROP TABLE t; --")
+
+
+def test_drop_null_fields() -> None:
+    rows = [
+        {"name": "ID", "default": None, "comment": None},
+        {"name": "NOTE", "default": None, "comment": "free text"},
+    ]
+    assert drop_null_fields(rows) == [
+        {"name": "ID", "comment": None},
+        {"name": "NOTE", "comment": "free text"},
+    ]
+    assert drop_null_fields([]) == []
+
+
+class TestFetchProjected:
+    def test_scans_describe_result(self) -> None:
+        conn = Mock()
+        conn.cursor.return_value.sfqid = QID
+        fetched: List[str] = []
+
+        def fetch(conn: Any, sql: str) -> List[dict]:
+            fetched.append(sql)
+            return [{"name": "ID", "type": "NUMBER", "comment": None}]
+
+        rows = fetch_projected(
+            conn, "DESCRIBE TABLE t", fields=["name", "type", "comment"], fetch=fetch
+        )
+
+        conn.cursor.return_value.execute.assert_called_once_with("DESCRIBE TABLE t")
+        assert fetched == [build_projection_query(QID, ["name", "type", "comment"])]
+        assert rows == [{"name": "ID", "type": "NUMBER"}]
+
+    def test_without_projection_runs_query_directly(self) -> None:
+        fetch = Mock(return_value=[{"name": "ID", "default": None}])
+        rows = fetch_projected(Mock(), "DESCRIBE TABLE t", fetch=fetch)
+        fetch.assert_called_once()
+        assert fetch.call_args.args[1] == "DESCRIBE TABLE t"
+        assert rows == [{"name": "ID"}]
+
+
+def test_describe_table_tool_projects() -> None:
+    conn = Mock()
+    cursor = conn.cursor.return_value
+    cursor.sfqid = QID
+    cursor.description = [("name", 2, None, None, None, None, True)]
+    cursor.fetchall.return_value = [("CUSTOMER_ID",)]
+    mcp = FastMCP("snowflake-mcp")
+    register_tools(mcp, connection_factory=lambda: conn, is_read_only=lambda sql: True)
+
+    result = anyio.run(
+        mcp.call_tool,
+        "describe_table",
+        {"table_name": "orders", "fields": ["name"], "name_filter": "%_ID"},
+    )
+
+    executed = [c.args for c in cursor.execute.call_args_list]
+    assert ("DESCRIBE TABLE IDENTIFIER(?)", ("ORDERS",)) in executed
+    assert Statement(*executed[-1]) == build_projection_query(QID, ["name"], "%_ID")
+    assert json.loads(result[0][0].text) == {"name": "CUSTOMER_ID"}
@@ -0,0 +1,118 @@
+"""Test compiled allow/deny query policies."""
+
+from pathlib import Path
+
+import pytest
+from snowflake_mcp_server.query_policy import (
+    PrefixTrie,
+    QueryPolicy,
+    TokenAutomaton,
+    compile_rule,
+    get_query_policy,
+    parse_policy_file,
+)
+
+
+class TestCompileRule:
+    def test_token_sequence(self) -> None:
+        assert compile_rule("secret_db.private") == (("SECRET_DB", ".", "PRIVATE"), False)
+        assert compile_rule('"Mixed".t') == (("Mixed", ".", "T"), False)
+
+    def test_wildcard(self) -> None:
+        assert compile_rule("system$*") == (("SYSTEM$",), True)
+
+    @pytest.mark.parametrize("rule", ["", "a.b*", "*"])
+    def test_invalid(self, rule: str) -> None:
+        with pytest.raises(ValueError):
+            compile_rule(rule)
+
+
+class TestAutomaton:
+    def test_search_finds_overlapping_patterns(self) -> None:
+        automaton = TokenAutomaton([(("A", "B", "C"), "abc"), (("B", "D"), "bd")])
+        assert automaton.search(["X", "A", "B", "D"]) == "bd"
+        assert automaton.search(["A", "B", "C"]) == "abc"
+        assert automaton.search(["A", "B", "X", "C"]) is None
+
+    def test_match_prefix_is_anchored(self) -> None:
+        automaton = TokenAutomaton([(("SHOW", "TABLES"), "show tables")])
+        assert automaton.match_prefix(["SHOW", "TABLES", "IN", "X"]) == "show tables"
+        assert automaton.match_prefix(["SHOW", "USERS"]) is None
+        assert automaton.match_prefix(["X", "SHOW", "TABLES"]) is None
+
+    def test_prefix_trie(self) -> None:
+        trie = PrefixTrie([("SYSTEM$", "SYSTEM$*"), ("EXT_", "EXT_*")])
+        assert trie.match("SYSTEM$WAIT") == "SYSTEM$*"
+        assert trie.match("EXT_") == "EXT_*"
+        assert trie.match("SYSTEM") is None
+
+
+class TestQueryPolicy:
+    def policy(self) -> QueryPolicy:
+        return QueryPolicy(
+            ["SELECT", "WITH", "SHOW TABLES"],
+            ["SYSTEM$*", "ext_enrich", "secret_db.private"],
+        )
+
+    def test_allows_matching_statements(self) -> None:
+        policy = self.policy()
+        assert policy("select * from orders")
+        assert policy("-- comment\nWITH t AS (SELECT 1) SELECT * FROM t")
+        assert policy("show tables in schema public")
+
+    def test_rejects_unlisted_statements(self) -> None:
+        policy = self.policy()
+        assert policy.violation("SHOW USERS") == "statement type not allowed: SHOW"
+        assert not policy("DELETE FROM orders")
+        assert not policy("SELECT 1; DROP TABLE orders")
+        assert not policy("")
+
+    def test_rejects_denied_patterns_anywhere(self) -> None:
+        policy = self.policy()
+        assert policy.violation("SELECT system$wait(10)") == "denied by rule 'SYSTEM$*'"
+        assert not policy("SELECT EXT_ENRICH(name) FROM customers")
+        assert not policy('SELECT * FROM "SECRET_DB".private.users')
+        assert not policy("SELECT * FROM a JOIN secret_db . private.b ON TRUE")
+
+    def test_literals_do_not_match(self) -> None:
+        policy = self.policy()
+        assert policy("SELECT 'SYSTEM$WAIT', 'ext_enrich' FROM secret_db.public.t")
+        assert policy('SELECT * FROM "ext_enrich"')  # 引用識別子は大文字小文字を区別する
+
+    def test_large_policy(self) -> None:
+        denied = [f"fn_{i}" for i in range(5000)]
+        policy = QueryPolicy(["SELECT"], denied + ["SYSTEM$*"])
+        assert policy.rule_count == 5002
+        assert policy("SELECT fn_x(a) FROM t")
+        assert not policy("SELECT fn_4999(a) FROM t")
+
+
+class TestPolicyConfig:
+    def test_parse_policy_file(self) -> None:
+        allowed, denied = parse_policy_file(
+            ["# site policy", "", "allow SELECT", "deny SYSTEM$*", "DENY hr.payroll"]
+        )
+        assert allowed == ["SELECT"]
+        assert denied == ["SYSTEM$*", "hr.payroll"]
+
+    def test_parse_policy_file_rejects_unknown_action(self) -> None:
+        with pytest.raises(ValueError, match="line 1"):
+            parse_policy_file(["block SYSTEM$*"])
+
+    def test_get_query_policy(self, tmp_path: Path) -> None:
+        assert get_query_policy({}) is None
+
+        policy = get_query_policy({"SNOWFLAKE_DENIED_PATTERNS": "SYSTEM$*, ext_fn"})
+        assert policy is not None
+        assert policy("DESCRIBE TABLE orders")  # 許可ルール未指定なら読み取り専用文
+        assert not policy("SELECT ext_fn(1)")
+
+        path = tmp_path / "policy.txt"
+        path.write_text("allow SELECT\ndeny hr.payroll\n", encoding="utf-8")
+        policy = get_query_policy(
+            {"SNOWFLAKE_QUERY_POLICY_FILE": str(path), "SNOWFLAKE_ALLOWED_STATEMENTS": "SHOW"}
+        )
+        assert policy is not None
+        assert policy("SHOW TABLES") and policy("SELECT 1")
+        assert not policy("DESCRIBE TABLE orders")
+        assert not policy("SELECT * FROM hr.payroll")
@@ -0,0 +1,138 @@
+"""Test SQL fingerprinting and per-fingerprint statistics."""
+
+import random
+from unittest.mock import Mock
+
+import anyio
+import pytest
+from mcp.server.fastmcp import FastMCP
+from snowflake_mcp_server.query_stats import (
+    QueryStats,
+    get_query_stats,
+    normalize_fingerprint,
+    sql_fingerprint,
+)
+from snowflake_mcp_server.server import register_tools
+
+
+class TestFingerprint:
+    """フィンガープリントのテスト。"""
+
+    def test_literals_and_in_lists_are_collapsed(self) -> None:
+        assert (
+            normalize_fingerprint("select * from t where id in (1, 2, 3) and name = 'x';")
+            == "SELECT * FROM T WHERE ID IN ( ?+ ) AND NAME = ?"
+        )
+
+    def test_literal_only_differences_share_fingerprint(self) -> None:
+        """リテラル・IN リストの長さ・空白・大文字小文字・コメントの違いは同一視する。"""
+        a = sql_fingerprint("SELECT * FROM t WHERE id IN (1, 2) AND d > '2024-01-01'")
+        b = sql_fingerprint(
+            "select *  from T -- note\n where ID in (7) and d > '2025-06-30'"
+        )
+        assert a == b
+
+    def test_structure_differences_are_kept(self) -> None:
+        assert sql_fingerprint("SELECT a FROM t") != sql_fingerprint("SELECT b FROM t")
+        assert sql_fingerprint('SELECT "a" FROM t') != sql_fingerprint(
+            'SELECT "A" FROM t'
+        )
+
+    def test_subquery_in_is_not_collapsed(self) -> None:
+        assert normalize_fingerprint("SELECT 1 WHERE x IN (SELECT y FROM t)") == (
+            "SELECT ? WHERE X IN ( SELECT Y FROM T )"
+        )
+
+
+class TestQueryStats:
+    """フィンガープリントごとの統計のテスト。"""
+
+    def test_aggregates_per_fingerprint(self) -> None:
+        stats = QueryStats()
+        stats.record("SELECT * FROM t WHERE id = 1", 0.1, rows=10, bytes=100)
+        stats.record("SELECT * FROM t WHERE id = 2", 0.3, rows=5, bytes=50)
+        stats.record("SELECT * FROM t WHERE id = 3", 0.2, error=True)
+
+        (top,) = stats.top()
+        assert top["count"] == 3
+        assert top["rows"] == 15
+        assert top["bytes"] == 150
+        assert top["error_rate"] == pytest.approx(1 / 3, abs=1e-4)
+        assert top["total_latency_ms"] == pytest.approx(600)
+        assert top["p95_latency_ms"] == pytest.approx(300)
+        assert top["sql"] == "SELECT * FROM T WHERE ID = ?"
+
+    def test_space_saving_keeps_heavy_hitters_bounded(self) -> None:
+        """監視数は上限を超えず、頻出の形は稀な形に追い出されない。"""
+        stats = QueryStats(max_fingerprints=3, rng=random.Random(0))
+        for i in range(200):
+            stats.record("SELECT * FROM hot WHERE id = 1", 0.01)
+            stats.record(f"SELECT c{i} FROM cold", 0.01)
+
+        assert len(stats) == 3
+        top = stats.top(limit=1)[0]
+        assert top["sql"] == "SELECT * FROM HOT WHERE ID = ?"
+        assert top["count"] == 200
+        assert top["count_error"] == 0
+
+    def test_newcomer_inherits_min_count_as_error(self) -> None:
+        stats = QueryStats(max_fingerprints=1)
+        stats.record("SELECT a FROM t", 0.01)
+        stats.record("SELECT a FROM t", 0.01)
+        stats.record("SELECT b FROM t", 0.01)
+
+        (entry,) = stats.top()
+        assert entry["sql"] == "SELECT B FROM T"
+        assert (entry["count"], entry["count_error"]) == (3, 2)
+
+    def test_latency_samples_are_bounded(self) -> None:
+        stats = QueryStats(latency_samples=8, rng=random.Random(1))
+        for i in range(1000):
+            entry = stats.record("SELECT 1", i / 1000)
+        assert len(entry.latency_samples) == 8
+
+    def test_order_by(self) -> None:
+        stats = QueryStats()
+        stats.record("SELECT a FROM t", 0.01)
+        stats.record("SELECT a FROM t", 0.01)
+        stats.record("SELECT b FROM t", 5.0)
+
+        assert stats.top(order_by="total_latency")[0]["sql"] == "SELECT B FROM T"
+        with pytest.raises(ValueError, match="order_by"):
+            stats.top(order_by="unknown")
+
+    def test_get_query_stats(self) -> None:
+        assert get_query_stats({}).max_fingerprints == 256
+        stats = get_query_stats({"SNOWFLAKE_QUERY_STATS_MAX_FINGERPRINTS": "10"})
+        assert stats.max_fingerprints == 10
+
+
+class TestTopQueriesTool:
+    def test_query_tool_records_stats(self) -> None:
+        """query ツールの成功/失敗が top_queries に反映される。"""
+        stats = QueryStats()
+        conn = Mock()
+        cursor = conn.cursor.return_value
+        cursor.description = [("ID", 0)]
+        cursor.fetchmany.side_effect = [[(1,)], []]
+        mcp = FastMCP("snowflake-mcp")
+        register_tools(
+            mcp,
+            connection_factory=lambda: conn,
+            is_read_only=lambda sql: True,
+            query_stats=stats,
+        )
+
+        async def scenario():
+            await mcp.call_tool("query", {"sql": "SELECT ID FROM t WHERE id = 1"})
+            cursor.execute.side_effect = [None, RuntimeError("boom")]
+            with pytest.raises(Exception):
+                await mcp.call_tool("query", {"sql": "SELECT ID FROM t WHERE id = 2"})
+            return await mcp.call_tool("top_queries", {})
+
+        anyio.run(scenario)
+
+        (entry,) = stats.top()
+        assert entry["count"] == 2
+        assert entry["rows"] == 1
+        assert entry["error_rate"] == 0.5
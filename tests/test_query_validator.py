@@ -1,8 +1,15 @@
 """Test query validator functionality."""
 
 from snowflake_mcp_server.query_validator import (
+    NUMBER,
+    PARAM,
+    PUNCT,
+    QUOTED,
+    STRING,
+    WORD,
     is_read_only_query,
     normalize_query,
+    tokenize_sql,
     READ_ONLY_STATEMENTS,
 )
 
@@ -77,3 +84,42 @@ class TestFunctionalQueryValidation:
         assert set(READ_ONLY_STATEMENTS) == expected
         # Sequence なので変更不可能性もテスト
         assert isinstance(READ_ONLY_STATEMENTS, tuple)
+
+
+class TestTokenizeSql:
+    """SQL トークン化のテスト。"""
+
+    def test_kinds_and_case(self) -> None:
+        """キーワード/識別子は大文字化し、リテラルと引用識別子はそのまま残す。"""
+        tokens = tokenize_sql("select \"Col\", 'it''s', 1.5e3 from t where x = ?")
+        assert tokens == [
+            (WORD, "SELECT"),
+            (QUOTED, '"Col"'),
+            (PUNCT, ","),
+            (STRING, "'it''s'"),
+            (PUNCT, ","),
+            (NUMBER, "1.5e3"),
+            (WORD, "FROM"),
+            (WORD, "T"),
+            (WORD, "WHERE"),
+            (WORD, "X"),
+            (PUNCT, "="),
+            (PARAM, "?"),
+        ]
+
+    def test_comments_are_dropped(self) -> None:
+        tokens = tokenize_sql("SELECT 1 -- trailing\n/* block */ // snowflake")
+        assert [t.text for t in tokens] == ["SELECT", "1"]
+
+    def test_snowflake_specific_tokens(self) -> None:
+        """SYSTEM$ 関数・位置参照・キャスト演算子・$$ 文字列を 1 トークンとして扱う。"""
+        tokens = tokenize_sql("SELECT SYSTEM$WHOAMI($1)::text, $$a'b$$, :name")
+        assert (WORD, "SYSTEM$WHOAMI") in tokens
+        assert (WORD, "$1") in tokens
+        assert (PUNCT, "::") in tokens
+        assert (STRING, "$$a'b$$") in tokens
+        assert (PARAM, ":name") in tokens
+
+    def test_empty(self) -> None:
+        assert tokenize_sql(None) == []
+        assert tokenize_sql("  ") == []
@@ -0,0 +1,69 @@
+"""Test the recent query id registry and RESULT_SCAN query building."""
+
+import pytest
+from snowflake_mcp_server.result_registry import (
+    QueryRegistry,
+    build_result_scan_query,
+    validate_query_id,
+)
+
+QID = "01b2c3d4-0000-1234-0000-00000000abcd"
+
+
+class TestQueryRegistry:
+    """クエリ ID レジストリのテスト。"""
+
+    def test_latest_and_recent(self) -> None:
+        """セッションごとに新しい順で保持する。"""
+        registry = QueryRegistry()
+        registry.record("s1", "a", "SELECT 1")
+        registry.record("s1", "b", "SELECT 2")
+        registry.record("s2", "c", "SELECT 3")
+
+        assert registry.latest("s1").query_id == "b"
+        assert [q.query_id for q in registry.recent("s1")] == ["b", "a"]
+        assert registry.latest("unknown") is None
+
+    def test_bounded_per_session_and_sessions(self) -> None:
+        """件数・セッション数の上限を超えると古いものから捨てる。"""
+        registry = QueryRegistry(max_per_session=2, max_sessions=2)
+        for qid in ("a", "b", "c"):
+            registry.record("s1", qid, "SELECT 1")
+        registry.record("s2", "x", "SELECT 1")
+        registry.record("s3", "y", "SELECT 1")
+
+        assert registry.recent("s1") == []
+        assert [q.query_id for q in registry.recent("s2")] == ["x"]
+
+    def test_re_recording_moves_to_latest(self) -> None:
+        """同じ ID を再記録すると最新になる。"""
+        registry = QueryRegistry()
+        registry.record("s", "a", "SELECT 1")
+        registry.record("s", "b", "SELECT 2")
+        registry.record("s", "a", "SELECT 1")
+
+        assert registry.latest("s").query_id == "a"
+
+
+class TestResultScanQuery:
+    """RESULT_SCAN 用 SQL 構築のテスト。"""
+
+    def test_wraps_select(self) -> None:
+        sql = build_result_scan_query(QID, "SELECT region FROM previous_result;")
+
+        assert sql == (
+            f"WITH previous_result AS (SELECT * FROM TABLE(RESULT_SCAN('{QID}'))) "
+            "SELECT region FROM previous_result"
+        )
+
+    def test_merges_with_existing_cte(self) -> None:
+        sql = build_result_scan_query(
+            QID, "WITH t AS (SELECT * FROM previous_result) SELECT * FROM t"
+        )
+
+        assert sql.startswith("WITH previous_result AS (")
+        assert sql.endswith(", t AS (SELECT * FROM previous_result) SELECT * FROM t")
+
+    def test_rejects_malformed_query_id(self) -> None:
+        with pytest.raises(ValueError, match="Invalid Snowflake query id"):
+            validate_query_id("x') ; DROP TABLE t; --")
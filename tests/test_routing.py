@@ -0,0 +1,106 @@
+"""Test warehouse routing policy."""
+
+from unittest.mock import Mock
+
+import pytest
+from snowflake_mcp_server.explain import PlanEstimate
+from snowflake_mcp_server.routing import (
+    DEFAULT_MAX_SMALL_BYTES,
+    WarehouseRoutingPolicy,
+    get_routing_policy,
+    route_warehouse,
+)
+
+
+def _estimate(bytes_assigned: int, partitions_assigned: int = 1) -> PlanEstimate:
+    return PlanEstimate(
+        partitions_total=100,
+        partitions_assigned=partitions_assigned,
+        bytes_assigned=bytes_assigned,
+    )
+
+
+class TestWarehouseRoutingPolicy:
+    """ルーティングポリシーのテスト。"""
+
+    def test_choose_small_under_threshold(self) -> None:
+        """閾値以下は small を選ぶ。"""
+        policy = WarehouseRoutingPolicy("XS_WH", "L_WH", max_small_bytes=1000)
+
+        assert policy.choose_warehouse(_estimate(1000)) == "XS_WH"
+        assert policy.choose_warehouse(_estimate(1001)) == "L_WH"
+
+    def test_choose_large_on_partition_threshold(self) -> None:
+        """パーティション閾値を超えると large を選ぶ。"""
+        policy = WarehouseRoutingPolicy(
+            "XS_WH", "L_WH", max_small_bytes=1000, max_small_partitions=10
+        )
+
+        assert policy.choose_warehouse(_estimate(10, partitions_assigned=11)) == "L_WH"
+
+    def test_get_routing_policy_from_env(self) -> None:
+        """環境変数からポリシーを構築する。"""
+        env = {
+            "SNOWFLAKE_SMALL_WAREHOUSE": "XS_WH",
+            "SNOWFLAKE_LARGE_WAREHOUSE": "L_WH",
+            "SNOWFLAKE_ROUTING_MAX_SMALL_PARTITIONS": "50",
+        }
+        policy = get_routing_policy(env)
+
+        assert policy == WarehouseRoutingPolicy(
+            "XS_WH", "L_WH", DEFAULT_MAX_SMALL_BYTES, max_small_partitions=50
+        )
+
+    def test_get_routing_policy_disabled_without_both_warehouses(self) -> None:
+        """片方でも未設定ならルーティング無効。"""
+        assert get_routing_policy({"SNOWFLAKE_SMALL_WAREHOUSE": "XS_WH"}) is None
+
+    def test_get_routing_policy_invalid_threshold(self) -> None:
+        """数値でない閾値は ValueError。"""
+        env = {
+            "SNOWFLAKE_SMALL_WAREHOUSE": "XS_WH",
+            "SNOWFLAKE_LARGE_WAREHOUSE": "L_WH",
+            "SNOWFLAKE_ROUTING_MAX_SMALL_BYTES": "1GB",
+        }
+        with pytest.raises(ValueError, match="SNOWFLAKE_ROUTING_MAX_SMALL_BYTES"):
+            get_routing_policy(env)
+
+
+class TestRouteWarehouse:
+    """route_warehouse の副作用テスト。"""
+
+    def test_route_issues_use_warehouse(self) -> None:
+        """見積りに応じて USE WAREHOUSE を発行する。"""
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_conn.cursor.return_value = mock_cursor
+        policy = WarehouseRoutingPolicy("XS_WH", "L_WH", max_small_bytes=1000)
+
+        chosen = route_warehouse(
+            mock_conn, "SELECT * FROM big", policy, explain=lambda c, q: _estimate(5000)
+        )
+
+        assert chosen == "L_WH"
+        mock_cursor.execute.assert_called_once_with("USE WAREHOUSE L_WH")
+        mock_cursor.close.assert_called_once()
+
+    def test_route_skips_non_explainable(self) -> None:
+        """SHOW などは見積りせずデフォルトのまま。"""
+        mock_conn = Mock()
+        explain = Mock()
+        policy = WarehouseRoutingPolicy("XS_WH", "L_WH")
+
+        assert route_warehouse(mock_conn, "SHOW TABLES", policy, explain=explain) is None
+        explain.assert_not_called()
+        mock_conn.cursor.assert_not_called()
+
+    def test_route_falls_back_when_explain_fails(self) -> None:
+        """EXPLAIN が失敗しても例外にせずデフォルトウェアハウスで実行させる。"""
+        mock_conn = Mock()
+        policy = WarehouseRoutingPolicy("XS_WH", "L_WH")
+
+        def failing_explain(conn, query):
+            raise RuntimeError("compilation error")
+
+        assert route_warehouse(mock_conn, "SELECT 1", policy, explain=failing_explain) is None
+        mock_conn.cursor.assert_not_called()
@@ -0,0 +1,81 @@
+"""Test compact result serialization."""
+
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from snowflake_mcp_server.connection import QueryResult
+from snowflake_mcp_server.serialization import (
+    RawJSON,
+    estimate_row_size,
+    serialize_result,
+    serialize_rows,
+    to_json,
+)
+
+COLUMNS = ["ID", "AMOUNT", "CREATED", "DAY", "PAYLOAD", "BLOB", "NOTE"]
+ROW = (
+    1,
+    Decimal("12.340"),
+    datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    date(2024, 1, 2),
+    RawJSON('{"k":[1,2]}'),
+    b"\x00\x01",
+    None,
+)
+
+
+class TestFunctionalSerialization:
+    """シリアライズ API のテスト。"""
+
+    def test_to_json_fast_paths(self) -> None:
+        """Snowflake の主要な型を直接 JSON 断片へ変換する。"""
+        text = to_json(COLUMNS, [ROW])
+
+        assert text == (
+            '[{"ID":1,"AMOUNT":12.340,"CREATED":"2024-01-02T03:04:05+00:00",'
+            '"DAY":"2024-01-02","PAYLOAD":{"k":[1,2]},"BLOB":"AAE=","NOTE":null}]'
+        )
+        assert json.loads(text)[0]["PAYLOAD"] == {"k": [1, 2]}
+
+    def test_to_json_special_values(self) -> None:
+        """非有限値は null、未知の型は文字列化、非 ASCII はそのまま。"""
+        text = to_json(["A", "B", "C", "D"], [(float("nan"), Decimal("NaN"), object, "日本")])
+
+        data = json.loads(text)[0]
+        assert data["A"] is None and data["B"] is None
+        assert data["C"] == "<class 'object'>"
+        assert "日本" in text
+
+    def test_serialize_rows_delimited_and_markdown(self) -> None:
+        """CSV / TSV / Markdown 表形式。"""
+        rows = [(1, "a|b", None), (2, "x,y", True)]
+        columns = ["ID", "V", "F"]
+
+        assert serialize_rows(columns, rows, "csv") == 'ID,V,F\n1,a|b,\n2,"x,y",true\n'
+        assert serialize_rows(columns, rows, "tsv") == "ID\tV\tF\n1\ta|b\t\n2\tx,y\ttrue\n"
+        assert serialize_rows(columns, rows, "markdown") == (
+            "| ID | V | F |\n|---|---|---|\n| 1 | a\\|b |  |\n| 2 | x,y | true |\n"
+        )
+
+    def test_serialize_rows_unknown_format(self) -> None:
+        """未知のフォーマットは ValueError。"""
+        with pytest.raises(ValueError, match="Unsupported output format"):
+            serialize_rows(["A"], [], "xml")
+
+    def test_serialize_result_reports_truncation(self) -> None:
+        """打ち切り時は 2 つ目のテキストで通知する。"""
+        result = QueryResult(columns=["A"], rows=[(1,)], estimated_bytes=10, truncated=True)
+
+        contents = serialize_result(result)
+
+        assert contents[0] == '[{"A":1}]'
+        assert "truncated after 1 rows" in contents[1]
+
+    def test_estimate_row_size_is_close_to_json_size(self) -> None:
+        """見積りは実際のコンパクト JSON サイズに近い。"""
+        estimate = estimate_row_size(COLUMNS, ROW)
+        actual = len(to_json(COLUMNS, [ROW]).encode()) - 2
+
+        assert abs(estimate - actual) / actual < 0.5
@@ -1,8 +1,10 @@
 """Tests for the Snowflake MCP server module."""
 
 import anyio
-from unittest.mock import AsyncMock, Mock, patch
+import pytest
+from unittest.mock import ANY, AsyncMock, Mock, patch
 from mcp.server.fastmcp import FastMCP
+from snowflake_mcp_server.connection import QueryResult
 from snowflake_mcp_server.server import create_snowflake_mcp_server, register_tools
 
 
@@ -45,8 +47,9 @@ class TestCreateSnowflakeMcpServer:
         mock_is_read_only.return_value = True
 
         # Mock _execute_with_connection to return test results
-        expected_results = [{"column1": "value1", "column2": "value2"}]
-        mock_execute_with_connection.return_value = expected_results
+        mock_execute_with_connection.return_value = QueryResult(
+            columns=["column1", "column2"], rows=[("value1", "value2")]
+        )
 
         # Create server
         server = create_snowflake_mcp_server()
@@ -60,8 +63,9 @@ class TestCreateSnowflakeMcpServer:
 
         result = anyio.run(run_test)
 
-        # Verify results - check that the call was successful and returned data
+        # Verify results - compact JSON text with the same shape as before
         assert result is not None
+        assert result[0].text == '[{"column1":"value1","column2":"value2"}]'
         mock_is_read_only.assert_called_once_with("SELECT * FROM test_table")
         mock_execute_with_connection.assert_called_once()
 
@@ -290,6 +294,12 @@ class TestCreateSnowflakeMcpServer:
             "describe_schema",
             "list_databases",
             "describe_database",
+            "query_previous_result",
+            "server_stats",
+            "sampling_profiler",
+            "top_queries",
+            "export_query",
+            "table_profile",
         }
         actual_tools = {tool.name for tool in tools}
 
@@ -318,8 +328,8 @@ class TestFunctionalServerAPI:
             is_read_only=mock_is_read_only,
         )
 
-        # 7つのツールが登録されることを確認
-        assert mock_mcp.tool.call_count == 7
+        # 13個のツールが登録されることを確認
+        assert mock_mcp.tool.call_count == 13
 
     @patch("snowflake_mcp_server.server._wrap_errors")
     def test_register_tools_query_validation(self, mock_wrap_errors: Mock) -> None:
@@ -339,7 +349,7 @@ class TestFunctionalServerAPI:
         # query ツールが登録されていることを確認
         query_decorator_calls = [call for call in mock_mcp.tool.call_args_list]
         assert (
-            len(query_decorator_calls) == 7
+            len(query_decorator_calls) == 13
         )
 
     def test_register_tools_dependency_injection(self) -> None:
@@ -359,7 +369,7 @@ class TestFunctionalServerAPI:
         )
 
         # 正常に登録完了 (カスタムバリデータを注入できた)
-        assert mock_mcp.tool.call_count == 7  # 7つのツール
+        assert mock_mcp.tool.call_count == 13  # 13個のツール
 
     def test_functional_vs_class_equivalence(self) -> None:
         """関数型 API とクラス API の等価性テスト。"""
@@ -390,3 +400,272 @@ class TestFunctionalServerAPI:
             assert names1 == names2
 
         anyio.run(compare_tools)
+
+    def test_execute_with_connection_runs_prepare_hooks(self) -> None:
+        """prepare フックは同じ接続に対して実行前に呼ばれる。"""
+        from snowflake_mcp_server.server import _execute_with_connection
+
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_cursor.description = [["column1"]]
+        mock_cursor.fetchall.return_value = [("value1",)]
+        mock_conn.cursor.return_value = mock_cursor
+        hook = Mock()
+
+        result = anyio.run(
+            _execute_with_connection, lambda: mock_conn, "SELECT 1", [hook]
+        )
+
+        hook.assert_called_once_with(mock_conn, "SELECT 1")
+        mock_conn.close.assert_called_once()
+        assert result == [{"column1": "value1"}]
+
+    @patch("snowflake_mcp_server.server.route_warehouse")
+    def test_query_tool_routes_warehouse_when_policy_given(
+        self, mock_route_warehouse: Mock
+    ) -> None:
+        """routing_policy 指定時は query ツールでウェアハウスを振り分ける。"""
+        from snowflake_mcp_server.routing import WarehouseRoutingPolicy
+
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_cursor.description = [["column1"]]
+        mock_cursor.fetchmany.side_effect = [[("value1",)], []]
+        mock_conn.cursor.return_value = mock_cursor
+        policy = WarehouseRoutingPolicy("XS_WH", "L_WH")
+
+        server = FastMCP("snowflake-mcp")
+        register_tools(
+            server,
+            connection_factory=lambda: mock_conn,
+            is_read_only=lambda sql: True,
+            routing_policy=policy,
+        )
+
+        anyio.run(server.call_tool, "query", {"sql": "SELECT 1"})
+
+        mock_route_warehouse.assert_called_once_with(
+            mock_conn, "SELECT 1", policy, explain=ANY
+        )
+
+    def test_query_tool_rejects_over_budget_and_caches_plan(self) -> None:
+        """予算超過は実行前に拒否し、EXPLAIN はキャッシュされる。"""
+        import json
+        from snowflake_mcp_server.cost_guard import CostBudget
+
+        plan = json.dumps(
+            {
+                "GlobalStats": {
+                    "partitionsTotal": 10,
+                    "partitionsAssigned": 10,
+                    "bytesAssigned": 10_000,
+                }
+            }
+        )
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = (plan,)
+        mock_conn.cursor.return_value = mock_cursor
+
+        server = FastMCP("snowflake-mcp")
+        register_tools(
+            server,
+            connection_factory=lambda: mock_conn,
+            is_read_only=lambda sql: True,
+            cost_budget=CostBudget(max_bytes=1000, mode="confirm"),
+        )
+
+        async def run_test():
+            for sql in ("SELECT * FROM big", "SELECT  *  FROM big;"):
+                with pytest.raises(Exception, match="confirm_cost=true"):
+                    await server.call_tool("query", {"sql": sql})
+
+        anyio.run(run_test)
+
+        executed = [c.args[0] for c in mock_cursor.execute.call_args_list]
+        explains = [sql for sql in executed if sql.startswith("EXPLAIN")]
+        assert explains == ["EXPLAIN USING JSON SELECT * FROM big"]
+
+    def test_tools_set_statement_timeout_and_query_tag(self) -> None:
+        """各ツールは実行前にタイムアウトとツール名入りの QUERY_TAG を設定する。"""
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_cursor.description = [["name"]]
+        mock_cursor.fetchall.return_value = [("t1",)]
+        mock_conn.cursor.return_value = mock_cursor
+
+        server = FastMCP("snowflake-mcp")
+        register_tools(
+            server,
+            connection_factory=lambda: mock_conn,
+            is_read_only=lambda sql: True,
+            statement_timeout=45,
+        )
+
+        anyio.run(server.call_tool, "list_tables", {})
+
+        executed = [c.args[0] for c in mock_cursor.execute.call_args_list]
+        assert executed[0].startswith(
+            "ALTER SESSION SET QUERY_TAG = '{\"app\":\"snowflake-mcp-server\",\"tool\":\"list_tables\"}'"
+        )
+        assert executed[0].endswith("STATEMENT_TIMEOUT_IN_SECONDS = 45")
+        assert executed[1] == "SHOW TABLES"
+
+    def test_query_tool_output_format_and_truncation(self) -> None:
+        """output_format に従いテキスト化し、上限超過分は打ち切りを通知する。"""
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_cursor.description = [["ID"], ["NAME"]]
+        mock_cursor.fetchmany.side_effect = [[(1, "a"), (2, "b"), (3, "c")], []]
+        mock_conn.cursor.return_value = mock_cursor
+
+        server = FastMCP("snowflake-mcp")
+        register_tools(
+            server,
+            connection_factory=lambda: mock_conn,
+            is_read_only=lambda sql: True,
+            max_result_bytes=80,
+        )
+
+        result = anyio.run(
+            server.call_tool, "query", {"sql": "SELECT 1", "output_format": "csv"}
+        )
+
+        assert result[0].text == "ID,NAME\n1,a\n2,b\n"
+        assert "truncated after 2 rows" in result[1].text
+
+    def test_metadata_tools_answer_from_disk_cache(self, tmp_path) -> None:
+        """ディスクキャッシュがあれば別サーバ (別プロセス相当) でも Snowflake に接続しない。"""
+        from snowflake_mcp_server.disk_cache import DiskCache
+
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_cursor.description = [["name"]]
+        mock_cursor.fetchall.return_value = [("T1",)]
+        mock_conn.cursor.return_value = mock_cursor
+
+        first = FastMCP("snowflake-mcp")
+        register_tools(
+            first,
+            connection_factory=lambda: mock_conn,
+            is_read_only=lambda sql: True,
+            disk_cache=DiskCache(tmp_path),
+        )
+        anyio.run(first.call_tool, "list_tables", {})
+
+        factory = Mock()
+        second = FastMCP("snowflake-mcp")
+        register_tools(
+            second,
+            connection_factory=factory,
+            is_read_only=lambda sql: True,
+            disk_cache=DiskCache(tmp_path),
+        )
+        result = anyio.run(second.call_tool, "list_tables", {})
+
+        factory.assert_not_called()
+        assert "T1" in result[0][0].text
+
+    def test_query_previous_result_uses_latest_query_id(self) -> None:
+        """query の結果にクエリ ID を添え、フォローアップは RESULT_SCAN で実行する。"""
+        qid = "01b2c3d4-0000-1234-0000-00000000abcd"
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_cursor.description = [["REGION"]]
+        mock_cursor.sfqid = qid
+        mock_cursor.fetchmany.side_effect = [[("EU",)], [], [("EU",)], []]
+        mock_conn.cursor.return_value = mock_cursor
+
+        server = FastMCP("snowflake-mcp")
+        register_tools(
+            server,
+            connection_factory=lambda: mock_conn,
+            is_read_only=lambda sql: True,
+        )
+
+        async def run_test():
+            first = await server.call_tool("query", {"sql": "SELECT * FROM sales"})
+            await server.call_tool(
+                "query_previous_result",
+                {"sql": "SELECT region FROM previous_result GROUP BY region"},
+            )
+            return first
+
+        first = anyio.run(run_test)
+
+        assert first[-1].text == f"query_id: {qid}"
+        executed = [c.args[0] for c in mock_cursor.execute.call_args_list]
+        assert executed[-1] == (
+            f"WITH previous_result AS (SELECT * FROM TABLE(RESULT_SCAN('{qid}'))) "
+            "SELECT region FROM previous_result GROUP BY region"
+        )
+
+    def test_query_previous_result_without_history(self) -> None:
+        """記録が無ければエラー。"""
+        server = FastMCP("snowflake-mcp")
+        register_tools(
+            server, connection_factory=Mock(), is_read_only=lambda sql: True
+        )
+
+        async def run_test():
+            with pytest.raises(Exception, match="No previous query result"):
+                await server.call_tool(
+                    "query_previous_result", {"sql": "SELECT * FROM previous_result"}
+                )
+
+        anyio.run(run_test)
+
+    def test_tools_reuse_pooled_session(self) -> None:
+        """プール利用時は接続を再利用し、同じセッションパラメータを再送しない。"""
+        from snowflake_mcp_server.pool import ConnectionPool
+
+        mock_conn = Mock()
+        mock_conn.is_closed.return_value = False
+        mock_cursor = Mock()
+        mock_cursor.description = [["name"]]
+        mock_cursor.fetchall.return_value = [("T1",)]
+        mock_conn.cursor.return_value = mock_cursor
+        factory = Mock(return_value=mock_conn)
+        pool = ConnectionPool(factory, preopen=0, keepalive_interval=0)
+
+        server = FastMCP("snowflake-mcp")
+        register_tools(
+            server,
+            connection_factory=Mock(),
+            is_read_only=lambda sql: True,
+            connection_pool=pool,
+        )
+
+        async def run_test():
+            await server.call_tool("list_tables", {})
+            await server.call_tool("list_tables", {})
+            return await server.call_tool("server_stats", {})
+
+        stats = anyio.run(run_test)
+
+        factory.assert_called_once()
+        mock_conn.close.assert_not_called()
+        executed = [c.args[0] for c in mock_cursor.execute.call_args_list]
+        assert executed.count("SHOW TABLES") == 2
+        assert len([sql for sql in executed if sql.startswith("ALTER SESSION")]) == 1
+        assert '"reused": 1' in stats[0][0].text
+
+
+def test_query_tool_binds_params() -> None:
+    """query ツールの params はバインド変数として渡り、SQL テキストは変わらない。"""
+    conn = Mock()
+    cursor = conn.cursor.return_value
+    cursor.description = [("ID", 0, None, None, 38, 0, False)]
+    cursor.fetchmany.side_effect = [[(42,)], []]
+    cursor.get_result_batches.return_value = None
+    cursor.sfqid = "01b2c3d4-0000-1234-0000-00000000abcd"
+    mcp = FastMCP("snowflake-mcp")
+    register_tools(mcp, connection_factory=lambda: conn, is_read_only=lambda sql: True)
+
+    anyio.run(
+        mcp.call_tool,
+        "query",
+        {"sql": "SELECT ID FROM t WHERE ID = ?", "params": [42]},
+    )
+
+    cursor.execute.assert_any_call("SELECT ID FROM t WHERE ID = ?", (42,))
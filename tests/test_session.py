@@ -0,0 +1,78 @@
+"""Test session parameter management."""
+
+import json
+from unittest.mock import Mock
+
+from snowflake_mcp_server.session import (
+    DEFAULT_STATEMENT_TIMEOUT_SECONDS,
+    apply_session_parameters,
+    build_alter_session,
+    build_query_tag,
+    get_statement_timeout,
+)
+
+
+class TestFunctionalSession:
+    """セッションパラメータ API のテスト。"""
+
+    def test_build_query_tag(self) -> None:
+        """ツール名・リクエスト ID・クライアント ID を JSON タグにする。"""
+        tag = build_query_tag("query", request_id="7", client_id="agent-1")
+
+        assert json.loads(tag) == {
+            "app": "snowflake-mcp-server",
+            "tool": "query",
+            "request_id": "7",
+            "client_id": "agent-1",
+        }
+
+    def test_build_alter_session_escapes_literals(self) -> None:
+        """文字列はエスケープしてクオート、数値はそのまま。"""
+        sql = build_alter_session(
+            {"STATEMENT_TIMEOUT_IN_SECONDS": 60, "QUERY_TAG": "it's"}
+        )
+
+        assert sql == (
+            "ALTER SESSION SET STATEMENT_TIMEOUT_IN_SECONDS = 60, QUERY_TAG = 'it\\'s'"
+        )
+
+    def test_get_statement_timeout(self) -> None:
+        """未設定は既定値、0 は無効 (None)。"""
+        assert get_statement_timeout({"X": "1"}) == DEFAULT_STATEMENT_TIMEOUT_SECONDS
+        assert get_statement_timeout({"SNOWFLAKE_STATEMENT_TIMEOUT_SECONDS": "30"}) == 30
+        assert get_statement_timeout({"SNOWFLAKE_STATEMENT_TIMEOUT_SECONDS": "0"}) is None
+
+    def test_apply_session_parameters_sends_only_changes(self) -> None:
+        """同一接続では変化したパラメータだけを送る。"""
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_conn.cursor.return_value = mock_cursor
+
+        first = apply_session_parameters(
+            mock_conn, {"STATEMENT_TIMEOUT_IN_SECONDS": 60, "QUERY_TAG": "a"}
+        )
+        second = apply_session_parameters(
+            mock_conn, {"STATEMENT_TIMEOUT_IN_SECONDS": 60, "QUERY_TAG": "a"}
+        )
+        third = apply_session_parameters(
+            mock_conn, {"STATEMENT_TIMEOUT_IN_SECONDS": 60, "QUERY_TAG": "b"}
+        )
+
+        assert len(first) == 2
+        assert second == {}
+        assert third == {"QUERY_TAG": "b"}
+        assert [c.args[0] for c in mock_cursor.execute.call_args_list] == [
+            "ALTER SESSION SET STATEMENT_TIMEOUT_IN_SECONDS = 60, QUERY_TAG = 'a'",
+            "ALTER SESSION SET QUERY_TAG = 'b'",
+        ]
+        assert mock_cursor.close.call_count == 2
+
+    def test_apply_session_parameters_tracks_each_connection(self) -> None:
+        """状態は接続ごとに独立。"""
+        conn_a, conn_b = Mock(), Mock()
+
+        apply_session_parameters(conn_a, {"QUERY_TAG": "a"})
+        apply_session_parameters(conn_b, {"QUERY_TAG": "a"})
+
+        conn_a.cursor.return_value.execute.assert_called_once()
+        conn_b.cursor.return_value.execute.assert_called_once()
@@ -0,0 +1,128 @@
+"""Test the slow-query log."""
+
+import json
+from pathlib import Path
+from unittest.mock import Mock
+
+import anyio
+import pytest
+from mcp.server.fastmcp import FastMCP
+from snowflake_mcp_server.query_stats import sql_fingerprint
+from snowflake_mcp_server.server import register_tools
+from snowflake_mcp_server.slow_query_log import (
+    SlowQueryLog,
+    SlowQueryTracer,
+    get_slow_query_log,
+)
+from snowflake_mcp_server.tracing import RecordingTracer
+
+
+def _read_entries(path: Path) -> list:
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def _mock_connection() -> Mock:
+    conn = Mock()
+    cursor = conn.cursor.return_value
+    cursor.description = [("ID", 0)]
+    cursor.sfqid = "01b2c3d4-0000-1234-0000-00000000abcd"
+    cursor.fetchmany.side_effect = [[(1,), (2,)], []]
+    return conn
+
+
+class TestSlowQueryTracer:
+    """スパンからフェーズ時間を集めて書き出すテスト。"""
+
+    def test_writes_entry_with_phases_and_attributes(self, tmp_path: Path) -> None:
+        """しきい値以上の呼び出しをフェーズ時間・属性付きで 1 行書き出す。"""
+        path = tmp_path / "slow.jsonl"
+        tracer = SlowQueryTracer(SlowQueryLog(path, threshold_seconds=0))
+
+        attributes = {"mcp.tool": "query", "db.statement": "SELECT  1"}
+        with tracer.span("tool.query", **attributes):
+            with tracer.span("cursor.execute") as span:
+                span.set_attribute("snowflake.query_id", "qid")
+            with tracer.span("fetch") as span:
+                span.set_attribute("db.row_count", 5)
+                span.set_attribute("result.estimated_bytes", 120)
+
+        (entry,) = _read_entries(path)
+        assert entry["tool"] == "query"
+        assert entry["sql"] == "SELECT 1"
+        assert entry["fingerprint"] == sql_fingerprint("SELECT 1")
+        assert set(entry["phases_ms"]) == {"cursor.execute", "fetch"}
+        assert (entry["query_id"], entry["rows"], entry["bytes"]) == ("qid", 5, 120)
+        assert entry["error"] is None
+
+    def test_fast_calls_are_not_written(self, tmp_path: Path) -> None:
+        path = tmp_path / "slow.jsonl"
+        tracer = SlowQueryTracer(SlowQueryLog(path, threshold_seconds=60))
+
+        with tracer.span("tool.list_tables"):
+            pass
+
+        assert _read_entries(path) == []
+
+    def test_records_error_and_delegates_to_inner(self, tmp_path: Path) -> None:
+        """失敗した呼び出しもエラー付きで記録し、内側のトレーサにもスパンを渡す。"""
+        path = tmp_path / "slow.jsonl"
+        inner = RecordingTracer()
+        tracer = SlowQueryTracer(SlowQueryLog(path, threshold_seconds=0), inner)
+
+        with pytest.raises(RuntimeError):
+            with tracer.span("tool.query"):
+                raise RuntimeError("timeout")
+
+        (entry,) = _read_entries(path)
+        assert entry["error"] == "RuntimeError: timeout"
+        assert [s.name for s in inner.exporter.spans] == ["tool.query"]
+
+    def test_rotates_by_size(self, tmp_path: Path) -> None:
+        path = tmp_path / "slow.jsonl"
+        log = SlowQueryLog(path, threshold_seconds=0, max_bytes=200, backup_count=2)
+
+        for i in range(10):
+            log.write({"i": i, "padding": "x" * 50})
+        log.close()
+
+        assert (tmp_path / "slow.jsonl.1").exists()
+        assert not (tmp_path / "slow.jsonl.3").exists()
+
+
+class TestServerIntegration:
+    def test_query_tool_writes_slow_log(self, tmp_path: Path) -> None:
+        path = tmp_path / "slow.jsonl"
+        mcp = FastMCP("snowflake-mcp")
+        register_tools(
+            mcp,
+            connection_factory=_mock_connection,
+            is_read_only=lambda sql: True,
+            slow_query_log=SlowQueryLog(path, threshold_seconds=0),
+        )
+
+        anyio.run(mcp.call_tool, "query", {"sql": "SELECT ID FROM t"})
+
+        (entry,) = _read_entries(path)
+        assert entry["tool"] == "query"
+        assert entry["rows"] == 2
+        assert entry["query_id"] == "01b2c3d4-0000-1234-0000-00000000abcd"
+        assert {"open_connection", "cursor.execute", "fetch", "build_response"} <= set(
+            entry["phases_ms"]
+        )
+
+
+class TestGetSlowQueryLog:
+    def test_disabled_without_path(self) -> None:
+        assert get_slow_query_log({}) is None
+
+    def test_reads_threshold(self, tmp_path: Path) -> None:
+        log = get_slow_query_log(
+            {
+                "SNOWFLAKE_SLOW_QUERY_LOG": str(tmp_path / "slow.jsonl"),
+                "SNOWFLAKE_SLOW_QUERY_THRESHOLD_MS": "250",
+            }
+        )
+        assert log is not None
+        assert log.threshold_seconds == 0.25
@@ -0,0 +1,220 @@
+"""Test metadata-first table profiling."""
+
+import json
+from typing import Any, Dict, List, Sequence, Tuple
+
+import anyio
+import pytest
+from mcp.server.fastmcp import FastMCP
+from snowflake_mcp_server.server import register_tools
+from snowflake_mcp_server.table_profile import (
+    ProfileCache,
+    TableRef,
+    build_metadata_query,
+    build_profile_query,
+    get_profile_sample_rows,
+    parse_table_name,
+    profile_table,
+    sample_percent,
+)
+
+META_COLUMNS = (
+    "TABLE_CATALOG",
+    "TABLE_SCHEMA",
+    "TABLE_NAME",
+    "TABLE_TYPE",
+    "ROW_COUNT",
+    "BYTES",
+    "CLUSTERING_KEY",
+    "LAST_ALTERED",
+)
+
+
+class FakeCursor:
+    def __init__(self, conn: "FakeConnection") -> None:
+        self.conn = conn
+        self.description: List[Tuple[Any, ...]] | None = None
+        self.rows: List[Sequence[Any]] = []
+        self.sfqid = "01b2c3d4-0000-1234-0000-00000000abcd"
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> None:
+        self.conn.executed.append(sql)
+        self.conn.params.append(tuple(params))
+        columns, self.rows = self.conn.respond(sql)
+        self.description = [(name, 2, None, None, None, None, True) for name in columns]
+
+    def fetchall(self) -> List[Sequence[Any]]:
+        return self.rows
+
+    def close(self) -> None:
+        pass
+
+
+class FakeConnection:
+    """SQL の種類ごとに決まった結果を返す接続。"""
+
+    def __init__(
+        self,
+        row_count: int = 10,
+        last_altered: str = "2026-01-01 00:00:00",
+        clustering_key: str | None = None,
+    ) -> None:
+        self.executed: List[str] = []
+        self.params: List[Tuple[Any, ...]] = []
+        self.row_count = row_count
+        self.last_altered = last_altered
+        self.clustering_key = clustering_key
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def close(self) -> None:
+        pass
+
+    def respond(self, sql: str) -> Tuple[Sequence[str], List[Sequence[Any]]]:
+        if "TABLE_TYPE" in sql:
+            row = ("DB", "PUBLIC", "ORDERS", "BASE TABLE", self.row_count, 4096)
+            return META_COLUMNS, [(*row, self.clustering_key, self.last_altered)]
+        if "COLUMN_NAME" in sql:
+            rows = [("ID", "NUMBER"), ("NOTE", "TEXT"), ("PAYLOAD", "VARIANT")]
+            return ("COLUMN_NAME", "DATA_TYPE"), rows
+        if "SYSTEM$CLUSTERING_INFORMATION" in sql:
+            info = {"total_partition_count": 12, "average_depth": 1.5, "notes": "x"}
+            return ("INFO",), [(json.dumps(info),)]
+        if sql.startswith("SELECT COUNT(*)"):
+            # rows, ID: non_null/distinct/min/max/median, NOTE: non_null/distinct/min/max,
+            # PAYLOAD: non_null
+            return [f"C{i}" for i in range(11)], [(10, 10, 10, 1, 10, 5, 5, 3, "a", "z", 0)]
+        return (), []
+
+    def aggregate_queries(self) -> List[str]:
+        return [sql for sql in self.executed if sql.startswith("SELECT COUNT(*)")]
+
+
+class TestParseTableName:
+    def test_qualified_names(self) -> None:
+        assert parse_table_name("orders") == TableRef("ORDERS")
+        assert parse_table_name('db.public."Mixed Case"') == TableRef(
+            '"Mixed Case"', "PUBLIC", "DB"
+        )
+
+    @pytest.mark.parametrize(
+        "name",
+        ["", "a.b.c.d", "orders; DROP TABLE x", "orders where 1=1", "a..b", "'t'"],
+    )
+    def test_rejects_non_identifiers(self, name: str) -> None:
+        with pytest.raises(ValueError, match="Invalid table name"):
+            parse_table_name(name)
+
+
+class TestQueryBuilders:
+    def test_metadata_query_binds_catalog_names(self) -> None:
+        statement = build_metadata_query(parse_table_name('db.sales."Orders"'))
+        assert statement.params == ("DB.INFORMATION_SCHEMA.TABLES", "SALES", "Orders")
+
+    def test_metadata_query_text_is_stable(self) -> None:
+        statement = build_metadata_query(parse_table_name("orders"))
+        assert statement.params == ("INFORMATION_SCHEMA.TABLES", None, "ORDERS")
+        assert "COALESCE(?, CURRENT_SCHEMA())" in statement.sql
+        assert statement.sql == build_metadata_query(parse_table_name("a.b.c")).sql
+
+    def test_sample_percent(self) -> None:
+        assert sample_percent(None, 1000) is None
+        assert sample_percent(500, 1000) is None
+        assert sample_percent(100_000, 1000) == 1.0
+
+    def test_profile_query_is_single_pass(self) -> None:
+        sql, layout = build_profile_query(
+            '"DB"."PUBLIC"."T"', [("ID", "NUMBER"), ("V", "VARIANT")], 2.5
+        )
+        assert sql == (
+            'SELECT COUNT(*), COUNT("ID"), APPROX_COUNT_DISTINCT("ID"), MIN("ID"),'
+            ' MAX("ID"), APPROX_PERCENTILE("ID", 0.5), COUNT("V")'
+            ' FROM "DB"."PUBLIC"."T" SAMPLE SYSTEM (2.5)'
+        )
+        assert layout[-1] == (1, "non_null")
+
+
+class TestProfileTable:
+    def test_profiles_columns_in_one_query(self) -> None:
+        conn = FakeConnection()
+        profile = profile_table(conn, "orders")
+
+        assert profile["table"] == '"DB"."PUBLIC"."ORDERS"'
+        assert profile["row_count"] == 10
+        assert profile["sample_percent"] is None
+        assert profile["clustering"] is None
+        assert len(conn.aggregate_queries()) == 1
+        id_column, note, payload = profile["columns"]
+        assert id_column == {
+            "name": "ID",
+            "type": "NUMBER",
+            "null_fraction": 0.0,
+            "approx_distinct": 10,
+            "min": 1,
+            "max": 10,
+            "median": 5,
+        }
+        assert note["null_fraction"] == 0.5
+        assert payload == {"name": "PAYLOAD", "type": "VARIANT", "null_fraction": 1.0}
+
+    def test_samples_large_tables(self) -> None:
+        conn = FakeConnection(row_count=10_000_000)
+        profile = profile_table(conn, "orders", sample_rows=1_000_000)
+
+        assert profile["sample_percent"] == 10.0
+        assert conn.aggregate_queries()[0].endswith("SAMPLE SYSTEM (10.0)")
+
+    def test_metadata_only(self) -> None:
+        conn = FakeConnection(clustering_key="LINEAR(ID)")
+        profile = profile_table(conn, "orders", include_columns=False)
+
+        assert profile["columns"] == []
+        assert profile["clustering"] == {
+            "total_partition_count": 12,
+            "average_overlaps": None,
+            "average_depth": 1.5,
+        }
+        assert conn.aggregate_queries() == []
+
+    def test_cache_keyed_by_last_altered(self) -> None:
+        cache = ProfileCache()
+        conn = FakeConnection()
+
+        assert profile_table(conn, "orders", cache=cache)["cached"] is False
+        assert profile_table(conn, "orders", cache=cache)["cached"] is True
+        assert len(conn.aggregate_queries()) == 1
+
+        conn.last_altered = "2026-01-02 00:00:00"
+        assert profile_table(conn, "orders", cache=cache)["cached"] is False
+        assert len(conn.aggregate_queries()) == 2
+
+    def test_missing_table(self) -> None:
+        conn = FakeConnection()
+        conn.respond = lambda sql: ((), [])  # type: ignore[method-assign]
+        with pytest.raises(ValueError, match="Table not found"):
+            profile_table(conn, "orders")
+
+    def test_cache_is_bounded(self) -> None:
+        cache = ProfileCache(max_entries=2)
+        for i in range(3):
+            cache.put(f"t{i}", "v", {})
+        assert len(cache) == 2
+        assert cache.get("t0", "v") is None
+
+
+def test_get_profile_sample_rows() -> None:
+    assert get_profile_sample_rows({}) == 1_000_000
+    assert get_profile_sample_rows({"SNOWFLAKE_PROFILE_SAMPLE_ROWS": "5000"}) == 5000
+
+
+def test_table_profile_tool() -> None:
+    conn = FakeConnection()
+    mcp = FastMCP("snowflake-mcp")
+    register_tools(mcp, connection_factory=lambda: conn, is_read_only=lambda sql: True)
+
+    result = anyio.run(mcp.call_tool, "table_profile", {"table_name": "orders"})
+
+    payload: Dict[str, Any] = json.loads(result[0][0].text)
+    assert payload["table"] == '"DB"."PUBLIC"."ORDERS"'
+    assert [c["name"] for c in payload["columns"]] == ["ID", "NOTE", "PAYLOAD"]
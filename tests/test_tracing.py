@@ -0,0 +1,133 @@
+"""Test tracing spans and the in-memory exporter."""
+
+import sys
+from unittest.mock import Mock
+
+import anyio
+import pytest
+from mcp.server.fastmcp import FastMCP
+from snowflake_mcp_server.connection import fetch_result
+from snowflake_mcp_server.server import register_tools
+from snowflake_mcp_server.tracing import (
+    NOOP_TRACER,
+    InMemorySpanExporter,
+    RecordingTracer,
+    get_tracer,
+)
+
+
+def _mock_connection(rows: list) -> Mock:
+    conn = Mock()
+    cursor = conn.cursor.return_value
+    cursor.description = [("ID", 0)]
+    cursor.sfqid = "01b2c3d4-0000-1234-0000-00000000abcd"
+    cursor.fetchmany.side_effect = [rows, []]
+    return conn
+
+
+class TestRecordingTracer:
+    """メモリ記録トレーサのテスト。"""
+
+    def test_nested_spans_record_parent(self) -> None:
+        """入れ子のスパンは親スパンの ID を持ち、終了順に記録される。"""
+        tracer = RecordingTracer()
+        with tracer.span("parent", tool="query") as parent:
+            with tracer.span("child") as child:
+                child.set_attribute("rows", 3)
+
+        child_span, parent_span = tracer.exporter.spans
+        assert parent_span.parent_id is None
+        assert child_span.parent_id == parent_span.span_id
+        assert parent_span.attributes == {"tool": "query"}
+        assert child_span.attributes == {"rows": 3}
+        assert parent is parent_span and child is child_span
+
+    def test_records_error_and_reraises(self) -> None:
+        """例外はスパンに記録した上で再送出する。"""
+        tracer = RecordingTracer()
+        with pytest.raises(RuntimeError):
+            with tracer.span("failing"):
+                raise RuntimeError("boom")
+
+        (span,) = tracer.exporter.spans
+        assert span.error == "RuntimeError: boom"
+        assert span.duration >= 0
+
+    def test_noop_tracer_returns_shared_span(self) -> None:
+        """無効時は常に同じダミースパンを返し、何も記録しない。"""
+        first = NOOP_TRACER.span("a", x=1)
+        second = NOOP_TRACER.span("b")
+        assert first is second
+        with first as span:
+            span.set_attribute("k", "v")
+
+
+class TestFetchSpans:
+    """fetch_result のスパンのテスト。"""
+
+    def test_execute_and_fetch_spans_carry_attributes(self) -> None:
+        """実行スパンにクエリ ID、fetch スパンに行数と見積りバイト数を付ける。"""
+        exporter = InMemorySpanExporter()
+        conn = _mock_connection([(1,), (2,)])
+
+        fetch_result(
+            conn, "SELECT 1", row_size=lambda c, r: 10, tracer=RecordingTracer(exporter)
+        )
+
+        execute, fetch = exporter.spans
+        assert execute.name == "cursor.execute"
+        assert execute.attributes["snowflake.query_id"] == conn.cursor().sfqid
+        assert fetch.name == "fetch"
+        assert fetch.attributes["db.row_count"] == 2
+        assert fetch.attributes["result.estimated_bytes"] == 20
+
+
+class TestToolSpans:
+    """ツール呼び出しのスパン構成のテスト。"""
+
+    def test_query_tool_span_tree(self) -> None:
+        """ツールの親スパンの下に検証・接続・実行・fetch・レスポンス構築が並ぶ。"""
+        tracer = RecordingTracer()
+        mcp = FastMCP("snowflake-mcp")
+        register_tools(
+            mcp,
+            connection_factory=lambda: _mock_connection([(1,)]),
+            is_read_only=lambda sql: True,
+            tracer=tracer,
+        )
+
+        anyio.run(mcp.call_tool, "query", {"sql": "SELECT 1"})
+
+        spans = tracer.exporter.spans
+        (root,) = [s for s in spans if s.parent_id is None]
+        assert root.name == "tool.query"
+        assert root.attributes["snowflake.query_id"].startswith("01b2c3d4")
+        assert [s.name for s in tracer.exporter.children_of(root)] == [
+            "is_read_only_query",
+            "open_connection",
+            "prepare",
+            "cursor.execute",
+            "fetch",
+            "build_response",
+        ]
+
+
+class TestGetTracer:
+    """環境変数からのトレーサ構築のテスト。"""
+
+    def test_disabled_by_default(self) -> None:
+        assert get_tracer({}) is NOOP_TRACER
+        assert get_tracer({"SNOWFLAKE_TRACING": "off"}) is NOOP_TRACER
+
+    def test_memory_mode(self) -> None:
+        assert isinstance(get_tracer({"SNOWFLAKE_TRACING": "memory"}), RecordingTracer)
+
+    def test_otel_mode_without_package(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """opentelemetry-api が無ければ分かりやすいエラーにする。"""
+        monkeypatch.setitem(sys.modules, "opentelemetry", None)
+        with pytest.raises(ValueError, match="opentelemetry-api"):
+            get_tracer({"SNOWFLAKE_TRACING": "otel"})
+
+    def test_invalid_mode(self) -> None:
+        with pytest.raises(ValueError, match="SNOWFLAKE_TRACING"):
+            get_tracer({"SNOWFLAKE_TRACING": "jaeger"})